@@ -1,22 +1,52 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import copy
 import hmac
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from app_utils import (
     LIMIT_UP_THRESHOLD, MAX_SEARCH_RESULTS,
-    clean_columns, convert_rise_rate, format_date, render_theme_badge,
+    clean_columns, render_theme_badge,
     find_repo_file, load_data, load_company_overview, load_theme_data, load_analysis_data,
-    load_name_aliases, normalize_stock_code, load_stock_code_map, clear_disk_cache
+    load_name_aliases, normalize_stock_code, load_stock_code_map, clear_disk_cache, CACHE_DIR
+)
+from search_engine import (
+    QueryCache,
+    append_search_index,
+    build_search_index,
+    build_term_index,
+    compute_source_fingerprint,
+    extend_term_index,
+    load_index_snapshot,
+    load_keyword_aliases,
+    load_snapshot_artifact,
+    query_cache_key,
+    save_index_snapshot,
+    save_snapshot_artifact,
+    search_documents,
 )
-from search_engine import build_search_index, load_keyword_aliases, search_documents
 from issue_analysis import (
+    HOT_ISSUE_PRESETS,
+    HOT_TREND_WINDOW,
+    HotIssueIndex,
+    TradingCalendar,
     analyze_hot_issues,
-    build_reaction_matrix,
+    build_sparse_reaction_matrix,
     build_theme_event_index,
     group_issue_cycles,
+    hot_issue_preset_period,
     score_stocks,
 )
+from stock_profiles import KeyedRows, build_stock_profiles
+from stock_search import build_stock_typeahead
+from stock_similarity import SIMILAR_STOCK_TABLE_ARTIFACT, build_hashtag_index, build_similar_stock_table
 from ui_components import apply_page_style, render_hot_issue_dashboard, render_keyword_dashboard
 
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------------------------
 # 1. 페이지 설정
 # ---------------------------------------------------------
@@ -50,6 +80,7 @@ with st.sidebar:
         repo_file = find_repo_file()
         if st.button("🔄 데이터 새로고침"):
             st.cache_data.clear()
+            st.cache_resource.clear()
             clear_disk_cache()
             st.rerun()
 
@@ -255,31 +286,19 @@ def format_stock_option(stock_key):
         return f"{display_name} ({alias_text}{code_text})"
     return f"{display_name} ({stock_key})" if use_stock_code else display_name
 
-def matches_stock(stock_key, search_text):
-    if not search_text:
-        return True
-    search_lower = search_text.lower().strip()
-    haystack = [stock_key, get_display_name(stock_key), *names_by_key.get(stock_key, set())]
-    return any(search_lower in str(item).lower() for item in haystack if item)
-
-def get_auto_selected_stock_key(search_text, options):
-    """정확히 하나로 좁혀지거나 정확히 일치하면 바로 상세로 진입"""
+def get_auto_selected_stock_key(search_text, search_result):
+    """정확히 하나로 좁혀지거나 종목코드·이름이 정확히 일치하면 바로 상세로 진입"""
     if not search_text:
         return None
 
-    search_text = search_text.strip()
-    search_lower = search_text.lower()
-    normalized_code = normalize_stock_code(search_text)
-
-    for stock_key in options:
-        candidates = [stock_key, get_display_name(stock_key), *names_by_key.get(stock_key, set())]
-        if normalized_code and stock_key == normalized_code:
-            return stock_key
-        if any(search_lower == str(item).lower() for item in candidates if item):
-            return stock_key
+    normalized_code = normalize_stock_code(search_text.strip())
+    if normalized_code and normalized_code in search_result.keys:
+        return normalized_code
+    if search_result.exact:
+        return search_result.exact[0]
 
-    if len(options) == 1:
-        return options[0]
+    if len(search_result.keys) == 1:
+        return search_result.keys[0]
 
     return None
 
@@ -330,24 +349,259 @@ sangcheon_rows_by_key = {
 }
 
 
-@st.cache_data(show_spinner="통합 검색 인덱스를 준비하고 있습니다.", ttl=3600)
-def cached_build_search_index(
-    sangcheon, signal, themes, company_overview, analysis, aliases, code_map
+@st.cache_resource(show_spinner=False)
+def search_index_store():
+    """세션끼리 공유하는 최근 통합 검색 인덱스와 그 원본 행 해시"""
+    return {"lock": threading.Lock()}
+
+
+def frame_row_hashes(df):
+    if df is None or df.empty:
+        return np.array([], dtype=np.uint64)
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+# 검색 인덱스 스냅샷 키에 들어가는 보조 원본 파일 (app_utils 로더가 읽는 파일과 같다)
+SNAPSHOT_SOURCE_FILES = [
+    "시그널뷰_기업개요.xlsx",
+    "시그널뷰_기업개요.csv",
+    "시그널뷰_종목정리_핵심정리 및 테마.xlsx",
+    "시그널뷰_관련테마.xlsx",
+    "시그널뷰_테마별 기업개요.xlsx",
+    "name_aliases.json",
+    "stock_code_map.json",
+]
+
+
+def search_snapshot_key(main_file):
+    main_source = main_file.getvalue() if hasattr(main_file, "getvalue") else main_file
+    return compute_source_fingerprint([main_source, *SNAPSHOT_SOURCE_FILES])
+
+
+def load_search_index(snapshot_key, sangcheon, signal, themes, company_overview, analysis, aliases, code_map):
+    """같은 입력이면 메모리나 디스크 스냅샷을 쓰고, 상천 행만 늘었으면 새 행의 문서만 붙인다."""
+    store = search_index_store()
+    with store["lock"]:
+        if store.get("snapshot_key") == snapshot_key:
+            return store["index"], store["term_index"]
+
+        aux_token = hash((
+            *(frame_row_hashes(df).tobytes() for df in [signal, themes, company_overview, analysis]),
+            json.dumps(aliases, ensure_ascii=False, sort_keys=True),
+            json.dumps(code_map, ensure_ascii=False, sort_keys=True),
+        ))
+        row_hashes = frame_row_hashes(sangcheon)
+        previous_index = store.get("index")
+        snapshot = None
+        if (
+            previous_index is not None
+            and store["aux_token"] == aux_token
+            and np.isin(store["row_hashes"], row_hashes).all()
+        ):
+            new_rows = ~np.isin(row_hashes, store["row_hashes"])
+            index = append_search_index(
+                previous_index, sangcheon.loc[new_rows], name_aliases=aliases, stock_code_map=code_map
+            )
+            term_index = extend_term_index(store["term_index"], index, previous_index)
+        else:
+            snapshot = load_index_snapshot(CACHE_DIR, snapshot_key)
+            if snapshot is not None:
+                index, term_index = snapshot
+            else:
+                with st.spinner("통합 검색 인덱스를 준비하고 있습니다."):
+                    index = build_search_index(
+                        sangcheon, signal, themes, company_overview, analysis, aliases, code_map
+                    )
+                    term_index = build_term_index(index)
+
+        if snapshot is None:
+            try:
+                save_index_snapshot(CACHE_DIR, snapshot_key, index, term_index)
+            except OSError:
+                pass
+        store.update(
+            index=index,
+            term_index=term_index,
+            row_hashes=row_hashes,
+            aux_token=aux_token,
+            snapshot_key=snapshot_key,
+        )
+        return index, term_index
+
+
+def stock_rows_lookup(df):
+    """filter_stock_rows(df, 종목키)와 같은 행의 위치를 돌려주는 보조 표 조회.
+
+    종목키로 미리 나눠 두고, 종목키로 못 찾으면서 종목코드·종목명이 표에 있는 종목만 원래 방식으로 찾는다.
+    """
+    frame = df.reset_index(drop=True)
+    grouped = frame.groupby('__stock_key', sort=False).indices if '__stock_key' in frame.columns else {}
+    identifiers = set()
+    for column in ['종목코드', '종목명']:
+        if column in frame.columns:
+            identifiers.update(frame[column].dropna().astype(str).str.strip())
+    no_rows = np.array([], dtype=np.int64)
+
+    def positions(stock_key):
+        if stock_key in grouped:
+            return grouped[stock_key]
+        stock_name = get_display_name(stock_key)
+        if identifiers.isdisjoint({stock_key, stock_name, *names_by_key.get(stock_key, set())}):
+            return no_rows
+        return filter_stock_rows(frame, stock_key, stock_name).index.to_numpy()
+
+    return KeyedRows(frame, positions)
+
+
+@st.cache_resource(show_spinner=False)
+def stock_typeahead_store():
+    """세션끼리 공유하는 종목 검색 자동완성 색인과 그 원본 스냅샷 키"""
+    return {"lock": threading.Lock()}
+
+
+def load_stock_typeahead(snapshot_key):
+    """현재 종목명·구 사명(name_aliases.json, stock_code_map.json 포함)·종목코드 자동완성 색인.
+
+    종목 순서는 stock_keys를 따르고, 초성·자모 분해 색인도 함께 만든다.
+    """
+    store = stock_typeahead_store()
+    with store["lock"]:
+        if store.get("snapshot_key") != snapshot_key:
+            names_by_code = {}
+            for name, code in stock_code_map.items():
+                names_by_code.setdefault(normalize_stock_code(code), set()).add(clean_name(name))
+            store.update(
+                typeahead=build_stock_typeahead(
+                    (
+                        stock_key,
+                        [
+                            get_display_name(stock_key),
+                            *names_by_key.get(stock_key, set()),
+                            *names_by_code.get(stock_key, set()),
+                        ],
+                    )
+                    for stock_key in stock_keys
+                ),
+                snapshot_key=snapshot_key,
+            )
+        return store["typeahead"]
+
+
+@st.cache_resource(show_spinner=False)
+def stock_profile_store():
+    """세션끼리 공유하는 종목별 상세 화면 자료 묶음과 그 원본 스냅샷 키"""
+    return {"lock": threading.Lock()}
+
+
+def load_stock_profiles(snapshot_key, sangcheon, company_overview, themes, analysis):
+    """종목키 → 상세 화면 자료 묶음. 원본이 같으면 세션끼리 다시 쓴다."""
+    store = stock_profile_store()
+    with store["lock"]:
+        if store.get("snapshot_key") == snapshot_key:
+            return store["profiles"]
+
+        def has_names(df):
+            return df is not None and '종목명' in df.columns
+
+        profiles = build_stock_profiles(
+            sangcheon,
+            overview=stock_rows_lookup(company_overview) if has_names(company_overview) else None,
+            themes=stock_rows_lookup(themes) if themes is not None else None,
+            analysis=stock_rows_lookup(analysis) if has_names(analysis) else None,
+        )
+        store.update(profiles=profiles, snapshot_key=snapshot_key)
+        return profiles
+
+
+@st.cache_resource(show_spinner=False)
+def similar_stock_store():
+    """세션끼리 공유하는 종목별 유사 종목 표와 그 원본 스냅샷 키"""
+    return {"lock": threading.Lock()}
+
+
+def hashtag_entries(themes):
+    """테마 표 행마다 종목키·표시명·테마_전체 (종목키가 없으면 종목명으로 찾는다)"""
+    entries = []
+    for theme_row in ([] if themes is None else themes.to_dict("records")):
+        other_key = get_row_stock_key(theme_row) or resolve_stock_key_by_name(theme_row.get('종목명'))
+        entries.append({
+            '종목키': other_key,
+            '종목명': get_display_name(other_key) if other_key else clean_name(theme_row.get('종목명')),
+            '테마_전체': theme_row.get('테마_전체'),
+        })
+    return pd.DataFrame(entries, columns=['종목키', '종목명', '테마_전체'])
+
+
+def load_similar_stock_table(snapshot_key, themes, sangcheon, profiles):
+    """상세 화면에 나오는 모든 종목의 상위 유사 종목 표.
+
+    같은 원본이면 세션 메모리나 검색 인덱스 스냅샷에 덧붙인 표를 쓰고, 없으면 한 번에 계산해 덧붙인다.
+    질의 종목의 테마는 상세 화면과 같이 종목 자료 묶음의 테마와 최신 상천 행의 테마를 쓴다.
+    """
+    store = similar_stock_store()
+    with store["lock"]:
+        if store.get("snapshot_key") == snapshot_key:
+            return store["table"]
+
+        table = load_snapshot_artifact(CACHE_DIR, snapshot_key, SIMILAR_STOCK_TABLE_ARTIFACT)
+        if table is None:
+            entries = hashtag_entries(themes)
+            queries = pd.DataFrame(
+                [
+                    (stock_key, get_display_name(stock_key), profile.theme_text, profile.latest.get('테마'))
+                    for stock_key, profile in profiles.items()
+                ],
+                columns=['종목키', '종목명', '테마_전체', '테마'],
+            )
+            table = build_similar_stock_table(build_hashtag_index(entries, sangcheon, names_by_key), queries, sangcheon)
+            try:
+                save_snapshot_artifact(CACHE_DIR, snapshot_key, SIMILAR_STOCK_TABLE_ARTIFACT, table)
+            except OSError:
+                pass
+        store.update(table=table, snapshot_key=snapshot_key)
+        return table
+
+
+@st.cache_resource(show_spinner=False)
+def keyword_query_cache():
+    """세션끼리 공유하는 이슈 분석 결과 캐시 (인덱스 버전·확장 검색어·필터 키, 용량 기준 LRU)"""
+    return QueryCache(max_bytes=256 * 1024 * 1024)
+
+
+def cached_keyword_analysis(
+    index,
+    term_index,
+    search_text,
+    keyword_alias_map,
+    operator,
+    sources,
+    start_date,
+    end_date,
+    minimum_rise,
+    sort_by,
+    trading_calendar,
 ):
-    return build_search_index(
-        sangcheon,
-        signal,
-        themes,
-        company_overview,
-        analysis,
-        aliases,
-        code_map,
+    cache = keyword_query_cache()
+    key = query_cache_key(
+        index, search_text, keyword_alias_map, operator, sources, start_date, end_date,
+        minimum_rise, sort_by, "keyword_analysis", trading_calendar.token,
+    )
+    cached = cache.get(key)
+    if cached is None:
+        cached = keyword_analysis(
+            index, term_index, search_text, keyword_alias_map, operator, sources,
+            start_date, end_date, minimum_rise, sort_by, trading_calendar,
+        )
+        cache.put(key, cached)
+    return tuple(
+        value.copy(deep=False) if isinstance(value, pd.DataFrame) else value
+        for value in cached
     )
 
 
-@st.cache_data(show_spinner=False, ttl=3600, max_entries=64)
-def cached_keyword_analysis(
+def keyword_analysis(
     index,
+    term_index,
     search_text,
     keyword_alias_map,
     operator,
@@ -356,7 +610,7 @@ def cached_keyword_analysis(
     end_date,
     minimum_rise,
     sort_by,
-    trading_days,
+    trading_calendar,
 ):
     matches, applied = search_documents(
         index,
@@ -368,40 +622,139 @@ def cached_keyword_analysis(
         end_date=end_date,
         min_rise=minimum_rise,
         sort_by=sort_by,
+        term_index=term_index,
     )
-    summaries, members, _ = group_issue_cycles(matches, trading_days)
-    reference_date = max(trading_days) if trading_days else None
+    summaries, members, _ = group_issue_cycles(matches, trading_calendar)
+    reference_date = trading_calendar[-1] if len(trading_calendar) else None
     ranking = score_stocks(matches, summaries, members, reference_date=reference_date)
-    matrix = build_reaction_matrix(members)
+    matrix = build_sparse_reaction_matrix(members)
     return matches, applied, summaries, members, ranking, matrix
 
 
-@st.cache_data(show_spinner="기간별 이슈 인덱스를 준비하고 있습니다.", ttl=3600)
-def cached_build_theme_event_index(sangcheon, keyword_alias_map):
-    return build_theme_event_index(sangcheon, keyword_alias_map)
+@st.cache_resource(show_spinner=False)
+def hot_issue_index_store():
+    """세션끼리 공유하는 최근 핫이슈 인덱스와 그 상천 원본 행 해시"""
+    return {"lock": threading.Lock()}
+
+
+def load_hot_issue_index(sangcheon, keyword_alias_map, trading_calendar):
+    """테마 이벤트와 이슈×거래일 누적합 인덱스. 상천 행만 늘었으면 새 행의 이벤트만 만들어 붙인다."""
+    store = hot_issue_index_store()
+    with store["lock"]:
+        alias_token = json.dumps(keyword_alias_map, ensure_ascii=False, sort_keys=True)
+        row_hashes = frame_row_hashes(sangcheon)
+        previous_index = store.get("index")
+        reusable = previous_index is not None and store["alias_token"] == alias_token
+        if (
+            reusable
+            and previous_index.calendar == trading_calendar
+            and np.array_equal(store["row_hashes"], row_hashes)
+        ):
+            return previous_index
+
+        if reusable and np.isin(store["row_hashes"], row_hashes).all():
+            new_rows = ~np.isin(row_hashes, store["row_hashes"])
+            # 다른 세션이 읽고 있을 수 있으므로 얕은 복사본을 늘린다.
+            index = copy.copy(previous_index).append(
+                build_theme_event_index(sangcheon.loc[new_rows], keyword_alias_map), trading_calendar
+            )
+        else:
+            with st.spinner("기간별 이슈 인덱스를 준비하고 있습니다."):
+                index = HotIssueIndex(build_theme_event_index(sangcheon, keyword_alias_map), trading_calendar)
+        store.update(index=index, row_hashes=row_hashes, alias_token=alias_token)
+        return index
+
+
+@st.cache_resource(show_spinner=False)
+def hot_issue_warmup_pool():
+    """핫이슈 기간 프리셋을 미리 계산하는 세션 공용 작업자 풀, 마지막으로 데운 인덱스 버전과 그 작업들"""
+    return {
+        "executor": ThreadPoolExecutor(max_workers=2, thread_name_prefix="hot-issue-warmup"),
+        "lock": threading.Lock(),
+        "version": None,
+        "futures": {},
+    }
+
+
+def hot_issue_analysis_key(hot_index, trading_calendar, start, end, compare_previous, min_stocks):
+    return (
+        "hot_issue_analysis",
+        hot_index.version,
+        trading_calendar.token,
+        pd.Timestamp(start),
+        pd.Timestamp(end),
+        bool(compare_previous),
+        int(min_stocks),
+    )
 
 
-@st.cache_data(show_spinner=False, ttl=3600, max_entries=32)
-def cached_hot_issue_analysis(
-    theme_event_index,
-    all_trading_days,
-    start_date,
-    end_date,
-    compare_previous,
-    min_stocks,
-):
-    return analyze_hot_issues(
-        theme_event_index,
-        all_trading_days,
-        start_date,
-        end_date,
-        compare_previous=compare_previous,
-        min_stocks=min_stocks,
+def compute_hot_issue_analysis(cache, key, hot_index, trading_calendar, start, end, compare_previous, min_stocks):
+    result = analyze_hot_issues(
+        hot_index, trading_calendar, start, end,
+        compare_previous=compare_previous, min_stocks=min_stocks,
     )
+    cache.put(key, result)
+    return result
+
+
+def cached_hot_issue_analysis(cache, hot_index, trading_calendar, start, end, compare_previous, min_stocks):
+    """질의 캐시에 없고 같은 질의를 작업자 풀이 계산하는 중이면 그 결과를 기다려 쓴다."""
+    key = hot_issue_analysis_key(hot_index, trading_calendar, start, end, compare_previous, min_stocks)
+    cached = cache.get(key)
+    if cached is None:
+        warmup = hot_issue_warmup_pool()["futures"].get(key)
+        if warmup is not None:
+            wait([warmup])
+            cached = cache.get(key)
+    if cached is None:
+        cached = compute_hot_issue_analysis(
+            cache, key, hot_index, trading_calendar, start, end, compare_previous, min_stocks
+        )
+    ranking, events, metadata = cached
+    return ranking.copy(deep=False), events.copy(deep=False), dict(metadata)
+
+
+def log_warmup_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("핫이슈 미리 계산 실패", exc_info=future.exception())
+
+
+def warm_hot_issue_presets(hot_index, trading_calendar, min_stocks=2):
+    """인덱스가 바뀌면 일별 점수 행렬, 이슈 연관 그래프, 기간 프리셋×이전 기간 비교 결과를 작업자 풀에서 미리 계산한다.
+
+    결과는 탭에서 쓰는 것과 같은 질의 캐시에 들어가므로 첫 선택도 메모리에서 바로 나온다. 계산 중인
+    프리셋은 탭이 작업을 기다려 쓰고, 점수 행렬과 그래프는 인덱스의 메모 잠금이 한 번만 계산하게 한다.
+    실패한 작업은 로그로 남긴다.
+    """
+    pool = hot_issue_warmup_pool()
+    with pool["lock"]:
+        if pool["version"] == hot_index.version:
+            return
+        cache = keyword_query_cache()
+        executor = pool["executor"]
+        futures = {
+            "daily_scores": executor.submit(hot_index.daily_scores, HOT_TREND_WINDOW),
+            "issue_graph": executor.submit(hot_index.issue_graph),
+        }
+        for preset in HOT_ISSUE_PRESETS:
+            period = hot_issue_preset_period(trading_calendar, preset)
+            if period is None:
+                continue
+            for compare_previous in (True, False):
+                key = hot_issue_analysis_key(hot_index, trading_calendar, *period, compare_previous, min_stocks)
+                futures[key] = executor.submit(
+                    compute_hot_issue_analysis,
+                    cache, key, hot_index, trading_calendar, *period, compare_previous, min_stocks,
+                )
+        for future in futures.values():
+            future.add_done_callback(log_warmup_failure)
+        pool.update(version=hot_index.version, futures=futures)
 
 
 keyword_aliases = load_keyword_aliases()
-search_index = cached_build_search_index(
+source_snapshot_key = search_snapshot_key(final_file)
+search_index, search_term_index = load_search_index(
+    source_snapshot_key,
     df_sangcheon,
     df_signal,
     df_themes,
@@ -418,7 +771,9 @@ trading_days = tuple(
     .sort_values()
     .tolist()
 )
-hot_issue_index = cached_build_theme_event_index(df_sangcheon, keyword_aliases)
+trading_calendar = TradingCalendar(trading_days)
+hot_issue_index = load_hot_issue_index(df_sangcheon, keyword_aliases, trading_calendar)
+warm_hot_issue_presets(hot_issue_index, trading_calendar)
 
 # 세션 상태 초기화
 if 'selected_stock_code' not in st.session_state:
@@ -494,14 +849,15 @@ if search_mode == "종목 검색":
                 st.rerun()
     else:
         # 검색어 입력
-        search_query = st.text_input("🔍 종목명/구 사명/종목코드 검색", placeholder="예: 삼성전자, 005930...", key="stock_search")
+        search_query = st.text_input("🔍 종목명/구 사명/종목코드 검색", placeholder="예: 삼성전자, ㅅㅅㅈㅈ, 005930...", key="stock_search")
         
-        all_options = [stock_key for stock_key in stock_keys if matches_stock(stock_key, search_query)]
-        if len(all_options) > MAX_SEARCH_RESULTS:
-            all_options = all_options[:MAX_SEARCH_RESULTS]
+        # 정확 일치, 접두 일치, 중간 일치, 초성·자모 일치 순으로 최대 MAX_SEARCH_RESULTS개
+        search_result = load_stock_typeahead(source_snapshot_key).search(search_query, limit=MAX_SEARCH_RESULTS)
+        all_options = search_result.keys
+        if search_result.truncated:
             st.info(f"💡 검색 결과가 많아 {MAX_SEARCH_RESULTS}개만 표시됩니다.")
 
-        auto_selected_stock = get_auto_selected_stock_key(search_query, all_options)
+        auto_selected_stock = get_auto_selected_stock_key(search_query, search_result)
         if auto_selected_stock:
             st.session_state.current_query = auto_selected_stock
             st.rerun()
@@ -590,6 +946,7 @@ else:
 
             keyword_dashboard_data = cached_keyword_analysis(
                 search_index,
+                search_term_index,
                 keyword_query.strip(),
                 keyword_aliases,
                 operator,
@@ -598,7 +955,7 @@ else:
                 end_date,
                 minimum_rise,
                 keyword_sort,
-                trading_days,
+                trading_calendar,
             )
             matches, applied_terms, cycle_summaries, cycle_members, ranking, matrix = keyword_dashboard_data
             selected_keyword_stock = render_keyword_dashboard(
@@ -619,7 +976,7 @@ else:
         with period_col:
             hot_period = st.selectbox(
                 "분석 기간",
-                ["최근 5거래일", "최근 20거래일", "최근 60거래일", "최근 120거래일", "올해", "직접 설정"],
+                [*HOT_ISSUE_PRESETS, "직접 설정"],
                 index=1,
                 key="hot_issue_period",
             )
@@ -652,27 +1009,26 @@ else:
             )
             if isinstance(custom_period, (tuple, list)) and len(custom_period) == 2:
                 hot_start, hot_end = custom_period
-        elif hot_period == "올해":
-            year_days = [day for day in trading_days if day.year == max(trading_days).year]
-            hot_start = (year_days[0] if year_days else min(trading_days)).date()
-        else:
-            period_count = {
-                "최근 5거래일": 5,
-                "최근 20거래일": 20,
-                "최근 60거래일": 60,
-                "최근 120거래일": 120,
-            }[hot_period]
-            hot_start = trading_days[max(0, len(trading_days) - period_count)].date()
+        elif trading_days:
+            hot_start = hot_issue_preset_period(trading_calendar, hot_period)[0].date()
 
         hot_ranking, hot_events, hot_metadata = cached_hot_issue_analysis(
+            keyword_query_cache(),
             hot_issue_index,
-            trading_days,
+            trading_calendar,
             hot_start,
             hot_end,
             compare_previous,
             int(min_hot_stocks),
         )
-        selected_hot_issue = render_hot_issue_dashboard(hot_ranking, hot_events, hot_metadata)
+        selected_hot_issue = render_hot_issue_dashboard(
+            hot_ranking,
+            hot_events,
+            hot_metadata,
+            daily_scores=hot_issue_index.daily_scores(HOT_TREND_WINDOW),
+            trend_window=HOT_TREND_WINDOW,
+            issue_graph=hot_issue_index.issue_graph(),
+        )
         if selected_hot_issue:
             st.session_state.pending_issue_keyword = selected_hot_issue
             st.rerun()
@@ -680,15 +1036,14 @@ else:
 # 종목 상세 분석 표시
 if query:
     stock_name = get_display_name(query)
-    res = filter_stock_rows(df_sangcheon, query, stock_name).copy()
+    stock_profiles = load_stock_profiles(
+        source_snapshot_key, df_sangcheon, df_company_overview, df_themes, df_analysis
+    )
+    profile = stock_profiles.get(query)
     
-    if res.empty:
+    if profile is None:
         st.warning(f"'{stock_name}' 종목의 데이터를 찾을 수 없습니다.")
     else:
-        if '날짜' in res.columns:
-            res = res.sort_values('날짜', ascending=False)
-        
-        row = res.iloc[0]
         
         st.markdown("---")
         st.subheader(f"📊 {stock_name} 종목 분석")
@@ -701,25 +1056,8 @@ if query:
         if meta_parts:
             st.caption(" | ".join(meta_parts))
         
-        # 1. 기업개요
-        summary_text = None
-        if df_company_overview is not None and '종목명' in df_company_overview.columns:
-            overview_row = filter_stock_rows(df_company_overview, query, stock_name)
-            if not overview_row.empty:
-                # 핵심요약 컬럼 찾기
-                summary_col = next((c for c in df_company_overview.columns if any(k in c for k in ['핵심요약', '3줄정리'])), None)
-                if summary_col:
-                    val = overview_row.iloc[0][summary_col]
-                    if pd.notna(val):
-                        summary_text = str(val)
-        
-        if summary_text is None and df_themes is not None and '종목명' in df_themes.columns:
-            theme_sum_row = filter_stock_rows(df_themes, query, stock_name)
-            if not theme_sum_row.empty and '핵심요약' in df_themes.columns:
-                val = theme_sum_row.iloc[0]['핵심요약']
-                if pd.notna(val):
-                    summary_text = str(val)
-
+        # 1. 기업개요 (없으면 테마 표의 핵심요약)
+        summary_text = profile.summary
         if summary_text:
             st.markdown(summary_text)
         else:
@@ -727,39 +1065,22 @@ if query:
         
         st.markdown("---")
         
-        # 2. 테마 정보
-        theme_text = row.get('테마', '-')
-        # df_themes에서 더 정확한 정보가 있으면 덮어쓰기
-        if df_themes is not None:
-            theme_row = filter_stock_rows(df_themes, query, stock_name)
-            if not theme_row.empty:
-                theme_text = theme_row.iloc[0]['테마_전체']
-        
-        st.markdown(render_theme_badge(theme_text), unsafe_allow_html=True)
+        # 2. 테마 정보 (df_themes에 있으면 그쪽 테마_전체, 없으면 최신 상천 행의 테마)
+        st.markdown(render_theme_badge(profile.theme_text), unsafe_allow_html=True)
         st.markdown("---")
         
         # 3. 최근 상승 이슈 (최근 3회)
         st.subheader("📊 최근 상승 이슈 (최근 3회)")
         
-        recent_3 = res.head(3)
-        recent_dates = set()
-        
-        if not recent_3.empty:
-            for idx, (_, r) in enumerate(recent_3.iterrows(), 1):
-                date_str = format_date(r.get('날짜'))
-                recent_dates.add(date_str)
-                
-                rise_val, rise_disp = convert_rise_rate(r.get('상승률'))
-                is_limit_up = (rise_val is not None and rise_val >= LIMIT_UP_THRESHOLD)
-                limit_badge = " 🔥 상한가" if is_limit_up else ""
-                
-                reason = r.get('상승이유', '-')
-                if pd.isna(reason): reason = '-'
+        if profile.recent:
+            for idx, event in enumerate(profile.recent, 1):
+                limit_badge = " 🔥 상한가" if event.limit_up else ""
+                reason = event.reason
                 
                 with st.container():
                     c1, c2 = st.columns([1, 4])
-                    c1.write(f"**{idx}.** {date_str}{limit_badge}")
-                    c2.write(f"상승률: {rise_disp} | {reason}" if reason != '-' else f"상승률: {rise_disp}")
+                    c1.write(f"**{idx}.** {event.date}{limit_badge}")
+                    c2.write(f"상승률: {event.rise_display} | {reason}" if reason != '-' else f"상승률: {event.rise_display}")
                     st.divider()
         else:
             st.caption("상승 이슈 데이터가 없습니다.")
@@ -768,33 +1089,14 @@ if query:
         st.markdown("---")
         st.subheader("🔥 과거 상한가 이력")
         
-        limit_up_history = []
-        for _, r in res.iterrows():
-            rise_val, rise_disp = convert_rise_rate(r.get('상승률'))
-            if rise_val is not None and rise_val >= LIMIT_UP_THRESHOLD:
-                date_str = format_date(r.get('날짜'))
-                
-                # 최근 3회에 이미 나온 날짜면 제외
-                if date_str in recent_dates:
-                    continue
-                    
-                limit_up_history.append({
-                    '날짜': date_str,
-                    '상승률': rise_disp,
-                    '상승이유': r.get('상승이유', '-'),
-                    '원본_날짜': r.get('날짜', pd.Timestamp.min)
-                })
-        
-        if limit_up_history:
-            # 날짜순 정렬
-            limit_up_history.sort(key=lambda x: x['원본_날짜'], reverse=True)
-            
-            for idx, h in enumerate(limit_up_history, 1):
+        # 최근 3회에 이미 나온 날짜는 빼고 최신순으로 보인다.
+        if profile.limit_ups:
+            for idx, event in enumerate(profile.limit_ups, 1):
                 with st.container():
                     c1, c2 = st.columns([1, 4])
-                    c1.write(f"**{idx}.** {h['날짜']} 🔥")
-                    reason = h['상승이유']
-                    c2.write(f"상승률: {h['상승률']} | {reason}" if reason != '-' else f"상승률: {h['상승률']}")
+                    c1.write(f"**{idx}.** {event.date} 🔥")
+                    reason = event.reason
+                    c2.write(f"상승률: {event.rise_display} | {reason}" if reason != '-' else f"상승률: {event.rise_display}")
                     st.divider()
         else:
             st.caption("과거 상한가 이력이 없습니다.")
@@ -803,151 +1105,21 @@ if query:
         st.markdown("---")
         st.subheader("📝 테마별 상세 분석")
         
-        found_analysis = False
-        if df_analysis is not None and '종목명' in df_analysis.columns:
-            analysis_rows = filter_stock_rows(df_analysis, query, stock_name)
-            if not analysis_rows.empty:
-                found_analysis = True
-                for _, r in analysis_rows.iterrows():
-                    theme_name = r.get('테마명', '-')
-                    content = r.get('분석결과', '-')
-                    with st.expander(f"📌 {theme_name}", expanded=True):
-                        st.write(content)
-        
-        if not found_analysis:
+        for theme_name, content in profile.analysis:
+            with st.expander(f"📌 {theme_name}", expanded=True):
+                st.write(content)
+        
+        if not profile.analysis:
             st.caption("해당 종목의 상세 분석 데이터가 없습니다.")
             
         st.markdown("---")
         st.subheader("🔗 유사 종목 (같은 테마)")
         
-        similar_stocks = []
-        search_method = None
-        
-        # ========================================
-        # 1순위: 해시태그 매칭 + 상승률 혼합 점수
-        # ========================================
-        if df_themes is not None and theme_text and theme_text != '-' and not pd.isna(theme_text):
-            # 현재 종목의 해시태그들 추출
-            current_hashtags = set()
-            for tag in str(theme_text).split('#'):
-                tag = tag.strip()
-                if tag:
-                    current_hashtags.add(tag.lower())
-            
-            if current_hashtags:
-                # 다른 종목들과 공통 해시태그 개수 및 상승률 계산
-                similarity_scores = []
-                
-                for _, theme_row in df_themes.iterrows():
-                    other_key = get_row_stock_key(theme_row)
-                    if not other_key:
-                        other_key = resolve_stock_key_by_name(theme_row.get('종목명'))
-                    other_name = get_display_name(other_key) if other_key else clean_name(theme_row.get('종목명'))
-                    themes_str = theme_row.get('테마_전체', '')
-                    
-                    # 자기 자신 제외
-                    if other_key == query:
-                        continue
-                    
-                    if pd.isna(themes_str):
-                        continue
-                    
-                    # 해당 종목의 해시태그 추출
-                    other_hashtags = set()
-                    for tag in str(themes_str).split('#'):
-                        tag = tag.strip()
-                        if tag:
-                            other_hashtags.add(tag.lower())
-                    
-                    # 공통 해시태그 개수 계산
-                    common_count = len(current_hashtags & other_hashtags)
-                    
-                    if common_count > 0:
-                        # 해당 종목의 상승 데이터 분석 (종목정리 파일에서)
-                        stock_data = filter_stock_rows(df_sangcheon, other_key, other_name)
-                        max_rise = 0
-                        theme_matched_rise = 0  # 공통 테마 이슈로 상승한 최고 상승률
-                        theme_matched_count = 0  # 공통 테마 이슈로 상승한 횟수
-                        
-                        # 공통 해시태그 (검색용 키워드)
-                        common_hashtags = current_hashtags & other_hashtags
-                        
-                        if not stock_data.empty and '상승률' in stock_data.columns:
-                            for _, sr in stock_data.iterrows():
-                                rise_val, _ = convert_rise_rate(sr.get('상승률'))
-                                reason = sr.get('상승이유', '')
-                                
-                                if rise_val is not None:
-                                    max_rise = max(max_rise, rise_val)
-                                    
-                                    # 상승이유에 공통 테마 키워드가 포함되어 있는지 확인
-                                    if pd.notna(reason):
-                                        reason_lower = str(reason).lower()
-                                        for tag in common_hashtags:
-                                            # 해시태그에서 키워드 추출 (예: "양자암호" -> "양자", "암호")
-                                            keywords = [tag]
-                                            # 복합어 분리도 시도 (간단한 방식)
-                                            if len(tag) > 2:
-                                                keywords.append(tag[:2])  # 앞 2글자
-                                            
-                                            for kw in keywords:
-                                                if kw in reason_lower:
-                                                    theme_matched_rise = max(theme_matched_rise, rise_val)
-                                                    theme_matched_count += 1
-                                                    break
-                        
-                        # 개선된 혼합 점수 계산:
-                        # - 공통 테마 개수 × 10 (기본 관련성)
-                        # - 테마 매칭 상승률 × 2 (해당 테마 이슈로 오른 경우 가중치)
-                        # - 테마 매칭 횟수 × 5 (해당 테마로 여러 번 오른 경우 보너스)
-                        # - 최고 상승률 × 0.5 (전체 상승률은 보조적으로만)
-                        hybrid_score = (common_count * 10) + (theme_matched_rise * 2) + (theme_matched_count * 5) + (max_rise * 0.5)
-                        
-                        similarity_scores.append({
-                            '종목코드': other_key,
-                            '종목명': other_name,
-                            '공통개수': common_count,
-                            '최고상승률': max_rise,
-                            '테마상승률': theme_matched_rise,
-                            '테마상승횟수': theme_matched_count,
-                            '혼합점수': hybrid_score
-                        })
-                
-                # 혼합 점수 순으로 정렬
-                similarity_scores.sort(key=lambda x: x['혼합점수'], reverse=True)
-                similar_stocks = similarity_scores[:5]
-                
-                if similar_stocks:
-                    search_method = "hashtag"
-        
-        # ========================================
-        # 2순위: 종목정리_종목순 정렬.xlsx에서 테마 일치 (폴백)
-        # ========================================
-        if not similar_stocks:
-            row_theme = row.get('테마')
-            if row_theme and pd.notna(row_theme):
-                sims_df = df_sangcheon[df_sangcheon['테마'] == row_theme].copy()
-                sims_df = sims_df[sims_df['__stock_key'] != query]
-                sims_df = sims_df.drop_duplicates('__stock_key')
-                
-                # 2순위도 상승률 기준 정렬
-                fallback_scores = []
-                for other_key in sims_df['__stock_key'].dropna().unique():
-                    other_name = get_display_name(other_key)
-                    stock_data = filter_stock_rows(df_sangcheon, other_key, other_name)
-                    max_rise = 0
-                    if not stock_data.empty and '상승률' in stock_data.columns:
-                        for _, sr in stock_data.iterrows():
-                            rise_val, _ = convert_rise_rate(sr.get('상승률'))
-                            if rise_val is not None:
-                                max_rise = max(max_rise, rise_val)
-                    fallback_scores.append({'종목코드': other_key, '종목명': other_name, '최고상승률': max_rise, '혼합점수': max_rise})
-                
-                fallback_scores.sort(key=lambda x: x['최고상승률'], reverse=True)
-                similar_stocks = fallback_scores[:5]
-                
-                if similar_stocks:
-                    search_method = "theme"
+        # 1순위는 관련테마 해시태그 + 상승률 혼합 점수, 없으면 2순위로 같은 상천 테마 종목을 상승률 순으로 쓴다.
+        # 모든 종목의 결과를 원본 스냅샷 단위로 미리 계산해 두었으므로 여기서는 조회만 한다.
+        similar_stocks, search_method = load_similar_stock_table(
+            source_snapshot_key, df_themes, df_sangcheon, stock_profiles
+        ).lookup(query)
         
         # ========================================
         # 결과 표시
@@ -3,6 +3,7 @@ import glob
 import os
 import pickle
 import json
+import shutil
 import streamlit as st
 
 # ---------------------------------------------------------
@@ -75,6 +76,10 @@ def clear_disk_cache():
             os.remove(path)
         except Exception:
             pass
+
+    # 통합 검색 인덱스 스냅샷 폴더
+    for path in glob.glob(os.path.join(CACHE_DIR, "search_index_v*")):
+        shutil.rmtree(path, ignore_errors=True)
 
 # ---------------------------------------------------------
 # 유틸리티 함수
@@ -277,7 +282,7 @@ def _parse_excel(xl):
         final_sangcheon = pd.concat(sangcheon_list, ignore_index=True)
         if '날짜' in final_sangcheon.columns:
             final_sangcheon['날짜'] = pd.to_datetime(final_sangcheon['날짜'], errors='coerce')
-            final_sangcheon = final_sangcheon.sort_values('날짜', ascending=False)
+            final_sangcheon = final_sangcheon.sort_values('날짜', ascending=False, kind='stable')
     
     signal_df = pd.concat(search_sheet_list, ignore_index=True, sort=False) if search_sheet_list else None
 
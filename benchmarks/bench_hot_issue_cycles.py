@@ -0,0 +1,121 @@
+"""핫이슈 회차 번호 계산과 기간별 핫이슈 분석 시간을 실제 엑셀로 측정한다.
+
+'올해'와 전체 이력, 긴 직접 설정 기간, 5/20/60/120거래일 전환을 함께 잰다.
+저장소 루트에서 실행한다.
+
+    python -m benchmarks.bench_hot_issue_cycles
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+import time
+
+import pandas as pd
+
+from app_utils import _parse_excel
+from issue_analysis import (
+    HotIssueIndex,
+    TradingCalendar,
+    _assign_theme_cycles,
+    analyze_hot_issues,
+    append_theme_events,
+    build_theme_event_index,
+)
+from search_engine import load_keyword_aliases
+
+
+MAIN_WORKBOOK = Path("종목정리_종목순 정렬.xlsx")
+
+
+def _per_issue_cycles(events: pd.DataFrame, trading_days, max_trading_day_gap: int = 3) -> pd.DataFrame:
+    """비교 기준인 이슈별 반복문 방식. 거래일과 이벤트 날짜의 합집합 위치로 간격을 잰다."""
+    result = events.copy()
+    ordered = sorted(set(pd.DatetimeIndex(list(trading_days))) | set(pd.DatetimeIndex(result["날짜"])))
+    positions = {day: position for position, day in enumerate(ordered)}
+    cycle_values = pd.Series(index=result.index, dtype="int64")
+    for _, issue_rows in result.groupby("이슈", sort=False):
+        cycle_number = 1
+        previous_date = None
+        cycle_by_date: dict[pd.Timestamp, int] = {}
+        for raw_date in sorted(issue_rows["날짜"].unique()):
+            date = pd.Timestamp(raw_date)
+            if previous_date is not None and positions[date] - positions[previous_date] > max_trading_day_gap:
+                cycle_number += 1
+            cycle_by_date[date] = cycle_number
+            previous_date = date
+        cycle_values.loc[issue_rows.index] = issue_rows["날짜"].map(cycle_by_date).astype(int)
+    result["회차번호"] = cycle_values.astype(int)
+    return result
+
+
+def _timed(function, *args, repeat: int = 3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _report_daily_append(sangcheon: pd.DataFrame, calendar: TradingCalendar) -> None:
+    aliases = load_keyword_aliases()
+    dates = pd.to_datetime(sangcheon["날짜"], errors="coerce").dt.normalize()
+    earlier = (dates < calendar[-1]).to_numpy()
+    old_rows, new_rows = sangcheon.loc[earlier], sangcheon.loc[~earlier]
+    old_events = build_theme_event_index(old_rows, aliases)
+    rebuild_seconds, rebuilt = _timed(
+        lambda: HotIssueIndex(build_theme_event_index(sangcheon, aliases), calendar).daily_scores(), repeat=1
+    )
+    previous = HotIssueIndex(old_events, calendar.window(0, len(calendar) - 1))
+    previous.daily_scores()
+    started = time.perf_counter()
+    merged = append_theme_events(old_events, new_rows, aliases)
+    appended = previous.append(build_theme_event_index(new_rows, aliases), calendar).daily_scores()
+    append_seconds = time.perf_counter() - started
+    pd.testing.assert_frame_equal(merged, build_theme_event_index(sangcheon, aliases))
+    pd.testing.assert_frame_equal(appended.reindex(rebuilt.index), rebuilt, atol=1e-5)
+    print(
+        f"마지막 거래일 {len(new_rows):,}행 추가: 전체 재구성+일별 점수 {rebuild_seconds:.2f}s → "
+        f"추가 {append_seconds:.3f}s"
+    )
+
+
+def main() -> None:
+    sangcheon, _, error = _parse_excel(pd.ExcelFile(MAIN_WORKBOOK, engine="openpyxl"))
+    if error:
+        raise SystemExit(error)
+    events = build_theme_event_index(sangcheon, load_keyword_aliases())
+    calendar = TradingCalendar(pd.to_datetime(sangcheon["날짜"], errors="coerce"))
+    year_start = next(day for day in calendar if day.year == calendar[-1].year)
+    periods = {
+        "올해": (year_start, calendar[-1]),
+        "전체 이력": (calendar[0], calendar[-1]),
+        "직접 설정 250거래일": (calendar[max(0, len(calendar) - 250)], calendar[-1]),
+        "직접 설정 500거래일": (calendar[max(0, len(calendar) - 500)], calendar[-1]),
+    }
+    print(f"테마 이벤트: {len(events):,}건 · 이슈 {events['이슈'].nunique():,}개 · 거래일 {len(calendar):,}일")
+    index_seconds, hot_index = _timed(HotIssueIndex, events, calendar)
+    print(f"이슈×거래일 누적합 인덱스 생성: {index_seconds:.3f}s")
+    _report_daily_append(sangcheon, calendar)
+    for count in [5, 20, 60, 120]:
+        periods[f"최근 {count}거래일"] = (calendar[max(0, len(calendar) - count)], calendar[-1])
+
+    for label, (start, end) in periods.items():
+        days = calendar.between(start, end)
+        period_events = events[events["날짜"].between(start, end)]
+        loop_seconds, expected = _timed(_per_issue_cycles, period_events, days, repeat=1)
+        vector_seconds, actual = _timed(_assign_theme_cycles, period_events, days)
+        pd.testing.assert_frame_equal(expected, actual)
+        rebuilt_seconds, expected = _timed(analyze_hot_issues, events, calendar, start, end, True, 2, repeat=1)
+        indexed_seconds, actual = _timed(analyze_hot_issues, hot_index, calendar, start, end, True, 2)
+        pd.testing.assert_frame_equal(expected[0], actual[0])
+        print(
+            f"{label}: 이벤트 {len(period_events):,}건 · 회차 번호 {loop_seconds:.3f}s → {vector_seconds:.4f}s "
+            f"({loop_seconds / vector_seconds:.0f}배) · 핫이슈 분석 {rebuilt_seconds:.2f}s → 인덱스 {indexed_seconds:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
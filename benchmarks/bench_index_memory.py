@@ -0,0 +1,62 @@
+"""통합 검색 인덱스의 열별 메모리를 압축 전후로 비교한다.
+
+저장소 루트에서 실행한다.
+
+    python -m benchmarks.bench_index_memory
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+import time
+
+import pandas as pd
+
+from app_utils import (
+    _parse_excel,
+    load_analysis_data,
+    load_company_overview,
+    load_name_aliases,
+    load_stock_code_map,
+    load_theme_data,
+)
+from search_engine import EVIDENCE_SPAN_COLUMN, _expand_documents, build_search_index
+
+
+MAIN_WORKBOOK = Path("종목정리_종목순 정렬.xlsx")
+
+
+def main() -> None:
+    sangcheon, signal, error = _parse_excel(pd.ExcelFile(MAIN_WORKBOOK, engine="openpyxl"))
+    if error:
+        raise SystemExit(error)
+    started = time.perf_counter()
+    compact = build_search_index(
+        sangcheon,
+        signal,
+        load_theme_data(),
+        load_company_overview(),
+        load_analysis_data(),
+        load_name_aliases(),
+        load_stock_code_map(),
+    )
+    build_seconds = time.perf_counter() - started
+    expanded = _expand_documents(compact)
+
+    before = expanded.memory_usage(deep=True, index=False)
+    after = compact.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({"압축 전(MB)": before / 1e6, "압축 후(MB)": after / 1e6}).fillna(0.0)
+    report.loc["합계"] = report.sum()
+    print(f"문서 수: {len(compact):,} · 인덱스 생성 {build_seconds:.2f}s")
+    print(report.round(2).to_string())
+    spans = int((compact[EVIDENCE_SPAN_COLUMN] != 0).sum())
+    fallback = int((compact["근거문장"].isna() & (compact[EVIDENCE_SPAN_COLUMN] == 0)).sum())
+    print(
+        f"근거문장: 본문 구간 {spans:,}행 · 본문 대체 {fallback:,}행 · "
+        f"원문 보관 {int(compact['근거문장'].notna().sum()):,}행"
+    )
+    print(f"절감: {(1 - after.sum() / before.sum()) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
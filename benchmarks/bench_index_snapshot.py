@@ -0,0 +1,88 @@
+"""검색 인덱스 콜드 빌드와 디스크 스냅샷 로드 시간을 실제 엑셀로 비교한다.
+
+저장소 루트에서 실행한다.
+
+    python -m benchmarks.bench_index_snapshot
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+import tempfile
+import time
+
+import pandas as pd
+
+import search_engine
+from app_utils import (
+    _parse_excel,
+    load_analysis_data,
+    load_company_overview,
+    load_name_aliases,
+    load_stock_code_map,
+    load_theme_data,
+)
+from search_engine import (
+    build_search_index,
+    build_term_index,
+    compute_source_fingerprint,
+    load_index_snapshot,
+    save_index_snapshot,
+    search_documents,
+)
+
+
+MAIN_WORKBOOK = Path("종목정리_종목순 정렬.xlsx")
+STARTUP_TARGET_SECONDS = 0.5
+
+
+def main() -> None:
+    started = time.perf_counter()
+    sangcheon, signal, error = _parse_excel(pd.ExcelFile(MAIN_WORKBOOK, engine="openpyxl"))
+    if error:
+        raise SystemExit(error)
+    sources = (
+        sangcheon,
+        signal,
+        load_theme_data(),
+        load_company_overview(),
+        load_analysis_data(),
+        load_name_aliases(),
+        load_stock_code_map(),
+    )
+    excel_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = build_search_index(*sources)
+    term_index = build_term_index(index)
+    build_seconds = time.perf_counter() - started
+
+    fingerprint = compute_source_fingerprint([MAIN_WORKBOOK, "name_aliases.json", "stock_code_map.json"])
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        save_index_snapshot(directory, fingerprint, index, term_index)
+        save_seconds = time.perf_counter() - started
+
+        search_engine._file_digests.clear()
+        started = time.perf_counter()
+        fingerprint = compute_source_fingerprint([MAIN_WORKBOOK, "name_aliases.json", "stock_code_map.json"])
+        loaded_index, loaded_terms = load_index_snapshot(directory, fingerprint)
+        load_seconds = time.perf_counter() - started
+
+        for query in ["HBM", "원전", "삼성전자"]:
+            expected, _ = search_documents(index, query, term_index=term_index)
+            actual, _ = search_documents(loaded_index, query, term_index=loaded_terms)
+            pd.testing.assert_frame_equal(actual, expected)
+
+    print(f"문서 수: {len(index):,}")
+    print(f"엑셀 파싱: {excel_seconds:.2f}s")
+    print(f"콜드 빌드(문서+n-gram): {build_seconds:.2f}s, 스냅샷 저장: {save_seconds:.2f}s")
+    status = "통과" if load_seconds <= STARTUP_TARGET_SECONDS else "초과"
+    print(
+        f"스냅샷 로드(키 계산 포함): {load_seconds:.3f}s "
+        f"(목표 {STARTUP_TARGET_SECONDS:.1f}s {status}, 빌드 대비 {build_seconds / load_seconds:.1f}배)"
+    )
+
+
+if __name__ == "__main__":
+    main()
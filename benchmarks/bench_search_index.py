@@ -0,0 +1,119 @@
+"""통합 검색 인덱스 생성 시간을 실제 엑셀로 측정한다.
+
+저장소 루트에서 실행한다.
+
+    python -m benchmarks.bench_search_index
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+import time
+
+import pandas as pd
+
+from app_utils import (
+    _parse_excel,
+    convert_rise_rate,
+    load_analysis_data,
+    load_company_overview,
+    load_name_aliases,
+    load_stock_code_map,
+    load_theme_data,
+)
+import search_engine
+from search_engine import DOCUMENT_COLUMNS, _clean_text, build_search_index
+
+
+MAIN_WORKBOOK = Path("종목정리_종목순 정렬.xlsx")
+
+
+def _rowwise_make_documents(
+    frame, source, text_columns, evidence_columns, aliases_by_key, dynamic_source=False
+):
+    """비교 기준인 iterrows 기반 문서 생성 방식."""
+    if frame is None or frame.empty or "종목명" not in frame.columns:
+        return pd.DataFrame(columns=DOCUMENT_COLUMNS)
+
+    available_text = [column for column in text_columns if column in frame.columns]
+    available_evidence = [column for column in evidence_columns if column in frame.columns]
+    documents = []
+    for _, row in frame.iterrows():
+        name = _clean_text(row.get("종목명"))
+        stock_key = (
+            _clean_text(row.get("__stock_key"))
+            or search_engine.normalize_stock_code(row.get("종목코드"))
+            or name
+        )
+        if not stock_key or not name:
+            continue
+        parts = [f"종목키: {stock_key}"]
+        used_fields = ["종목키"]
+        for column in available_text:
+            value = _clean_text(row.get(column))
+            if value:
+                parts.append(f"{column}: {value}")
+                used_fields.append(column)
+        if aliases_by_key.get(stock_key):
+            parts.append(f"구 사명·별칭: {' '.join(aliases_by_key[stock_key])}")
+        evidence = [
+            _clean_text(row.get(column))
+            for column in available_evidence
+            if _clean_text(row.get(column))
+        ]
+        row_source = _clean_text(row.get("__source")) if dynamic_source else source
+        documents.append(
+            {
+                "종목키": stock_key,
+                "종목명": name,
+                "날짜": pd.to_datetime(row.get("날짜"), errors="coerce"),
+                "출처": row_source or source,
+                "상승률": convert_rise_rate(row.get("상승률"))[0],
+                "검색본문": "\n".join(parts),
+                "근거문장": "\n".join(evidence) or "\n".join(parts),
+                "검색필드": ", ".join(used_fields),
+            }
+        )
+    return pd.DataFrame.from_records(documents, columns=DOCUMENT_COLUMNS)
+
+
+def _timed(function, *args, repeat: int = 3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    sangcheon, signal, error = _parse_excel(pd.ExcelFile(MAIN_WORKBOOK, engine="openpyxl"))
+    if error:
+        raise SystemExit(error)
+    sources = (
+        sangcheon,
+        signal,
+        load_theme_data(),
+        load_company_overview(),
+        load_analysis_data(),
+        load_name_aliases(),
+        load_stock_code_map(),
+    )
+
+    columnar_seconds, columnar = _timed(build_search_index, *sources)
+    columnar_builder = search_engine._make_documents
+    search_engine._make_documents = _rowwise_make_documents
+    try:
+        rowwise_seconds, rowwise = _timed(build_search_index, *sources, repeat=1)
+    finally:
+        search_engine._make_documents = columnar_builder
+
+    pd.testing.assert_frame_equal(columnar, rowwise)
+    print(f"문서 수: {len(columnar):,}")
+    print(f"iterrows 기준: {rowwise_seconds:.2f}s")
+    print(f"열 단위 생성: {columnar_seconds:.2f}s ({rowwise_seconds / columnar_seconds:.1f}배)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""종목 검색 자동완성의 초성·자모 검색 지연을 stock_code_map.json의 전체 종목으로 측정한다.
+
+저장소 루트에서 실행한다.
+
+    python -m benchmarks.bench_stock_search
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+import numpy as np
+
+from app_utils import MAX_SEARCH_RESULTS, load_name_aliases, load_stock_code_map, normalize_stock_code
+from stock_search import build_stock_typeahead, choseong, decompose_jamo, normalize_search_text
+
+
+QUERY_SAMPLE = 500
+LOOKUP_TARGET_MS = 1.0
+
+
+def _stock_entries() -> list[tuple[str, list[str]]]:
+    """종목코드별 (코드, 이름들). 구 사명은 현재 사명의 코드에 붙인다."""
+    code_map = load_stock_code_map()
+    names_by_code: dict[str, set[str]] = {}
+    for name, code in code_map.items():
+        names_by_code.setdefault(normalize_stock_code(code), set()).add(str(name).strip())
+    for old_name, new_name in load_name_aliases().items():
+        code = normalize_stock_code(code_map.get(new_name, "")) or normalize_stock_code(code_map.get(old_name, ""))
+        if code:
+            names_by_code.setdefault(code, set()).update([str(old_name).strip(), str(new_name).strip()])
+    names_by_code.pop("", None)
+    return [(code, sorted(names)) for code, names in sorted(names_by_code.items())]
+
+
+def _sample_queries(names: list[str], rng: random.Random) -> dict[str, list[str]]:
+    """실제 종목명에서 만든 검색어 종류별 표본"""
+    hangul_names = [name for name in names if decompose_jamo(name) != name and len(name) >= 3]
+    queries: dict[str, list[str]] = {
+        "초성 접두": [],
+        "초성 중간": [],
+        "자모 치는 중": [],
+        "글자 접두": [],
+        "글자 중간": [],
+    }
+    for name in rng.sample(hangul_names, min(QUERY_SAMPLE, len(hangul_names))):
+        initials = choseong(name.lower())
+        queries["초성 접두"].append(initials[: rng.randint(2, 4)])
+        start = rng.randint(1, len(initials) - 2)
+        queries["초성 중간"].append(initials[start:start + 2])
+        # 마지막 글자의 초성만 친 상태 (예: "삼성전ㅈ")
+        queries["자모 치는 중"].append(name[:-1] + decompose_jamo(name[-1])[0])
+        queries["글자 접두"].append(name[: rng.randint(1, len(name))])
+        queries["글자 중간"].append(name[1:3])
+    return queries
+
+
+def _scan(entries: list[tuple[str, list[str]]], query: str) -> list[str]:
+    """비교 기준인 검색할 때마다 모든 이름을 초성·자모로 푸는 방식 (일치 여부만 본다)"""
+    query = normalize_search_text(query)
+    sound_query = decompose_jamo(query)
+    matches = []
+    for code, names in entries:
+        for name in names:
+            term = normalize_search_text(name)
+            if query in term or sound_query in decompose_jamo(term) or sound_query in choseong(term):
+                matches.append(code)
+                break
+    return matches
+
+
+def main() -> None:
+    entries = _stock_entries()
+    started = time.perf_counter()
+    typeahead = build_stock_typeahead(entries)
+    build_seconds = time.perf_counter() - started
+
+    rng = random.Random(0)
+    queries = _sample_queries([name for _, names in entries for name in names], rng)
+    print(f"종목 수: {len(entries):,}, 검색어 수: {len(typeahead.literal.terms):,}")
+    print(f"색인 빌드(글자·자모·초성): {build_seconds * 1000:.0f}ms")
+
+    worst_p99 = 0.0
+    for kind, kind_queries in queries.items():
+        latencies = []
+        for query in kind_queries:
+            started = time.perf_counter()
+            result = typeahead.search(query, limit=MAX_SEARCH_RESULTS)
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert result.keys, query
+        p99 = float(np.percentile(latencies, 99))
+        worst_p99 = max(worst_p99, p99)
+        print(f"{kind}: 평균 {np.mean(latencies):.3f}ms, p50 {np.median(latencies):.3f}ms, p99 {p99:.3f}ms")
+
+    scan_queries = [query for kind_queries in queries.values() for query in kind_queries[:20]]
+    started = time.perf_counter()
+    for query in scan_queries:
+        _scan(entries, query)
+    scan_ms = (time.perf_counter() - started) * 1000 / len(scan_queries)
+    print(f"비교: 매번 전체 이름 분해 후 스캔 평균 {scan_ms:.2f}ms")
+
+    status = "통과" if worst_p99 <= LOOKUP_TARGET_MS else "초과"
+    print(f"최악 p99 {worst_p99:.3f}ms (목표 {LOOKUP_TARGET_MS:.1f}ms {status})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
+import bisect
+from dataclasses import dataclass
+from itertools import chain
 import math
 import re
+import threading
 from typing import Iterable, Mapping, Sequence
+import uuid
 
+import numpy as np
 import pandas as pd
 
 from app_utils import LIMIT_UP_THRESHOLD, convert_rise_rate, normalize_stock_code
+from search_engine import _column_or_none, _map_unique
 
 
 EVENT_COLUMNS = [
@@ -29,7 +36,21 @@ DEFAULT_THEME_CANONICAL = {
     "메가 프로젝트": "메가프로젝트",
     "인공지능": "AI",
 }
+HOT_TREND_WINDOW = 20
+# 일별 핫점수를 훑을 때 한 번에 계산하는 거래일 열 수. 중간 배열이 이슈×(열+window) 크기로 묶인다.
+DAILY_SCORE_BLOCK_COLUMNS = 64
+# 핫이슈 기간 프리셋과 거래일 수. '올해'는 마지막 거래일이 속한 해의 첫 거래일부터다.
+HOT_ISSUE_PRESETS: dict[str, int | None] = {
+    "최근 5거래일": 5,
+    "최근 20거래일": 20,
+    "최근 60거래일": 60,
+    "최근 120거래일": 120,
+    "올해": None,
+}
+REACTION_COLOR_BINS = 10
 THEME_SPLITTER = re.compile(r"[#,/|;>\n\r]+")
+WHITESPACE = re.compile(r"\s+")
+PARENTHETICAL = re.compile(r"\(([^()]*)\)")
 
 
 def prepare_issue_events(search_results: pd.DataFrame) -> pd.DataFrame:
@@ -63,22 +84,125 @@ def prepare_issue_events(search_results: pd.DataFrame) -> pd.DataFrame:
     return events[EVENT_COLUMNS].reset_index(drop=True)
 
 
-def _trading_day_positions(
-    trading_days: Iterable,
-    matched_dates: Iterable,
-) -> dict[pd.Timestamp, int]:
-    all_days = pd.to_datetime(pd.Series(list(trading_days)), errors="coerce").dropna().dt.normalize()
-    match_days = pd.to_datetime(pd.Series(list(matched_dates)), errors="coerce").dropna().dt.normalize()
-    ordered = sorted(set(all_days.tolist()) | set(match_days.tolist()))
-    return {day: position for position, day in enumerate(ordered)}
+def _normalized_days(values) -> np.ndarray:
+    """날짜 값들을 자정 기준 datetime64[ns] 배열로 바꾸고 결측은 버린다."""
+    days = pd.to_datetime(pd.Series(list(values), dtype=object), errors="coerce").dropna()
+    return days.dt.normalize().to_numpy(dtype="datetime64[ns]")
+
+
+class TradingCalendar:
+    """정렬된 거래일 배열. 날짜→거래일 위치를 searchsorted로 찾는다.
+
+    한 번 만들어 회차 계산과 기간별 핫이슈 분석에 함께 넘긴다.
+    """
+
+    def __init__(self, trading_days: Iterable = ()) -> None:
+        days = np.unique(_normalized_days(trading_days))
+        self.days = days
+        self.token = hash(days.tobytes())
+
+    @classmethod
+    def ensure(cls, trading_days) -> "TradingCalendar":
+        return trading_days if isinstance(trading_days, cls) else cls(trading_days)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __iter__(self):
+        return iter(pd.DatetimeIndex(self.days))
+
+    def __getitem__(self, position) -> pd.Timestamp:
+        return pd.Timestamp(self.days[position])
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, TradingCalendar) and np.array_equal(self.days, other.days)
+
+    def __hash__(self) -> int:
+        return self.token
+
+    def positions(self, dates) -> np.ndarray:
+        """각 날짜 이하인 마지막 거래일의 위치. 거래일이면 그 날의 위치이고, 첫 거래일 이전이면 -1이다."""
+        values = np.asarray(dates, dtype="datetime64[ns]")
+        return np.searchsorted(self.days, values, side="right") - 1
+
+    def contains(self, dates) -> np.ndarray:
+        values = np.asarray(dates, dtype="datetime64[ns]")
+        positions = np.searchsorted(self.days, values, side="left")
+        found = positions < len(self.days)
+        found[found] = self.days[positions[found]] == values[found]
+        return found
+
+    def between(self, start, end) -> "TradingCalendar":
+        """start~end(양끝 포함) 거래일만 담은 달력."""
+        left = np.searchsorted(self.days, np.datetime64(pd.Timestamp(start), "ns"), side="left")
+        right = np.searchsorted(self.days, np.datetime64(pd.Timestamp(end), "ns"), side="right")
+        return self._from_sorted(self.days[left:right])
+
+    def window(self, start: int, stop: int) -> "TradingCalendar":
+        """위치 start 이상 stop 미만의 거래일만 담은 달력."""
+        return self._from_sorted(self.days[max(0, start):max(0, stop)])
+
+    def including(self, dates) -> "TradingCalendar":
+        """달력에 없는 날짜를 거래일처럼 끼워 넣은 달력. 모두 거래일이면 자신을 그대로 돌려준다."""
+        values = np.asarray(dates, dtype="datetime64[ns]")
+        values = values[~np.isnat(values)]
+        missing = values[~self.contains(values)]
+        if not missing.size:
+            return self
+        return self._from_sorted(np.union1d(self.days, missing))
+
+    @classmethod
+    def _from_sorted(cls, days: np.ndarray) -> "TradingCalendar":
+        calendar = cls.__new__(cls)
+        calendar.days = days
+        calendar.token = hash(days.tobytes())
+        return calendar
+
+    def gaps(self, sorted_dates: np.ndarray) -> np.ndarray:
+        """정렬된 고유 날짜의 인접 간 거래일 간격.
+
+        달력에 없는 날짜도 거래일 하나로 끼워 넣은 것처럼 센다.
+        """
+        values = np.asarray(sorted_dates, dtype="datetime64[ns]")
+        if values.size < 2:
+            return np.zeros(0, dtype=np.int64)
+        passed = np.searchsorted(self.days, values, side="right")
+        return np.diff(passed) + ~self.contains(values[1:])
+
+    def cycle_numbers(
+        self,
+        sorted_dates: np.ndarray,
+        max_trading_day_gap: int,
+        groups: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """정렬된 고유 날짜별 회차 번호. 간격이 max_trading_day_gap을 넘을 때마다 1씩 늘어난다.
+
+        groups를 주면 (그룹, 날짜) 순으로 정렬된 고유 쌍으로 보고 그룹마다 1회차부터 센다.
+        """
+        values = np.asarray(sorted_dates, dtype="datetime64[ns]")
+        if values.size == 0:
+            return np.zeros(0, dtype=np.int64)
+        breaks = self.gaps(values) > max_trading_day_gap
+        if groups is None:
+            return np.concatenate([[1], 1 + np.cumsum(breaks)]).astype(np.int64)
+
+        groups = np.asarray(groups)
+        group_starts = np.flatnonzero(np.concatenate([[True], groups[1:] != groups[:-1]]))
+        breaks[group_starts[1:] - 1] = False
+        counted = np.concatenate([[0], np.cumsum(breaks)])
+        start_counts = np.repeat(counted[group_starts], np.diff(np.append(group_starts, values.size)))
+        return (1 + counted - start_counts).astype(np.int64)
 
 
 def group_issue_cycles(
     search_results: pd.DataFrame,
-    trading_days: Iterable,
+    trading_days: TradingCalendar | Iterable,
     max_trading_day_gap: int = 3,
 ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    """매칭 날짜 간격이 지정 거래일 이내이면 하나의 이슈 회차로 묶는다."""
+    """매칭 날짜 간격이 지정 거래일 이내이면 하나의 이슈 회차로 묶는다.
+
+    trading_days에는 거래일 목록이나 미리 만든 TradingCalendar를 넘긴다.
+    """
     events = prepare_issue_events(search_results)
     if events.empty:
         return (
@@ -87,21 +211,11 @@ def group_issue_cycles(
             events,
         )
 
-    positions = _trading_day_positions(trading_days, events["날짜"])
-    unique_dates = sorted(events["날짜"].dropna().unique())
-    cycle_for_date: dict[pd.Timestamp, int] = {}
-    cycle_number = 1
-    previous_date = None
-    for date_value in unique_dates:
-        date = pd.Timestamp(date_value).normalize()
-        if previous_date is not None:
-            gap = positions[date] - positions[previous_date]
-            if gap > max_trading_day_gap:
-                cycle_number += 1
-        cycle_for_date[date] = cycle_number
-        previous_date = date
-
-    events["회차번호"] = events["날짜"].map(cycle_for_date)
+    calendar = TradingCalendar.ensure(trading_days)
+    event_dates = events["날짜"].to_numpy(dtype="datetime64[ns]")
+    unique_dates = np.unique(event_dates)
+    cycle_numbers = calendar.cycle_numbers(unique_dates, max_trading_day_gap)
+    events["회차번호"] = cycle_numbers[np.searchsorted(unique_dates, event_dates)]
     events["회차"] = events["회차번호"].map(lambda value: f"{int(value)}회차")
 
     member_rows: list[pd.DataFrame] = []
@@ -154,10 +268,14 @@ def group_issue_cycles(
     return summaries, members, events.drop(columns=["회차번호"], errors="ignore")
 
 
+REPETITION_ANCHORS = (0.0, 5.0, 12.0, 18.0)
+REPETITION_MAX = 25.0
+
+
 def calculate_repetition_score(cycle_count: int) -> float:
     """서로 다른 회차 수를 25점으로 변환한다."""
-    anchors = {0: 0.0, 1: 5.0, 2: 12.0, 3: 18.0}
-    return anchors.get(int(cycle_count), 25.0)
+    count = int(cycle_count)
+    return REPETITION_ANCHORS[count] if 0 <= count < len(REPETITION_ANCHORS) else REPETITION_MAX
 
 
 def calculate_leadership_score(ranks: Iterable[float]) -> float:
@@ -175,13 +293,117 @@ def calculate_recency_score(last_date, reference_date, half_life_days: int = 365
     return 5.0 * math.pow(0.5, age / half_life_days)
 
 
+def _group_sums(codes: np.ndarray, values: np.ndarray, group_count: int) -> tuple[np.ndarray, np.ndarray]:
+    """그룹별 합계와 개수. 행 순서대로 왼쪽부터 더해 파이썬 sum과 같은 값을 낸다.
+
+    그룹×순번 행렬에 값을 채우고 행 방향 누적합의 마지막 열을 취한다.
+    """
+    counts = np.bincount(codes, minlength=group_count)
+    if not len(codes):
+        return np.zeros(group_count), counts
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.cumsum(counts) - counts
+    padded = np.zeros((group_count, int(counts.max())))
+    padded[sorted_codes, np.arange(len(codes)) - starts[sorted_codes]] = values[order]
+    return np.cumsum(padded, axis=1)[:, -1], counts
+
+
+def _member_statistics(
+    cycle_members: pd.DataFrame | None,
+    stock_keys: pd.Index,
+    summary_by_cycle: Mapping[object, object],
+) -> pd.DataFrame:
+    """종목별 회차 구성원 통계를 종목키 순서대로 한 번의 그룹 집계로 구한다."""
+    group_count = len(stock_keys)
+    statistics = pd.DataFrame(
+        {
+            "부각회차수": np.zeros(group_count, dtype=np.int64),
+            "주도성점수": np.zeros(group_count),
+            "확산점수": np.zeros(group_count),
+            "대장횟수": np.zeros(group_count, dtype=np.int64),
+            "평균순위": np.full(group_count, np.nan),
+            "최고상승률": np.full(group_count, np.nan),
+            "최근부각일": [pd.NaT] * group_count,
+        }
+    )
+    if cycle_members is None or cycle_members.empty:
+        return statistics
+
+    codes = stock_keys.get_indexer(cycle_members["종목키"])
+    members = cycle_members[codes >= 0]
+    codes = codes[codes >= 0]
+    if not len(codes):
+        return statistics
+
+    cycles = members["회차"].reset_index(drop=True)
+    first_cycle = ~pd.DataFrame({"code": codes, "회차": cycles}).duplicated()
+    cycle_codes = codes[first_cycle.to_numpy()]
+    distinct_cycles = cycles[first_cycle]
+    cycle_counts = np.bincount(cycle_codes[distinct_cycles.notna().to_numpy()], minlength=group_count)
+    concurrent = (
+        distinct_cycles.map(summary_by_cycle).fillna(1).to_numpy(dtype=float)
+        if summary_by_cycle
+        else np.ones(len(distinct_cycles))
+    )
+    diffusion_sums, diffusion_counts = _group_sums(
+        cycle_codes, np.minimum(10.0, np.maximum(0, concurrent - 1) / 4 * 10.0), group_count
+    )
+
+    ranks = pd.to_numeric(members["회차내순위"], errors="coerce").to_numpy(dtype=float)
+    valid = ~np.isnan(ranks) & (ranks > 0)
+    inverse_sums, inverse_counts = _group_sums(codes[valid], 1.0 / ranks[valid], group_count)
+
+    grouped = pd.DataFrame(
+        {
+            "rank": ranks,
+            "leader": ranks == 1,
+            "rise": pd.to_numeric(members["상승률"], errors="coerce").to_numpy(dtype=float),
+            "date": pd.to_datetime(members["날짜"], errors="coerce"),
+        }
+    ).groupby(codes)
+    every_stock = range(group_count)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        statistics["부각회차수"] = cycle_counts
+        statistics["주도성점수"] = np.where(
+            inverse_counts > 0, np.minimum(20.0, 20.0 * inverse_sums / inverse_counts), 0.0
+        )
+        statistics["확산점수"] = np.where(
+            diffusion_counts > 0, diffusion_sums / diffusion_counts, 0.0
+        )
+    statistics["대장횟수"] = grouped["leader"].sum().reindex(every_stock, fill_value=0).to_numpy()
+    statistics["평균순위"] = grouped["rank"].mean().reindex(every_stock).to_numpy()
+    statistics["최고상승률"] = grouped["rise"].max().reindex(every_stock).to_numpy()
+    statistics["최근부각일"] = grouped["date"].max().reindex(every_stock).to_numpy()
+    return statistics
+
+
+def _recency_scores(last_dates: pd.Series, reference_date, half_life_days: int = 365) -> list[float]:
+    """calculate_recency_score를 종목 전체에 적용한다. 경과일은 한 번에 계산한다."""
+    if pd.isna(reference_date):
+        return [0.0] * len(last_dates)
+    ages = (pd.Timestamp(reference_date) - last_dates).dt.days
+    return [
+        0.0 if pd.isna(age) else 5.0 * math.pow(0.5, max(0, int(age)) / half_life_days)
+        for age in ages
+    ]
+
+
+def _rounded(values) -> list[float | None]:
+    return [round(value, 2) if pd.notna(value) else None for value in values]
+
+
 def score_stocks(
     search_results: pd.DataFrame,
     cycle_summaries: pd.DataFrame,
     cycle_members: pd.DataFrame,
     reference_date=None,
 ) -> pd.DataFrame:
-    """관련도 40·반복 25·주도 20·확산 10·최근 5점으로 평가한다."""
+    """관련도 40·반복 25·주도 20·확산 10·최근 5점으로 평가한다.
+
+    종목별 점수 요소는 검색 결과와 회차 구성원을 각각 한 번씩 종목키로 묶어 계산한다.
+    """
     if search_results is None or search_results.empty:
         return pd.DataFrame(
             columns=["순위", "종목키", "종목명", "종합점수", "관련도", "부각회차수"]
@@ -196,61 +418,52 @@ def score_stocks(
         if cycle_summaries is not None and not cycle_summaries.empty
         else {}
     )
-    rows: list[dict[str, object]] = []
-    for stock_key, matches in search_results.groupby("종목키", sort=False):
-        stock_name = matches["종목명"].dropna().astype(str).iloc[0]
-        max_relevance = float(pd.to_numeric(matches["관련도점수"], errors="coerce").fillna(0).max())
-        match_count = int(len(matches))
-        relevance_score = min(40.0, max_relevance * 0.36 + min(match_count, 4))
-
-        if cycle_members is not None and not cycle_members.empty:
-            member_rows = cycle_members[cycle_members["종목키"] == stock_key].copy()
-        else:
-            member_rows = pd.DataFrame()
-        cycle_count = int(member_rows["회차"].nunique()) if not member_rows.empty else 0
-        repetition_score = calculate_repetition_score(cycle_count)
-        ranks = member_rows["회차내순위"].tolist() if not member_rows.empty else []
-        leadership_score = calculate_leadership_score(ranks)
-
-        if not member_rows.empty:
-            diffusion_values = [
-                min(10.0, max(0, summary_by_cycle.get(cycle, 1) - 1) / 4 * 10.0)
-                for cycle in member_rows["회차"].drop_duplicates()
-            ]
-            diffusion_score = sum(diffusion_values) / len(diffusion_values)
-            last_date = pd.to_datetime(member_rows["날짜"], errors="coerce").max()
-            highest_rise = float(pd.to_numeric(member_rows["상승률"], errors="coerce").max())
-            leader_count = int((member_rows["회차내순위"] == 1).sum())
-            average_rank = float(member_rows["회차내순위"].mean())
-        else:
-            diffusion_score = 0.0
-            last_date = pd.NaT
-            highest_rise = float("nan")
-            leader_count = 0
-            average_rank = float("nan")
-
-        recency_score = calculate_recency_score(last_date, reference_date)
-        total = relevance_score + repetition_score + leadership_score + diffusion_score + recency_score
-        rows.append(
-            {
-                "종목키": stock_key,
-                "종목명": stock_name,
-                "종합점수": round(total, 2),
-                "관련도": round(relevance_score, 2),
-                "반복성점수": round(repetition_score, 2),
-                "주도성점수": round(leadership_score, 2),
-                "확산점수": round(diffusion_score, 2),
-                "최근성점수": round(recency_score, 2),
-                "부각회차수": cycle_count,
-                "대장횟수": leader_count,
-                "평균순위": round(average_rank, 2) if pd.notna(average_rank) else None,
-                "최고상승률": round(highest_rise, 2) if pd.notna(highest_rise) else None,
-                "최근부각일": last_date,
-                "매칭건수": match_count,
-            }
-        )
-
-    ranking = pd.DataFrame(rows).sort_values(
+    grouped = search_results.groupby("종목키", sort=False)
+    match_counts = grouped.size()
+    stock_keys = match_counts.index
+    names = grouped["종목명"].first()
+    max_relevance = (
+        pd.to_numeric(search_results["관련도점수"], errors="coerce")
+        .fillna(0)
+        .groupby(search_results["종목키"], sort=False)
+        .max()
+        .to_numpy(dtype=float)
+    )
+    match_counts = match_counts.to_numpy()
+    relevance = np.minimum(40.0, max_relevance * 0.36 + np.minimum(match_counts, 4))
+
+    statistics = _member_statistics(cycle_members, stock_keys, summary_by_cycle)
+    cycle_counts = statistics["부각회차수"].to_numpy()
+    anchors = np.array(REPETITION_ANCHORS)
+    repetition = np.where(
+        cycle_counts < len(anchors),
+        anchors[np.minimum(cycle_counts, len(anchors) - 1)],
+        REPETITION_MAX,
+    )
+    leadership = statistics["주도성점수"].to_numpy()
+    diffusion = statistics["확산점수"].to_numpy()
+    last_dates = pd.Series(statistics["최근부각일"].tolist())
+    recency = np.array(_recency_scores(last_dates, reference_date))
+    total = relevance + repetition + leadership + diffusion + recency
+
+    ranking = pd.DataFrame(
+        {
+            "종목키": stock_keys.tolist(),
+            "종목명": [str(name) for name in names],
+            "종합점수": _rounded(total.tolist()),
+            "관련도": _rounded(relevance.tolist()),
+            "반복성점수": _rounded(repetition.tolist()),
+            "주도성점수": _rounded(leadership.tolist()),
+            "확산점수": _rounded(diffusion.tolist()),
+            "최근성점수": _rounded(recency.tolist()),
+            "부각회차수": cycle_counts.tolist(),
+            "대장횟수": statistics["대장횟수"].tolist(),
+            "평균순위": _rounded(statistics["평균순위"].tolist()),
+            "최고상승률": _rounded(statistics["최고상승률"].tolist()),
+            "최근부각일": last_dates.tolist(),
+            "매칭건수": match_counts.tolist(),
+        }
+    ).sort_values(
         ["종합점수", "관련도", "최근부각일"],
         ascending=[False, False, False],
         na_position="last",
@@ -259,25 +472,131 @@ def score_stocks(
     return ranking
 
 
+def stock_labels(frame: pd.DataFrame) -> list[str]:
+    """반응 매트릭스 행 이름인 '종목명 (종목키)' 목록."""
+    if frame is None or frame.empty:
+        return []
+    return [f"{name} ({key})" for name, key in zip(frame["종목명"], frame["종목키"])]
+
+
+@dataclass(frozen=True)
+class ReactionMatrix:
+    """종목×이슈 회차 반응 매트릭스의 희소 표현.
+
+    값이 있는 (종목, 회차) 칸만 회차 내 최고 상승률과 색 구간 번호로 들고 있다가
+    화면에 보일 행·열만 조밀한 표로 만든다. 행은 종목 표시 이름순, 열은 회차 번호순이다.
+    """
+
+    labels: pd.Index
+    cycles: pd.Index
+    rows: np.ndarray
+    columns: np.ndarray
+    values: np.ndarray
+    bins: np.ndarray
+
+    @property
+    def empty(self) -> bool:
+        return self.values.size == 0
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.rows, self.columns, self.values, self.bins)
+        return int(
+            sum(array.nbytes for array in arrays)
+            + self.labels.memory_usage(deep=True)
+            + self.cycles.memory_usage(deep=True)
+        )
+
+    def _positions(self, labels: Iterable[str] | None, cycles: Iterable[str] | None):
+        row_positions = (
+            np.arange(len(self.labels)) if labels is None else self.labels.get_indexer(list(labels))
+        )
+        column_positions = (
+            np.arange(len(self.cycles)) if cycles is None else self.cycles.get_indexer(list(cycles))
+        )
+        return row_positions[row_positions >= 0], column_positions[column_positions >= 0]
+
+    def _dense(self, source: np.ndarray, fill, labels, cycles) -> tuple[np.ndarray, pd.Index, pd.Index]:
+        row_positions, column_positions = self._positions(labels, cycles)
+        row_slots = np.full(len(self.labels), -1)
+        row_slots[row_positions] = np.arange(row_positions.size)
+        column_slots = np.full(len(self.cycles), -1)
+        column_slots[column_positions] = np.arange(column_positions.size)
+        rows, columns = row_slots[self.rows], column_slots[self.columns]
+        kept = (rows >= 0) & (columns >= 0)
+        dense = np.full((row_positions.size, column_positions.size), fill, dtype=np.asarray(source).dtype)
+        dense[rows[kept], columns[kept]] = source[kept]
+        return dense, self.labels[row_positions], self.cycles[column_positions]
+
+    def to_frame(self, labels: Iterable[str] | None = None, cycles: Iterable[str] | None = None) -> pd.DataFrame:
+        """labels 행과 cycles 열(주어진 순서, 없는 이름은 건너뜀)의 상승률 표. 생략하면 전체다."""
+        dense, index, columns = self._dense(self.values, np.nan, labels, cycles)
+        return pd.DataFrame(
+            dense,
+            index=pd.Index(index, name="종목표시"),
+            columns=pd.Index(columns, name="회차"),
+        )
+
+    def color_bins(self, labels: Iterable[str] | None = None, cycles: Iterable[str] | None = None) -> np.ndarray:
+        """to_frame과 같은 모양의 색 구간 번호 배열. 빈칸은 -1이다."""
+        return self._dense(self.bins, -1, labels, cycles)[0]
+
+    def strongest_cycles(self, count: int, labels: Iterable[str] | None = None) -> list[str]:
+        """labels 종목들의 상승률 합이 큰 회차 count개를 최근 회차부터 돌려준다."""
+        row_positions, _ = self._positions(labels, None)
+        selected = np.isin(self.rows, row_positions)
+        strength = np.bincount(self.columns[selected], weights=self.values[selected], minlength=len(self.cycles))
+        present = np.flatnonzero(np.bincount(self.columns[selected], minlength=len(self.cycles)) > 0)
+        # 합이 같으면 최근 회차를 먼저 고른다.
+        chosen = present[np.lexsort((-present, -strength[present]))][: max(0, int(count))]
+        return self.cycles[np.sort(chosen)[::-1]].tolist()
+
+
+def build_sparse_reaction_matrix(cycle_members: pd.DataFrame) -> ReactionMatrix:
+    """회차 구성 종목에서 종목×회차 칸별 최고 상승률과 색 구간을 한 번에 계산한다."""
+    if cycle_members is None or cycle_members.empty:
+        empty = np.zeros(0, dtype=np.int64)
+        return ReactionMatrix(
+            pd.Index([]), pd.Index([]), empty, empty, np.zeros(0), empty
+        )
+
+    rises = pd.to_numeric(cycle_members["상승률"], errors="coerce").to_numpy(dtype=float)
+    kept = ~np.isnan(rises)
+    members = cycle_members.loc[kept]
+    rises = rises[kept]
+    row_codes, labels = pd.factorize(np.array(stock_labels(members), dtype=object), sort=True)
+    column_codes, cycles = pd.factorize(members["회차"].astype(str).to_numpy(dtype=object))
+    numbers = np.array([int(str(value).replace("회차", "")) for value in cycles], dtype=np.int64)
+    cycle_order = np.argsort(numbers, kind="stable")
+    column_slots = np.empty(cycle_order.size, dtype=np.int64)
+    column_slots[cycle_order] = np.arange(cycle_order.size)
+    column_codes = column_slots[column_codes]
+    cycles = pd.Index(np.asarray(cycles, dtype=object)[cycle_order].tolist())
+
+    cells = row_codes * len(cycles) + column_codes
+    order = np.lexsort((-rises, cells))
+    first = _run_starts(cells[order])
+    cells, values = cells[order][first], rises[order][first]
+    maximum = values.max() if values.size else 0.0
+    scale = maximum if maximum > 0 else 1.0
+    bins = np.minimum(
+        REACTION_COLOR_BINS - 1, np.floor(np.clip(values / scale, 0.0, 1.0) * REACTION_COLOR_BINS)
+    ).astype(np.int64)
+    return ReactionMatrix(
+        pd.Index(list(labels)),
+        cycles,
+        cells // len(cycles),
+        cells % len(cycles),
+        values,
+        bins,
+    )
+
+
 def build_reaction_matrix(cycle_members: pd.DataFrame) -> pd.DataFrame:
     """종목×이슈 회차의 회차 내 최고 상승률 매트릭스를 만든다."""
     if cycle_members is None or cycle_members.empty:
         return pd.DataFrame()
-    matrix_source = cycle_members.copy()
-    matrix_source["종목표시"] = matrix_source.apply(
-        lambda row: f"{row['종목명']} ({row['종목키']})", axis=1
-    )
-    matrix = matrix_source.pivot_table(
-        index="종목표시",
-        columns="회차",
-        values="상승률",
-        aggfunc="max",
-    )
-    ordered_columns = sorted(
-        matrix.columns,
-        key=lambda value: int(str(value).replace("회차", "")),
-    )
-    return matrix.reindex(columns=ordered_columns)
+    return build_sparse_reaction_matrix(cycle_members).to_frame()
 
 
 def _alias_representatives(
@@ -311,13 +630,13 @@ def _extract_theme_terms_with_map(value, alias_map: Mapping[str, str]) -> list[s
     terms: list[str] = []
     seen: set[str] = set()
     for raw_part in THEME_SPLITTER.split(original):
-        part = re.sub(r"\s+", " ", raw_part).strip(" ._-·")
+        part = WHITESPACE.sub(" ", raw_part).strip(" ._-·")
         if not part:
             continue
 
         parenthetical = [
-            re.sub(r"\s+", " ", item).strip()
-            for item in re.findall(r"\(([^()]*)\)", part)
+            WHITESPACE.sub(" ", item).strip()
+            for item in PARENTHETICAL.findall(part)
             if item.strip()
         ]
         if part.count("(") != part.count(")"):
@@ -328,7 +647,7 @@ def _extract_theme_terms_with_map(value, alias_map: Mapping[str, str]) -> list[s
                 (alias_map[item.casefold()] for item in parenthetical if item.casefold() in alias_map),
                 part,
             )
-        canonical = re.sub(r"\s+", " ", canonical).strip()
+        canonical = WHITESPACE.sub(" ", canonical).strip()
         folded = canonical.casefold()
         if (
             not canonical
@@ -344,6 +663,10 @@ def _extract_theme_terms_with_map(value, alias_map: Mapping[str, str]) -> list[s
     return terms
 
 
+def _stripped_text(value) -> str:
+    return "" if value is None or pd.isna(value) else str(value).strip()
+
+
 def build_theme_event_index(
     df_sangcheon: pd.DataFrame,
     aliases: Mapping[str, Sequence[str]] | None = None,
@@ -353,63 +676,117 @@ def build_theme_event_index(
         return pd.DataFrame(columns=THEME_EVENT_COLUMNS)
 
     alias_map = _alias_representatives(aliases)
-    records: list[dict[str, object]] = []
-    for _, row in df_sangcheon.iterrows():
-        date = pd.to_datetime(row.get("날짜"), errors="coerce")
-        rise, _ = convert_rise_rate(row.get("상승률"))
-        stock_name = "" if pd.isna(row.get("종목명")) else str(row.get("종목명")).strip()
-        stock_key = "" if pd.isna(row.get("__stock_key")) else str(row.get("__stock_key")).strip()
-        stock_key = stock_key or normalize_stock_code(row.get("종목코드")) or stock_name
-        if pd.isna(date) or rise is None or not stock_key or not stock_name:
-            continue
+    terms = _map_unique(
+        df_sangcheon["테마"], lambda value: _extract_theme_terms_with_map(value, alias_map)
+    )
+    counts = np.fromiter((len(items) for items in terms), dtype=np.int64, count=len(terms))
+    dates = _column_or_none(df_sangcheon, "날짜")
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.Series(
+            _map_unique(dates, lambda value: pd.to_datetime(value, errors="coerce")), dtype=object
+        )
+    dates = pd.to_datetime(dates, errors="coerce").dt.normalize()
+    rises = _map_unique(_column_or_none(df_sangcheon, "상승률"), lambda value: convert_rise_rate(value)[0])
+    names = _map_unique(_column_or_none(df_sangcheon, "종목명"), _stripped_text)
+    stock_keys = _map_unique(_column_or_none(df_sangcheon, "__stock_key"), _stripped_text)
+    codes = _map_unique(_column_or_none(df_sangcheon, "종목코드"), normalize_stock_code)
+    stock_keys = np.where(stock_keys != "", stock_keys, np.where(codes != "", codes, names))
+    keep = (
+        dates.notna().to_numpy()
+        & pd.notna(rises)
+        & (stock_keys != "")
+        & (names != "")
+        & (counts > 0)
+    )
+    rows = np.repeat(np.flatnonzero(keep), counts[keep])
+    if not rows.size:
+        return pd.DataFrame(columns=THEME_EVENT_COLUMNS)
 
-        raw_theme = row.get("테마")
-        for issue in _extract_theme_terms_with_map(raw_theme, alias_map):
-            records.append(
-                {
-                    "이슈": issue,
-                    "날짜": pd.Timestamp(date).normalize(),
-                    "종목키": stock_key,
-                    "종목명": stock_name,
-                    "상승률": float(rise),
-                    "상승이유": "" if pd.isna(row.get("상승이유")) else str(row.get("상승이유")).strip(),
-                    "원본테마": "" if pd.isna(raw_theme) else str(raw_theme).strip(),
-                }
-            )
+    events = pd.DataFrame(
+        {
+            "이슈": np.fromiter(chain.from_iterable(terms[keep]), dtype=object, count=rows.size),
+            "날짜": dates.to_numpy()[rows],
+            "종목키": stock_keys[rows],
+            "종목명": names[rows],
+            "상승률": rises[rows].astype(float),
+            "상승이유": _map_unique(_column_or_none(df_sangcheon, "상승이유"), _stripped_text)[rows],
+            "원본테마": _map_unique(df_sangcheon["테마"], _stripped_text)[rows],
+        },
+        columns=THEME_EVENT_COLUMNS,
+    )
+    return _deduplicate_theme_events(events)
 
-    if not records:
-        return pd.DataFrame(columns=THEME_EVENT_COLUMNS)
-    events = pd.DataFrame.from_records(records, columns=THEME_EVENT_COLUMNS)
-    events = events.sort_values("상승률", ascending=False).drop_duplicates(
+
+def _deduplicate_theme_events(events: pd.DataFrame) -> pd.DataFrame:
+    """(이슈, 날짜, 종목) 중복은 상승률이 가장 높은 행(같으면 먼저 나온 행)만 남기고 날짜 내림차순으로 정렬한다."""
+    events = events.sort_values("상승률", ascending=False, kind="stable").drop_duplicates(
         ["이슈", "날짜", "종목키"], keep="first"
     )
     return events.sort_values(["날짜", "이슈"], ascending=[False, True]).reset_index(drop=True)
 
 
+def append_theme_events(
+    theme_events: pd.DataFrame,
+    new_sangcheon: pd.DataFrame,
+    aliases: Mapping[str, Sequence[str]] | None = None,
+) -> pd.DataFrame:
+    """기존 테마 이벤트 인덱스에 새 상천 행의 이벤트를 합친다.
+
+    새 행은 기존 행 뒤에 붙은 것으로 보고 build_theme_event_index를 전체 행에 다시 돌린 것과
+    같은 결과를 만든다. 중복 판정과 정렬은 새 이벤트와 날짜가 겹치는 기존 행에만 한다.
+    """
+    return _merge_theme_events(theme_events, build_theme_event_index(new_sangcheon, aliases))
+
+
+def _merge_theme_events(theme_events: pd.DataFrame, new_events: pd.DataFrame) -> pd.DataFrame:
+    if new_events is None or new_events.empty:
+        return theme_events
+    if theme_events is None or theme_events.empty:
+        return _deduplicate_theme_events(new_events)
+
+    touched = theme_events["날짜"].isin(new_events["날짜"].unique()).to_numpy()
+    kept = theme_events.loc[~touched]
+    merged = _deduplicate_theme_events(pd.concat([theme_events.loc[touched], new_events], ignore_index=True))
+    # 기존 행은 날짜 내림차순이므로 새 날짜 묶음을 제자리에 끼워 넣기만 하면 된다.
+    kept_dates = kept["날짜"].to_numpy(dtype="datetime64[ns]")
+    merged_dates = merged["날짜"].to_numpy(dtype="datetime64[ns]")
+    slots = len(kept_dates) - np.searchsorted(kept_dates[::-1], merged_dates, side="right")
+    order = np.insert(np.arange(len(kept)), slots, np.arange(len(merged)) + len(kept))
+    return pd.concat([kept, merged], ignore_index=True).take(order).reset_index(drop=True)
+
+
 def _assign_theme_cycles(
     events: pd.DataFrame,
-    trading_days: Iterable,
+    trading_days: TradingCalendar | Iterable,
     max_trading_day_gap: int = 3,
 ) -> pd.DataFrame:
+    """이슈별 날짜를 거래일 간격으로 묶어 회차번호를 붙인다.
+
+    모든 이슈를 (이슈, 날짜) 정렬 한 번으로 계산한다. 달력에 없는 이벤트 날짜는
+    이슈와 관계없이 거래일 하나로 센다.
+    """
     if events.empty:
         result = events.copy()
         result["회차번호"] = pd.Series(dtype="int64")
         return result
 
     result = events.copy()
-    positions = _trading_day_positions(trading_days, result["날짜"])
-    cycle_values = pd.Series(index=result.index, dtype="int64")
-    for _, issue_rows in result.groupby("이슈", sort=False):
-        cycle_number = 1
-        previous_date = None
-        cycle_by_date: dict[pd.Timestamp, int] = {}
-        for raw_date in sorted(issue_rows["날짜"].dropna().unique()):
-            date = pd.Timestamp(raw_date).normalize()
-            if previous_date is not None and positions[date] - positions[previous_date] > max_trading_day_gap:
-                cycle_number += 1
-            cycle_by_date[date] = cycle_number
-            previous_date = date
-        cycle_values.loc[issue_rows.index] = issue_rows["날짜"].map(cycle_by_date).astype(int)
+    issue_codes, _ = pd.factorize(result["이슈"])
+    dates = result["날짜"].to_numpy(dtype="datetime64[ns]")
+    calendar = TradingCalendar.ensure(trading_days).including(dates)
+    cycle_values = np.zeros(len(result), dtype=np.int64)
+    valid = np.flatnonzero(issue_codes >= 0)
+    if valid.size:
+        order = valid[np.lexsort((dates[valid], issue_codes[valid]))]
+        sorted_codes = issue_codes[order]
+        sorted_dates = dates[order]
+        first = np.concatenate(
+            [[True], (sorted_codes[1:] != sorted_codes[:-1]) | (sorted_dates[1:] != sorted_dates[:-1])]
+        )
+        cycle_numbers = calendar.cycle_numbers(
+            sorted_dates[first], max_trading_day_gap, groups=sorted_codes[first]
+        )
+        cycle_values[order] = cycle_numbers[np.cumsum(first) - 1]
     result["회차번호"] = cycle_values.astype(int)
     return result
 
@@ -420,123 +797,770 @@ def _log_normalize(value: float, maximum: float) -> float:
     return math.log1p(value) / math.log1p(maximum)
 
 
-def _summarize_hot_period(
-    events: pd.DataFrame,
-    trading_days: Sequence[pd.Timestamp],
-    period_end: pd.Timestamp,
-) -> tuple[pd.DataFrame, pd.DataFrame]:
-    if events.empty:
-        return pd.DataFrame(), _assign_theme_cycles(events, trading_days)
+HOT_SUMMARY_COLUMNS = [
+    "이슈", "상승종목수", "부각거래일수", "부각회차수", "반복종목수", "평균상승률", "중앙상승률",
+    "15%이상종목수", "상한가수", "대장주", "최고상승률", "최근부각일", "최근거래일간격", "최근성기준",
+]
 
-    with_cycles = _assign_theme_cycles(events, trading_days)
-    trading_positions = {
-        pd.Timestamp(day).normalize(): position for position, day in enumerate(trading_days)
-    }
-    end_position = trading_positions.get(pd.Timestamp(period_end).normalize(), len(trading_positions) - 1)
-    period_length = max(1, len([day for day in trading_days if day <= period_end]))
-    half_life = max(5.0, period_length / 3.0)
-
-    rows: list[dict[str, object]] = []
-    for issue, issue_rows in with_cycles.groupby("이슈", sort=False):
-        stock_cycle_counts = issue_rows.groupby("종목키")["회차번호"].nunique()
-        leader = issue_rows.sort_values(["상승률", "날짜"], ascending=[False, False]).iloc[0]
-        recent_date = issue_rows["날짜"].max()
-        recent_position = trading_positions.get(pd.Timestamp(recent_date).normalize(), end_position)
-        rows.append(
-            {
-                "이슈": issue,
-                "상승종목수": int(issue_rows["종목키"].nunique()),
-                "부각거래일수": int(issue_rows["날짜"].nunique()),
-                "부각회차수": int(issue_rows["회차번호"].nunique()),
-                "반복종목수": int((stock_cycle_counts >= 2).sum()),
-                "평균상승률": float(issue_rows["상승률"].mean()),
-                "중앙상승률": float(issue_rows["상승률"].median()),
-                "15%이상종목수": int((issue_rows["상승률"] >= 15.0).sum()),
-                "상한가수": int((issue_rows["상승률"] >= LIMIT_UP_THRESHOLD).sum()),
-                "대장주": leader["종목명"],
-                "최고상승률": float(leader["상승률"]),
-                "최근부각일": recent_date,
-                "최근거래일간격": max(0, end_position - recent_position),
-                "최근성기준": half_life,
-            }
-        )
 
-    summary = pd.DataFrame(rows)
+def _score_hot_summary(summary: pd.DataFrame) -> pd.DataFrame:
+    """이슈별 집계에 확산 30·활동 25·반복 20·강도 15·최근 10점을 붙인다."""
     maxima = {
         column: float(summary[column].max())
         for column in ["상승종목수", "부각거래일수", "부각회차수", "반복종목수"]
     }
-    scored_rows: list[dict[str, object]] = []
-    for _, row in summary.iterrows():
-        breadth = 30.0 * _log_normalize(row["상승종목수"], maxima["상승종목수"])
+    scores: dict[str, list[float]] = {
+        "확산점수": [], "활동점수": [], "반복점수": [], "강도점수": [], "최근성점수": [], "핫점수": [],
+    }
+    for stocks, days, cycles, repeats, average, median, gap, half_life in zip(
+        *(summary[column].tolist() for column in [
+            "상승종목수", "부각거래일수", "부각회차수", "반복종목수",
+            "평균상승률", "중앙상승률", "최근거래일간격", "최근성기준",
+        ])
+    ):
+        breadth = 30.0 * _log_normalize(stocks, maxima["상승종목수"])
         activity = 25.0 * (
-            0.65 * _log_normalize(row["부각회차수"], maxima["부각회차수"])
-            + 0.35 * _log_normalize(row["부각거래일수"], maxima["부각거래일수"])
+            0.65 * _log_normalize(cycles, maxima["부각회차수"])
+            + 0.35 * _log_normalize(days, maxima["부각거래일수"])
         )
-        repeat_ratio = row["반복종목수"] / max(1, row["상승종목수"])
+        repeat_ratio = repeats / max(1, stocks)
         repeat = 20.0 * (
-            0.65 * _log_normalize(row["반복종목수"], maxima["반복종목수"])
+            0.65 * _log_normalize(repeats, maxima["반복종목수"])
             + 0.35 * min(1.0, repeat_ratio)
         )
         strength = 15.0 * (
-            0.45 * min(1.0, max(0.0, row["평균상승률"]) / 20.0)
-            + 0.55 * min(1.0, max(0.0, row["중앙상승률"]) / 15.0)
+            0.45 * min(1.0, max(0.0, average) / 20.0)
+            + 0.55 * min(1.0, max(0.0, median) / 15.0)
         )
-        recency = 10.0 * math.pow(0.5, row["최근거래일간격"] / row["최근성기준"])
-        scored = row.to_dict()
-        scored.update(
+        recency = 10.0 * math.pow(0.5, gap / half_life)
+        for column, value in zip(
+            scores,
+            [breadth, activity, repeat, strength, recency, breadth + activity + repeat + strength + recency],
+        ):
+            scores[column].append(round(value, 2))
+    return summary.assign(**scores)
+
+
+def _event_dates(theme_events: pd.DataFrame) -> np.ndarray:
+    return (
+        pd.to_datetime(theme_events["날짜"], errors="coerce").dt.normalize().to_numpy(dtype="datetime64[ns]")
+    )
+
+
+def _extend_codes(uniques: pd.Index, values: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    """values를 기존 고유값 uniques의 코드로 바꾸고, 처음 보는 값은 등장 순서대로 뒤에 덧붙인다."""
+    codes = uniques.get_indexer(values)
+    unseen = (codes < 0) & values.notna().to_numpy()
+    if unseen.any():
+        extra_codes, extra = pd.factorize(values[unseen])
+        codes[unseen] = extra_codes + len(uniques)
+        uniques = uniques.append(extra)
+    return codes.astype(np.int64), uniques
+
+
+def _run_starts(*sorted_columns: np.ndarray) -> np.ndarray:
+    """같은 순서로 정렬된 열들에서 값 조합이 바뀌는 첫 위치를 True로 표시한다."""
+    size = len(sorted_columns[0])
+    starts = np.ones(size, dtype=bool)
+    if size > 1:
+        starts[1:] = np.logical_or.reduce([column[1:] != column[:-1] for column in sorted_columns])
+    return starts
+
+
+ISSUE_GRAPH_COLUMNS = ["이슈", "연관점수", "공동종목일수", "공동종목수", "공동상승률합"]
+
+
+@dataclass(frozen=True)
+class IssueGraph:
+    """같은 종목·같은 날 함께 부각된 이슈끼리 잇는 이슈×이슈 희소 그래프.
+
+    이슈마다 이웃을 연관점수 내림차순으로 미리 정렬한 CSR 배열로 들고 있어
+    related는 이슈 위치 조회 한 번과 배열 자르기로 끝난다.
+    """
+
+    issues: pd.Index
+    offsets: np.ndarray
+    neighbors: np.ndarray
+    scores: np.ndarray
+    shared_days: np.ndarray
+    shared_stocks: np.ndarray
+    shared_rises: np.ndarray
+
+    def related(self, issue: str, limit: int = 10) -> pd.DataFrame:
+        """issue와 연관점수가 높은 이슈 최대 limit개. 그래프에 없는 이슈면 빈 표다."""
+        position = int(self.issues.get_indexer([issue])[0]) if len(self.issues) else -1
+        if position < 0:
+            return pd.DataFrame(columns=ISSUE_GRAPH_COLUMNS)
+        start = int(self.offsets[position])
+        stop = min(int(self.offsets[position + 1]), start + max(0, int(limit)))
+        return pd.DataFrame(
             {
-                "확산점수": round(breadth, 2),
-                "활동점수": round(activity, 2),
-                "반복점수": round(repeat, 2),
-                "강도점수": round(strength, 2),
-                "최근성점수": round(recency, 2),
-                "핫점수": round(breadth + activity + repeat + strength + recency, 2),
-            }
+                "이슈": self.issues[self.neighbors[start:stop]],
+                "연관점수": self.scores[start:stop],
+                "공동종목일수": self.shared_days[start:stop],
+                "공동종목수": self.shared_stocks[start:stop],
+                "공동상승률합": self.shared_rises[start:stop],
+            },
+            columns=ISSUE_GRAPH_COLUMNS,
+        )
+
+
+def build_issue_graph(theme_events: pd.DataFrame) -> IssueGraph:
+    """테마 이벤트에서 이슈 쌍별 공동 종목일수·공동 종목수·공동 상승률 합을 센다.
+
+    같은 (종목, 날짜)에 함께 나온 이슈 쌍이 한 번 이어진다. 연관점수는 공동 상승률 합을
+    두 이슈 각각의 상승률 합의 기하평균으로 나눈 값(0~100)이라 큰 이슈끼리만 묶이지 않는다.
+    """
+    empty = np.zeros(0, dtype=np.int64)
+    if theme_events is None or theme_events.empty:
+        return IssueGraph(pd.Index([]), np.zeros(1, dtype=np.int64), empty, np.zeros(0), empty, empty, np.zeros(0))
+
+    issue_codes, issues = pd.factorize(theme_events["이슈"])
+    stock_codes, _ = pd.factorize(theme_events["종목키"])
+    dates = theme_events["날짜"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    rises = pd.to_numeric(theme_events["상승률"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    valid = np.flatnonzero((issue_codes >= 0) & (stock_codes >= 0) & ~np.isnat(dates.view("datetime64[ns]")))
+    issue_count = len(issues)
+    issue_rises = np.bincount(issue_codes[valid], weights=rises[valid], minlength=issue_count)
+
+    # (종목, 날짜) 묶음 안의 이슈끼리 모든 순서쌍을 펼친다.
+    order = valid[np.lexsort((issue_codes[valid], dates[valid], stock_codes[valid]))]
+    starts = _run_starts(stock_codes[order], dates[order])
+    group_ids = np.cumsum(starts) - 1
+    group_starts = np.flatnonzero(starts)
+    group_sizes = np.diff(np.append(group_starts, order.size))
+    sizes = group_sizes[group_ids]
+    left = np.repeat(np.arange(order.size), sizes)
+    right = group_starts[group_ids][left] + (np.arange(left.size) - np.repeat(np.cumsum(sizes) - sizes, sizes))
+    distinct = left != right
+    left, right = order[left[distinct]], order[right[distinct]]
+
+    pair_keys = issue_codes[left].astype(np.int64) * issue_count + issue_codes[right]
+    keys, pair_codes = np.unique(pair_keys, return_inverse=True)
+    shared_days = np.bincount(pair_codes, minlength=keys.size)
+    shared_rises = np.bincount(pair_codes, weights=rises[left], minlength=keys.size)
+    stock_pairs = np.unique(pair_codes.astype(np.int64) * max(1, int(stock_codes.max()) + 1) + stock_codes[left])
+    shared_stocks = np.bincount(stock_pairs // max(1, int(stock_codes.max()) + 1), minlength=keys.size)
+
+    sources, targets = keys // max(1, issue_count), keys % max(1, issue_count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = np.nan_to_num(100.0 * shared_rises / np.sqrt(issue_rises[sources] * issue_rises[targets]))
+    ranked = np.lexsort((targets, -shared_days, -scores, sources))
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(sources, minlength=issue_count))])
+    return IssueGraph(
+        issues,
+        offsets,
+        targets[ranked],
+        np.round(scores[ranked], 2),
+        shared_days[ranked],
+        shared_stocks[ranked],
+        np.round(shared_rises[ranked], 2),
+    )
+
+
+class HotIssueIndex:
+    """테마 이벤트를 이슈×거래일 누적합으로 미리 집계한 핫이슈 인덱스.
+
+    (이슈, 거래일) 칸마다 이벤트 수·15% 이상 수·상한가 수의 누적합과 회차 번호를 두고,
+    임의의 [시작, 종료] 기간의 부각일·회차·건수·최근성을 이슈당 이진 탐색 두 번으로 답한다.
+    상승 종목 수와 반복 종목 수는 (이슈, 종목)별 직전 부각일과 직전 회차 전환일을 미리 구해
+    두어 기간 안 이벤트를 한 번 세는 것으로 끝낸다. 평균·중앙값·대장주는 이슈별로 미리 정렬한
+    배열에서 기간 안 구간만 골라 계산한다.
+    """
+
+    def __init__(
+        self,
+        theme_events: pd.DataFrame,
+        trading_days: TradingCalendar | Iterable,
+        max_trading_day_gap: int = 3,
+    ) -> None:
+        self.max_trading_day_gap = max_trading_day_gap
+        # 작업자 풀과 화면 렌더가 같은 인덱스를 나눠 쓰므로 메모는 잠금 안에서 한 번만 계산한다.
+        self._scores_lock = threading.Lock()
+        self._graph_lock = threading.Lock()
+        self._load(theme_events, TradingCalendar.ensure(trading_days))
+
+    def __copy__(self) -> "HotIssueIndex":
+        """배열은 공유하고 메모 사전과 잠금은 따로 갖는 얕은 복사본.
+
+        원본의 일별 점수 메모는 잠금을 잡고 복사해 두므로, 다른 스레드가 원본에 점수를 넣는 동안에도
+        복사본을 append로 늘릴 수 있다.
+        """
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        with self._scores_lock:
+            clone._daily_scores = dict(self._daily_scores)
+        clone._scores_lock = threading.Lock()
+        clone._graph_lock = threading.Lock()
+        return clone
+
+    def _load(self, theme_events: pd.DataFrame, calendar: TradingCalendar) -> None:
+        if theme_events is None or "날짜" not in theme_events.columns:
+            theme_events = pd.DataFrame(columns=THEME_EVENT_COLUMNS)
+        self.events = theme_events
+        self.calendar = calendar
+        self.version = uuid.uuid4().hex
+        self._daily_scores: dict[int, pd.DataFrame] = {}
+        self._issue_graph: IssueGraph | None = None
+
+        date_values = _event_dates(theme_events)
+        axis = calendar.including(date_values)
+        self._set_axis(axis)
+        self._issue_codes, self.issues = pd.factorize(theme_events["이슈"])
+        self._stock_codes, self._stocks = pd.factorize(theme_events["종목키"])
+        self._date_positions = self._axis_positions(date_values)
+        valid = self._valid_rows()
+        self._cycles = np.zeros(len(theme_events), dtype=np.int64)
+        if valid.size:
+            self._cycles[valid] = _assign_theme_cycles(
+                theme_events.iloc[valid].assign(날짜=date_values[valid]), axis, self.max_trading_day_gap
+            )["회차번호"].to_numpy()
+        self._rises = pd.to_numeric(theme_events["상승률"], errors="coerce").to_numpy(dtype=float)
+        self._names = theme_events["종목명"].to_numpy(dtype=object)
+        self._index_rows()
+
+    def _set_axis(self, axis: TradingCalendar) -> None:
+        self.days = axis.days
+        self._on_calendar = self.calendar.contains(self.days)
+        self._calendar_positions = self.calendar.positions(self.days)
+
+    def _axis_positions(self, date_values: np.ndarray) -> np.ndarray:
+        positions = np.full(len(date_values), -1, dtype=np.int64)
+        dated = ~np.isnat(date_values)
+        positions[dated] = np.searchsorted(self.days, date_values[dated])
+        return positions
+
+    def _valid_rows(self) -> np.ndarray:
+        return np.flatnonzero((self._date_positions >= 0) & (self._issue_codes >= 0))
+
+    def _index_rows(self) -> None:
+        """행별 이슈·날짜 위치·회차·상승률 배열에서 기간 질의용 정렬 배열과 누적합을 만든다."""
+        day_count = max(1, len(self.days))
+        valid = self._valid_rows()
+        rises = self._rises
+        issues = self._issue_codes[valid]
+        positions = self._date_positions[valid]
+        cycles = self._cycles[valid]
+
+        # 이슈×거래일 칸: (이슈, 날짜) 순으로 정렬한 고유 키와 칸별 누적합
+        cell_keys = issues * day_count + positions
+        order = np.lexsort((valid, cell_keys))
+        sorted_keys = cell_keys[order]
+        first = _run_starts(sorted_keys)
+        self._cell_keys = sorted_keys[first]
+        cells = np.empty(order.size, dtype=np.int64)
+        cells[order] = np.cumsum(first) - 1
+        cell_count = self._cell_keys.size
+        self._cell_cycles = cycles[order][first]
+        valid_rises = rises[valid]
+        self._cumulative = {
+            name: np.concatenate([[0.0], np.cumsum(np.bincount(cells, weights=weights, minlength=cell_count))])
+            for name, weights in {
+                "count": np.ones(valid.size),
+                "strong": (valid_rises >= 15.0).astype(float),
+                "limit_up": (valid_rises >= LIMIT_UP_THRESHOLD).astype(float),
+            }.items()
+        }
+
+        # (이슈, 종목)별 직전 부각일, 회차 전환 여부, 직전 회차 전환의 직전 부각일
+        stock_codes = self._stock_codes[valid]
+        pair_order = np.lexsort((valid, positions, stock_codes, issues))
+        same_pair = ~_run_starts(issues[pair_order], stock_codes[pair_order])
+        sorted_positions = positions[pair_order]
+        sorted_cycles = cycles[pair_order]
+        previous_day = np.where(same_pair, np.roll(sorted_positions, 1), -1)
+        changed = same_pair & (sorted_cycles != np.roll(sorted_cycles, 1))
+        pair_starts = np.maximum.accumulate(np.where(same_pair, 0, np.arange(valid.size)))
+        last_change = np.maximum.accumulate(np.where(changed, np.arange(valid.size), -1))
+        last_change = np.concatenate([[-1], last_change[:-1]])[: valid.size]
+        earlier_change = last_change >= pair_starts
+        change_previous_day = np.where(earlier_change, previous_day[np.maximum(last_change, 0)], -1)
+
+        # 날짜순 이벤트 배열: 기간이 연속 구간이 되도록 정렬
+        by_date = np.argsort(positions, kind="stable")
+        inverse_pair = np.empty(valid.size, dtype=np.int64)
+        inverse_pair[pair_order] = np.arange(valid.size)
+        self._event_positions = positions[by_date]
+        self._event_issues = issues[by_date]
+        self._event_rows = valid[by_date]
+        self._event_previous_day = previous_day[inverse_pair][by_date]
+        self._event_changed = changed[inverse_pair][by_date]
+        self._event_change_previous_day = change_previous_day[inverse_pair][by_date]
+
+        # 이슈별 원래 행 순서(평균), 상승률 오름차순(중앙값), 상승률·날짜 내림차순(대장주) 배열
+        mean_order = np.lexsort((valid, issues))
+        self._mean_positions = positions[mean_order]
+        self._mean_rises = valid_rises[mean_order]
+        median_order = np.lexsort((valid_rises, issues))
+        self._median_positions = positions[median_order]
+        self._median_rises = valid_rises[median_order]
+        leader_order = np.lexsort((valid, -positions, -valid_rises, issues))
+        self._leader_positions = positions[leader_order]
+        self._leader_issues = issues[leader_order]
+        self._leader_rows = valid[leader_order]
+
+    def append(
+        self,
+        new_events: pd.DataFrame,
+        trading_days: TradingCalendar | Iterable | None = None,
+    ) -> "HotIssueIndex":
+        """새 테마 이벤트를 합치고 인덱스를 제자리에서 새 거래일까지 늘린다.
+
+        새 이벤트와 새 거래일이 모두 기존 마지막 날짜 뒤이면 기존 행의 이슈·종목 코드와 회차는
+        그대로 두고 새 행의 회차만 이슈별 마지막 회차에서 이어 센다. 이미 계산한 일별 점수
+        행렬도 새 거래일 열만 계산해 붙인다. 그 밖의 경우(과거 날짜 수정 등)는 다시 만든다.
+        """
+        calendar = self.calendar if trading_days is None else TradingCalendar.ensure(trading_days)
+        events = _merge_theme_events(self.events, new_events)
+        added = len(events) - len(self.events)
+        old_calendar_size = len(self.calendar)
+        appended_days = calendar.days[old_calendar_size:]
+        if new_events is not None and not new_events.empty:
+            appended_days = np.concatenate([appended_days, _event_dates(new_events)])
+        extends = (
+            len(self.days) > 0
+            and old_calendar_size <= len(calendar)
+            and np.array_equal(calendar.days[:old_calendar_size], self.calendar.days)
+            and bool((appended_days[~np.isnat(appended_days)] > self.days[-1]).all())
+        )
+        if not extends:
+            self._load(events, calendar)
+            return self
+
+        old_issue_count = len(self.issues)
+        old_day_count = len(self.days)
+        old_cell_keys = self._cell_keys
+        old_cell_cycles = self._cell_cycles
+        fresh = events.iloc[:added]
+        new_dates = _event_dates(fresh)
+        self.events = events
+        self.calendar = calendar
+        self.version = uuid.uuid4().hex
+        self._issue_graph = None
+        self._set_axis(calendar.including(np.concatenate([self.days, new_dates])))
+
+        issue_codes, self.issues = _extend_codes(self.issues, fresh["이슈"])
+        stock_codes, self._stocks = _extend_codes(self._stocks, fresh["종목키"])
+        positions = self._axis_positions(new_dates)
+        self._issue_codes = np.concatenate([issue_codes, self._issue_codes])
+        self._stock_codes = np.concatenate([stock_codes, self._stock_codes])
+        self._date_positions = np.concatenate([positions, self._date_positions])
+        cycles = self._continued_cycles(issue_codes, positions, old_cell_keys, old_cell_cycles, old_day_count)
+        self._cycles = np.concatenate([cycles, self._cycles])
+        self._rises = np.concatenate(
+            [pd.to_numeric(fresh["상승률"], errors="coerce").to_numpy(dtype=float), self._rises]
+        )
+        self._names = np.concatenate([fresh["종목명"].to_numpy(dtype=object), self._names])
+        self._index_rows()
+
+        with self._scores_lock:
+            daily_scores = {}
+            for window, scores in self._daily_scores.items():
+                values = np.zeros((len(self.issues), len(self.calendar)), dtype=np.float32)
+                values[:old_issue_count, :old_calendar_size] = scores.to_numpy()
+                if len(self.calendar) > old_calendar_size and self._event_positions.size:
+                    values[:, old_calendar_size:] = self._sweep_daily_scores(
+                        max(1, int(window)), start_column=old_calendar_size
+                    )
+                daily_scores[window] = self._daily_frame(values)
+            self._daily_scores = daily_scores
+        return self
+
+    def _continued_cycles(
+        self,
+        issue_codes: np.ndarray,
+        positions: np.ndarray,
+        old_cell_keys: np.ndarray,
+        old_cell_cycles: np.ndarray,
+        old_day_count: int,
+    ) -> np.ndarray:
+        """새 행의 회차 번호. 이슈마다 기존 마지막 부각일과 회차를 앞에 두고 이어 센다."""
+        cycles = np.zeros(len(issue_codes), dtype=np.int64)
+        valid = np.flatnonzero((positions >= 0) & (issue_codes >= 0))
+        if not valid.size:
+            return cycles
+        touched = np.unique(issue_codes[valid])
+        last_cells = np.searchsorted(old_cell_keys, (touched + 1) * max(1, old_day_count), side="left") - 1
+        seeded = last_cells >= 0
+        seeded[seeded] = old_cell_keys[last_cells[seeded]] // max(1, old_day_count) == touched[seeded]
+        seed_issues = touched[seeded]
+        seed_positions = old_cell_keys[last_cells[seeded]] % max(1, old_day_count)
+        seed_cycles = np.zeros(len(self.issues), dtype=np.int64)
+        seed_cycles[seed_issues] = old_cell_cycles[last_cells[seeded]] - 1
+
+        groups = np.concatenate([seed_issues, issue_codes[valid]])
+        days = np.concatenate([seed_positions, positions[valid]])
+        pairs = np.unique(groups * len(self.days) + days)
+        pair_issues, pair_days = pairs // len(self.days), pairs % len(self.days)
+        numbers = TradingCalendar._from_sorted(self.days).cycle_numbers(
+            self.days[pair_days], self.max_trading_day_gap, groups=pair_issues
+        ) + seed_cycles[pair_issues]
+        cycles[valid] = numbers[np.searchsorted(pairs, issue_codes[valid] * len(self.days) + positions[valid])]
+        return cycles
+
+    @classmethod
+    def ensure(cls, theme_events, trading_days) -> "HotIssueIndex":
+        calendar = TradingCalendar.ensure(trading_days)
+        if isinstance(theme_events, cls) and theme_events.calendar == calendar:
+            return theme_events
+        events = theme_events.events if isinstance(theme_events, cls) else theme_events
+        return cls(events, calendar)
+
+    def _axis_range(self, days: TradingCalendar) -> tuple[int, int]:
+        first = int(np.searchsorted(self.days, days.days[0], side="left"))
+        last = int(np.searchsorted(self.days, days.days[-1], side="right")) - 1
+        return first, last
+
+    def period_events(self, days: TradingCalendar) -> pd.DataFrame:
+        """기간 안의 원본 이벤트 행(원래 순서)에 기간 기준 회차번호를 붙인다."""
+        if not len(days) or self.events.empty:
+            return _assign_theme_cycles(self.events.iloc[:0], days)
+        first, last = self._axis_range(days)
+        rows = np.flatnonzero((self._date_positions >= first) & (self._date_positions <= last))
+        if not rows.size:
+            return _assign_theme_cycles(self.events.iloc[:0], days)
+        day_count = max(1, len(self.days))
+        issues = self._issue_codes[rows]
+        known = issues >= 0
+        first_cycles = np.zeros(rows.size, dtype=np.int64)
+        first_cycles[known] = self._cell_cycles[
+            np.searchsorted(self._cell_keys, issues[known] * day_count + first, side="left")
+        ]
+        result = self.events.iloc[rows].copy()
+        result["회차번호"] = np.where(known, self._cycles[rows] - first_cycles + 1, 0).astype(int)
+        return result
+
+    def summarize(self, days: TradingCalendar) -> pd.DataFrame:
+        """기간 days(연속 거래일)의 이슈별 핫이슈 집계와 점수. 이슈 순서는 기간 안 첫 등장 순이다."""
+        if not len(days) or not self._event_positions.size:
+            return pd.DataFrame()
+        first, last = self._axis_range(days)
+        start = int(np.searchsorted(self._event_positions, first, side="left"))
+        stop = int(np.searchsorted(self._event_positions, last, side="right"))
+        if start == stop:
+            return pd.DataFrame()
+        issue_count = len(self.issues)
+        event_issues = self._event_issues[start:stop]
+        first_rows = np.full(issue_count, np.iinfo(np.int64).max)
+        np.minimum.at(first_rows, event_issues, self._event_rows[start:stop])
+        present = np.flatnonzero(first_rows < np.iinfo(np.int64).max)
+        issues = present[np.argsort(first_rows[present], kind="stable")]
+
+        day_count = max(1, len(self.days))
+        low = np.searchsorted(self._cell_keys, issues * day_count + first, side="left")
+        high = np.searchsorted(self._cell_keys, issues * day_count + last, side="right")
+        totals = {name: values[high] - values[low] for name, values in self._cumulative.items()}
+        counts = totals["count"].astype(np.int64)
+
+        previous_day = self._event_previous_day[start:stop]
+        stocks = np.bincount(event_issues[previous_day < first], minlength=issue_count)[issues]
+        repeated = (
+            self._event_changed[start:stop]
+            & (previous_day >= first)
+            & (self._event_change_previous_day[start:stop] < first)
+        )
+        repeats = np.bincount(event_issues[repeated], minlength=issue_count)[issues]
+
+        issue_counts = np.zeros(issue_count, dtype=np.int64)
+        issue_counts[issues] = counts
+        offsets = (np.cumsum(issue_counts) - issue_counts)[issues]
+        # 평균은 pandas Series.mean과 같은 값이 되도록 이슈별 연속 구간을 같은 순서로 더한다.
+        in_period = (self._mean_positions >= first) & (self._mean_positions <= last)
+        period_rises = self._mean_rises[in_period]
+        sums = np.array([
+            np.add.reduce(period_rises[offset:offset + count])
+            for offset, count in zip(offsets.tolist(), counts.tolist())
+        ])
+        in_period = (self._median_positions >= first) & (self._median_positions <= last)
+        ordered_rises = self._median_rises[in_period]
+        medians = (ordered_rises[offsets + (counts - 1) // 2] + ordered_rises[offsets + counts // 2]) / 2
+
+        in_period = (self._leader_positions >= first) & (self._leader_positions <= last)
+        leader_issues = self._leader_issues[in_period]
+        leader_rows = self._leader_rows[in_period]
+        leader_first = _run_starts(leader_issues)
+        leaders = np.empty(issue_count, dtype=np.int64)
+        leaders[leader_issues[leader_first]] = leader_rows[leader_first]
+        leaders = leaders[issues]
+
+        recent_days = self._cell_keys[high - 1] - issues * day_count
+        end_position = int(self._calendar_positions[last])
+        recent_positions = np.where(
+            self._on_calendar[recent_days], self._calendar_positions[recent_days], end_position
+        )
+        date_dtype = self.events["날짜"].dtype
+        summary = pd.DataFrame(
+            {
+                "이슈": self.issues[issues],
+                "상승종목수": stocks,
+                "부각거래일수": high - low,
+                "부각회차수": self._cell_cycles[high - 1] - self._cell_cycles[low] + 1,
+                "반복종목수": repeats,
+                "평균상승률": sums / counts,
+                "중앙상승률": medians,
+                "15%이상종목수": totals["strong"].astype(np.int64),
+                "상한가수": totals["limit_up"].astype(np.int64),
+                "대장주": self._names[leaders],
+                "최고상승률": self._rises[leaders],
+                "최근부각일": pd.Series(self.days[recent_days]).astype(
+                    date_dtype if isinstance(date_dtype, np.dtype) and date_dtype.kind == "M" else "datetime64[ns]"
+                ),
+                "최근거래일간격": np.maximum(0, end_position - recent_positions),
+                "최근성기준": max(5.0, len(days) / 3.0),
+            },
+            columns=HOT_SUMMARY_COLUMNS,
+        )
+        return _score_hot_summary(summary)
+
+    def issue_graph(self) -> IssueGraph:
+        """전체 이벤트의 이슈 연관 그래프. 한 번 만들면 인덱스가 바뀔 때까지 다시 쓴다."""
+        with self._graph_lock:
+            if self._issue_graph is None:
+                self._issue_graph = build_issue_graph(self.events)
+            return self._issue_graph
+
+    def daily_scores(self, window: int = HOT_TREND_WINDOW) -> pd.DataFrame:
+        """거래일마다 그날까지 window거래일의 핫점수를 모든 이슈에 대해 구한 이슈×거래일 행렬.
+
+        summarize와 같은 가중치를 쓰되 날짜 축을 거래일 열 블록 단위로 훑으며 누적합과 차분 배열로 채운다.
+        중앙값만 기간에 들고 나는 이벤트를 이슈별 정렬 목록에 반영해 바뀐 이슈만 다시 구한다.
+        값은 float32이고 부각되지 않은 날은 0이다. 같은 window는 다시 계산하지 않고,
+        여러 스레드가 동시에 불러도 한 번만 계산한다.
+        """
+        with self._scores_lock:
+            cached = self._daily_scores.get(window)
+            if cached is not None:
+                return cached
+
+            issue_count, day_count = len(self.issues), len(self.calendar)
+            if issue_count and day_count and self._event_positions.size:
+                scores = self._sweep_daily_scores(max(1, int(window)))
+            else:
+                scores = np.zeros((issue_count, day_count), dtype=np.float32)
+            result = self._daily_frame(scores)
+            self._daily_scores[window] = result
+            return result
+
+    def _daily_frame(self, scores: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(
+            scores,
+            index=pd.Index(self.issues, name="이슈"),
+            columns=pd.DatetimeIndex(self.calendar.days, name="날짜"),
         )
-        scored_rows.append(scored)
-    return pd.DataFrame(scored_rows), with_cycles
+
+    def _sweep_daily_scores(self, window: int, start_column: int = 0) -> np.ndarray:
+        """거래일 위치 start_column부터 마지막 거래일까지의 열을 float32로 계산한다.
+
+        열을 DAILY_SCORE_BLOCK_COLUMNS개씩 나눠 훑고 블록마다 결과에 바로 옮기므로, 중간 배열은
+        전체 거래일이 아니라 블록과 그 앞 window거래일 크기만큼만 잡힌다.
+        """
+        all_ends = np.searchsorted(self.days, self.calendar.days)
+        all_rises = self._rises[self._event_rows]
+        scores = np.zeros((len(self.issues), max(0, all_ends.size - start_column)), dtype=np.float32)
+        for block_start in range(start_column, all_ends.size, DAILY_SCORE_BLOCK_COLUMNS):
+            columns = np.arange(block_start, min(all_ends.size, block_start + DAILY_SCORE_BLOCK_COLUMNS))
+            scores[:, columns - start_column] = self._sweep_column_block(window, columns, all_ends, all_rises)
+        return scores
+
+    def _sweep_column_block(
+        self, window: int, columns: np.ndarray, all_ends: np.ndarray, all_rises: np.ndarray
+    ) -> np.ndarray:
+        """연속한 거래일 열 묶음의 점수. 첫 열의 기간 시작일부터 마지막 열까지의 날짜 축만 잘라 훑는다."""
+        issue_count = len(self.issues)
+        ends = all_ends[columns]
+        day_count = ends.size
+        starts = all_ends[np.maximum(0, columns - window + 1)]
+        lengths = np.minimum(window, columns + 1)
+        offset = int(starts[0])
+        axis_count = int(ends[-1]) + 1 - offset
+        local_ends, local_starts = ends - offset, starts - offset
+
+        # 날짜 축 누적합: 기간 값 = 누적[:, 종료 + 1] - 누적[:, 시작]
+        first_event = int(np.searchsorted(self._event_positions, offset, side="left"))
+        last_event = int(np.searchsorted(self._event_positions, ends[-1], side="right"))
+        positions = self._event_positions[first_event:last_event]
+        issues = self._event_issues[first_event:last_event]
+        rises = all_rises[first_event:last_event]
+        totals = {}
+        for name, weights in {"count": np.ones(positions.size), "rise": rises}.items():
+            dense = np.bincount(
+                issues * (axis_count + 1) + positions - offset + 1,
+                weights=weights,
+                minlength=issue_count * (axis_count + 1),
+            ).reshape(issue_count, axis_count + 1)
+            cumulative = np.cumsum(dense, axis=1)
+            totals[name] = cumulative[:, local_ends + 1] - cumulative[:, local_starts]
+        counts = totals["count"]
+        active = counts > 0
+
+        axis_width = max(1, len(self.days))
+        kept_cells = (self._cell_keys % axis_width >= offset) & (self._cell_keys % axis_width <= ends[-1])
+        cell_issues = self._cell_keys[kept_cells] // axis_width
+        cell_days = self._cell_keys[kept_cells] % axis_width
+        cell_cycles = self._cell_cycles[kept_cells]
+        local_days = cell_days - offset
+        dense = np.zeros((issue_count, axis_count + 1), dtype=np.int32)
+        dense[cell_issues, local_days + 1] = 1
+        cumulative = np.cumsum(dense, axis=1)
+        active_days = cumulative[:, local_ends + 1] - cumulative[:, local_starts]
+
+        # 회차: 종료일 이전 마지막 부각일의 회차 - 시작일 이후 첫 부각일의 회차 + 1
+        last_cycle = np.zeros((issue_count, axis_count), dtype=np.int32)
+        last_cycle[cell_issues, local_days] = cell_cycles
+        last_cycle = np.maximum.accumulate(last_cycle, axis=1)
+        first_cycle = np.full((issue_count, axis_count), np.iinfo(np.int32).max, dtype=np.int32)
+        first_cycle[cell_issues, local_days] = cell_cycles
+        first_cycle = np.minimum.accumulate(first_cycle[:, ::-1], axis=1)[:, ::-1]
+        cycles = np.where(active, last_cycle[:, local_ends] - first_cycle[:, local_starts] + 1, 0)
+
+        recent = np.full((issue_count, axis_count), -1, dtype=np.int32)
+        recent[cell_issues, local_days] = cell_days
+        recent = np.maximum.accumulate(recent, axis=1)[:, local_ends]
+        recent_positions = np.where(
+            self._on_calendar[np.maximum(recent, 0)], self._calendar_positions[np.maximum(recent, 0)], columns
+        )
+        gaps = np.maximum(0, columns - recent_positions)
+
+        # 상승 종목·반복 종목: 이벤트가 세어지는 거래일 구간을 차분 배열로 더한다
+        first_column = np.searchsorted(ends, positions, side="left")
+        last_column = np.searchsorted(starts, positions, side="right") - 1
+
+        def spans(mask, low, high):
+            low, high = low[mask], high[mask]
+            kept = low <= high
+            rows = issues[mask][kept] * (day_count + 1)
+            size = issue_count * (day_count + 1)
+            difference = np.bincount(rows + low[kept], minlength=size) - np.bincount(
+                rows + high[kept] + 1, minlength=size
+            )
+            return np.cumsum(difference.reshape(issue_count, day_count + 1), axis=1)[:, :day_count]
+
+        previous_column = np.searchsorted(starts, self._event_previous_day[first_event:last_event], side="right")
+        stocks = spans(
+            np.ones(positions.size, dtype=bool), np.maximum(first_column, previous_column), last_column
+        )
+        change_column = np.searchsorted(starts, self._event_change_previous_day[first_event:last_event], side="right")
+        repeats = spans(
+            self._event_changed[first_event:last_event],
+            np.maximum(first_column, change_column),
+            np.minimum(last_column, previous_column - 1),
+        )
+
+        medians = self._sweep_medians(ends, starts, all_rises)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            averages = np.where(active, totals["rise"] / counts, 0.0)
+
+            def normalized(values):
+                maximum = values.max(axis=0)
+                return np.where(
+                    (values > 0) & (maximum > 0), np.log1p(values) / np.log1p(np.maximum(maximum, 0)), 0.0
+                )
+
+            breadth = 30.0 * normalized(stocks)
+            activity = 25.0 * (0.65 * normalized(cycles) + 0.35 * normalized(active_days))
+            repeat = 20.0 * (
+                0.65 * normalized(repeats) + 0.35 * np.minimum(1.0, repeats / np.maximum(1, stocks))
+            )
+        strength = 15.0 * (
+            0.45 * np.minimum(1.0, np.maximum(0.0, averages) / 20.0)
+            + 0.55 * np.minimum(1.0, np.maximum(0.0, np.nan_to_num(medians)) / 15.0)
+        )
+        recency = 10.0 * np.power(0.5, gaps / np.maximum(5.0, lengths / 3.0))
+        return np.where(active, breadth + activity + repeat + strength + recency, 0.0)
+
+    def _sweep_medians(self, ends: np.ndarray, starts: np.ndarray, rises: np.ndarray) -> np.ndarray:
+        """거래일마다 기간에 들어오고 나가는 이벤트만 이슈별 정렬 목록에 반영해 중앙값을 구한다."""
+        issue_count, day_count = len(self.issues), ends.size
+        positions, issues = self._event_positions, self._event_issues
+        sorted_rises: list[list[float]] = [[] for _ in range(issue_count)]
+        added = removed = int(np.searchsorted(positions, starts[0], side="left")) if day_count else 0
+        updates: list[tuple[int, int, float]] = []
+        for column in range(day_count):
+            changed = set()
+            while added < positions.size and positions[added] <= ends[column]:
+                issue = int(issues[added])
+                bisect.insort(sorted_rises[issue], float(rises[added]))
+                changed.add(issue)
+                added += 1
+            while removed < added and positions[removed] < starts[column]:
+                issue = int(issues[removed])
+                values = sorted_rises[issue]
+                del values[bisect.bisect_left(values, float(rises[removed]))]
+                changed.add(issue)
+                removed += 1
+            for issue in changed:
+                values = sorted_rises[issue]
+                size = len(values)
+                median = (values[(size - 1) // 2] + values[size // 2]) / 2 if size else np.nan
+                updates.append((issue, column, median))
+
+        medians = np.full((issue_count, day_count), np.nan)
+        if updates:
+            rows, columns, values = (np.array(part) for part in zip(*updates))
+            updated = np.full((issue_count, day_count), -1)
+            updated[rows.astype(int), columns.astype(int)] = columns.astype(int)
+            latest = np.maximum.accumulate(updated, axis=1)
+            recorded = np.full((issue_count, day_count), np.nan)
+            recorded[rows.astype(int), columns.astype(int)] = values
+            has_value = latest >= 0
+            medians[has_value] = recorded[np.nonzero(has_value)[0], latest[has_value]]
+        return medians
+
+
+def hot_issue_preset_period(trading_days, preset: str) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+    """기간 프리셋 이름을 (시작 거래일, 마지막 거래일)로 바꾼다. 달력이 비었으면 None이다."""
+    calendar = TradingCalendar.ensure(trading_days)
+    if not len(calendar):
+        return None
+    end = calendar[-1]
+    count = HOT_ISSUE_PRESETS[preset]
+    if count is None:
+        start_position = int(np.searchsorted(calendar.days, np.datetime64(f"{end.year}-01-01", "ns")))
+    else:
+        start_position = max(0, len(calendar) - count)
+    return calendar[start_position], end
 
 
 def analyze_hot_issues(
-    theme_events: pd.DataFrame,
-    trading_days: Iterable,
+    theme_events: pd.DataFrame | HotIssueIndex,
+    trading_days: TradingCalendar | Iterable,
     start_date,
     end_date,
     compare_previous: bool = True,
     min_stocks: int = 2,
 ) -> tuple[pd.DataFrame, pd.DataFrame, dict[str, object]]:
-    """선택 거래기간의 핫이슈 순위와 이전 동일 거래기간 비교를 계산한다."""
-    ordered_days = sorted(
-        set(pd.to_datetime(pd.Series(list(trading_days)), errors="coerce").dropna().dt.normalize())
-    )
-    if not ordered_days:
+    """선택 거래기간의 핫이슈 순위와 이전 동일 거래기간 비교를 계산한다.
+
+    trading_days에는 거래일 목록이나 미리 만든 TradingCalendar를 넘긴다.
+    기간을 자주 바꿀 때는 theme_events 대신 HotIssueIndex를 한 번 만들어 넘긴다.
+    """
+    calendar = TradingCalendar.ensure(trading_days)
+    if not len(calendar):
         return pd.DataFrame(), pd.DataFrame(columns=THEME_EVENT_COLUMNS), {}
 
     start = pd.Timestamp(start_date).normalize()
     end = pd.Timestamp(end_date).normalize()
-    current_days = [day for day in ordered_days if start <= day <= end]
-    if not current_days:
+    current_days = calendar.between(start, end)
+    if not len(current_days):
         return pd.DataFrame(), pd.DataFrame(columns=THEME_EVENT_COLUMNS), {
             "시작일": start, "종료일": end, "거래일수": 0,
         }
     start, end = current_days[0], current_days[-1]
 
-    event_dates = pd.to_datetime(theme_events.get("날짜"), errors="coerce").dt.normalize()
-    current_events = theme_events[event_dates.between(start, end)].copy()
-    current_summary, current_events = _summarize_hot_period(current_events, current_days, end)
+    hot_index = HotIssueIndex.ensure(theme_events, calendar)
+    current_summary = hot_index.summarize(current_days)
+    current_events = hot_index.period_events(current_days)
     if not current_summary.empty:
         current_summary = current_summary[current_summary["상승종목수"] >= int(min_stocks)].copy()
 
     previous_start = previous_end = pd.NaT
     previous_summary = pd.DataFrame()
     if compare_previous:
-        start_position = ordered_days.index(start)
-        previous_days = ordered_days[max(0, start_position - len(current_days)):start_position]
-        if previous_days:
+        start_position = int(calendar.positions([np.datetime64(start, "ns")])[0])
+        previous_days = calendar.window(start_position - len(current_days), start_position)
+        if len(previous_days):
             previous_start, previous_end = previous_days[0], previous_days[-1]
-            previous_events = theme_events[event_dates.between(previous_start, previous_end)].copy()
-            previous_summary, _ = _summarize_hot_period(previous_events, previous_days, previous_end)
+            previous_summary = hot_index.summarize(previous_days)
 
     previous_scores = (
         previous_summary.set_index("이슈")["핫점수"].to_dict()
@@ -547,18 +1571,17 @@ def analyze_hot_issues(
         current_summary["이전기간점수"] = current_summary["이슈"].map(previous_scores).fillna(0.0)
         current_summary["점수변화"] = current_summary["핫점수"] - current_summary["이전기간점수"]
 
-        def status_for(row):
-            if row["이슈"] not in previous_scores:
-                return "신규 부각"
-            if row["점수변화"] >= 8:
-                return "확산"
-            if row["점수변화"] <= -8:
-                return "관심 약화"
-            if row["부각회차수"] >= 2 and row["반복종목수"] >= 1:
-                return "반복 부각"
-            return "현재 부각"
-
-        current_summary["상태"] = current_summary.apply(status_for, axis=1)
+        change = current_summary["점수변화"]
+        current_summary["상태"] = np.select(
+            [
+                ~current_summary["이슈"].isin(previous_scores),
+                change >= 8,
+                change <= -8,
+                (current_summary["부각회차수"] >= 2) & (current_summary["반복종목수"] >= 1),
+            ],
+            ["신규 부각", "확산", "관심 약화", "반복 부각"],
+            default="현재 부각",
+        )
         current_summary = current_summary.sort_values(
             ["핫점수", "상승종목수", "최근부각일"],
             ascending=[False, False, False],
@@ -2,13 +2,29 @@
 
 from __future__ import annotations
 
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+import hashlib
 import json
+import os
 from pathlib import Path
+import pickle
+import shutil
+import threading
+import time
+import uuid
 from typing import Iterable, Mapping, Sequence
+import weakref
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
 from app_utils import convert_rise_rate, normalize_stock_code
 
 
@@ -23,6 +39,22 @@ DOCUMENT_COLUMNS = [
     "검색필드",
 ]
 
+# 인덱스에 반복 저장되는 문자열 열은 범주형 코드로 보관한다.
+CATEGORY_COLUMNS = ["종목키", "종목명", "출처", "검색필드"]
+# 근거문장을 본문 구간으로 나타낼 때 쓰는 열. 구간 두 개를 (시작, 끝) 16비트씩 담는다.
+EVIDENCE_SPAN_COLUMN = "근거구간"
+_SPAN_BITS = 16
+
+GRAM_SIZE = 2
+_GRAM_SHIFT = 21
+_DOC_BITS = 22
+_GRAM_SEPARATOR = "\x00"
+
+SNAPSHOT_VERSION = 4
+SNAPSHOT_PREFIX = "search_index"
+_TERM_INDEX_ARRAYS = ("gram_keys", "offsets", "postings", "always_check")
+_file_digests: dict[tuple[str, int, int], str] = {}
+
 
 def _clean_text(value) -> str:
     if value is None or pd.isna(value):
@@ -160,11 +192,36 @@ def _preferred_names_by_key(
     return preferred
 
 
-def _row_stock_identity(row: pd.Series) -> tuple[str, str]:
-    name = _clean_text(row.get("종목명"))
-    existing_key = _clean_text(row.get("__stock_key"))
-    code = normalize_stock_code(row.get("종목코드"))
-    return existing_key or code or name, name
+def _clean_text_values(frame: pd.DataFrame, column: str) -> np.ndarray:
+    """_clean_text를 열 전체에 적용해 object 문자열 배열로 돌려준다."""
+    if column not in frame.columns:
+        return np.full(len(frame), "", dtype=object)
+    values = frame[column]
+    result = np.full(len(values), "", dtype=object)
+    present = values.notna().to_numpy(dtype=bool)
+    if present.any():
+        texts = [str(value).strip() for value in values.to_numpy(dtype=object)[present]]
+        result[present] = [
+            "" if text.lower() in {"nan", "none", "nat"} else text for text in texts
+        ]
+    return result
+
+
+def _map_unique(values: pd.Series, convert) -> np.ndarray:
+    """반복 값이 많은 열은 고유값마다 한 번만 변환한다."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    converted = np.array([convert(value) for value in uniques] + [convert(None)], dtype=object)
+    return converted[codes]
+
+
+def _column_or_none(frame: pd.DataFrame, column: str) -> pd.Series:
+    if column in frame.columns:
+        return frame[column]
+    return pd.Series([None] * len(frame), index=frame.index, dtype=object)
+
+
+def _prefixed(prefix: str, values: np.ndarray) -> np.ndarray:
+    return np.where(values != "", prefix + values, "")
 
 
 def _make_documents(
@@ -174,55 +231,268 @@ def _make_documents(
     evidence_columns: Sequence[str],
     aliases_by_key: Mapping[str, Sequence[str]],
     dynamic_source: bool = False,
-) -> list[dict[str, object]]:
+) -> pd.DataFrame:
     if frame is None or frame.empty or "종목명" not in frame.columns:
-        return []
+        return pd.DataFrame(columns=DOCUMENT_COLUMNS)
 
-    available_text = [column for column in text_columns if column in frame.columns]
-    available_evidence = [column for column in evidence_columns if column in frame.columns]
-    documents: list[dict[str, object]] = []
+    names = _clean_text_values(frame, "종목명")
+    existing_keys = _clean_text_values(frame, "__stock_key")
+    codes = _map_unique(_column_or_none(frame, "종목코드"), normalize_stock_code)
+    stock_keys = np.where(existing_keys != "", existing_keys, np.where(codes != "", codes, names))
+    keep = (stock_keys != "") & (names != "")
+    if not keep.any():
+        return pd.DataFrame(columns=DOCUMENT_COLUMNS)
 
-    for _, row in frame.iterrows():
-        stock_key, stock_name = _row_stock_identity(row)
-        if not stock_key or not stock_name:
-            continue
+    frame = frame.iloc[np.flatnonzero(keep)]
+    names, stock_keys = names[keep], stock_keys[keep]
+    cleaned = {
+        column: _clean_text_values(frame, column)
+        for column in dict.fromkeys([*text_columns, *evidence_columns])
+        if column in frame.columns
+    }
 
-        parts: list[str] = [f"종목키: {stock_key}"]
-        used_fields: list[str] = ["종목키"]
-        for column in available_text:
-            value = _clean_text(row.get(column))
-            if value:
-                parts.append(f"{column}: {value}")
-                used_fields.append(column)
-
-        alias_names = aliases_by_key.get(stock_key, [])
-        if alias_names:
-            parts.append(f"구 사명·별칭: {' '.join(alias_names)}")
-
-        evidence_parts = [
-            _clean_text(row.get(column))
-            for column in available_evidence
-            if _clean_text(row.get(column))
-        ]
-        evidence = "\n".join(evidence_parts) or "\n".join(parts)
-        if not parts:
-            continue
+    body = "종목키: " + stock_keys
+    used_fields = np.full(len(frame), "종목키", dtype=object)
+    for column in text_columns:
+        if column in cleaned:
+            body = body + _prefixed(f"\n{column}: ", cleaned[column])
+            used_fields = used_fields + _prefixed(", ", np.where(cleaned[column] != "", column, ""))
 
-        rise_value, _ = convert_rise_rate(row.get("상승률"))
-        row_source = _clean_text(row.get("__source")) if dynamic_source else source
-        documents.append(
-            {
-                "종목키": stock_key,
-                "종목명": stock_name,
-                "날짜": pd.to_datetime(row.get("날짜"), errors="coerce"),
-                "출처": row_source or source,
-                "상승률": rise_value,
-                "검색본문": "\n".join(parts),
-                "근거문장": evidence,
-                "검색필드": ", ".join(used_fields),
-            }
+    alias_text = {
+        key: f"\n구 사명·별칭: {' '.join(names_for_key)}"
+        for key, names_for_key in aliases_by_key.items()
+        if names_for_key
+    }
+    if alias_text:
+        body = body + np.array([alias_text.get(key, "") for key in stock_keys], dtype=object)
+
+    evidence = np.full(len(frame), "", dtype=object)
+    for column in evidence_columns:
+        if column in cleaned:
+            evidence = evidence + _prefixed("\n", cleaned[column])
+    evidence = np.where(evidence != "", np.array([text[1:] for text in evidence], dtype=object), body)
+
+    if dynamic_source:
+        row_sources = _clean_text_values(frame, "__source")
+        sources = np.where(row_sources != "", row_sources, source)
+    else:
+        sources = np.full(len(frame), source, dtype=object)
+
+    dates = _column_or_none(frame, "날짜")
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = _map_unique(dates, lambda value: pd.to_datetime(value, errors="coerce"))
+    rises = _map_unique(_column_or_none(frame, "상승률"), lambda value: convert_rise_rate(value)[0])
+
+    return pd.DataFrame(
+        {
+            "종목키": stock_keys,
+            "종목명": names,
+            "날짜": pd.to_datetime(pd.Series(dates, dtype=object), errors="coerce").to_numpy(),
+            "출처": sources,
+            "상승률": pd.to_numeric(pd.Series(rises, dtype=object), errors="coerce").to_numpy(),
+            "검색본문": body,
+            "근거문장": evidence,
+            "검색필드": used_fields,
+        },
+        columns=DOCUMENT_COLUMNS,
+    )
+
+
+# (출처, 검색 컬럼, 근거 컬럼, 시트명 출처 사용 여부) — build_search_index 인자 순서와 같다.
+_SOURCE_SPECS = (
+    (
+        "상천 이력",
+        ["종목명", "종목코드", "테마", "상승이유"],
+        ["상승이유", "테마"],
+        False,
+    ),
+    (
+        "시그널리포트 테마",
+        [
+            "종목명", "종목코드", "대분류", "중분류", "테마", "핵심테마",
+            "주요뉴스", "주요사업", "재무구조", "디지털자산관련구체적사업영역",
+        ],
+        ["주요뉴스", "주요사업", "재무구조", "디지털자산관련구체적사업영역", "테마", "핵심테마"],
+        True,
+    ),
+    (
+        "종목 테마·기업개요",
+        ["종목명", "종목코드", "테마_전체", "테마", "기업개요", "핵심요약"],
+        ["테마_전체", "테마", "기업개요", "핵심요약"],
+        False,
+    ),
+    (
+        "기업 핵심요약",
+        ["종목명", "종목코드", "기업개요", "핵심요약", "핵심요약(3줄정리)"],
+        ["기업개요", "핵심요약", "핵심요약(3줄정리)"],
+        False,
+    ),
+    (
+        "테마별 상세분석",
+        ["종목명", "종목코드", "테마명", "분석결과"],
+        ["테마명", "분석결과"],
+        False,
+    ),
+)
+DEDUP_COLUMNS = ["종목키", "날짜", "출처", "검색본문"]
+_SOURCE_RANKS = {source: rank for rank, (source, *_) in enumerate(_SOURCE_SPECS)}
+# 시트명을 출처로 쓰는 문서(정적 출처명에 없는 출처)는 그 스펙 자리에 놓는다.
+_DYNAMIC_SOURCE_RANK = next(rank for rank, spec in enumerate(_SOURCE_SPECS) if spec[3])
+
+
+def _build_documents(
+    frames: Sequence[pd.DataFrame | None],
+    name_aliases: Mapping[str, str] | None,
+    stock_code_map: Mapping[str, str] | None,
+) -> pd.DataFrame:
+    """출처별 문서를 만들어 이어 붙이되 중복 제거는 호출자에게 맡긴다."""
+    aliases_by_key = build_stock_alias_lookup(name_aliases, stock_code_map)
+    documents = [
+        _make_documents(frame, source, text_columns, evidence_columns, aliases_by_key, dynamic)
+        for frame, (source, text_columns, evidence_columns, dynamic) in zip(frames, _SOURCE_SPECS)
+    ]
+    documents = [frame for frame in documents if not frame.empty]
+    if not documents:
+        return pd.DataFrame(columns=DOCUMENT_COLUMNS)
+
+    index = pd.concat(documents, ignore_index=True)
+    index["날짜"] = pd.to_datetime(index["날짜"], errors="coerce")
+    index["상승률"] = pd.to_numeric(index["상승률"], errors="coerce")
+    preferred_names = _preferred_names_by_key(name_aliases, stock_code_map)
+    if preferred_names:
+        preferred = index["종목키"].astype(str).map(preferred_names)
+        index["종목명"] = preferred.where(preferred.notna(), index["종목명"])
+    return index
+
+
+def _document_order_keys(documents: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """문서 순서 키 (출처 스펙 순위, 날짜 내림차순 키). 날짜가 없는 문서는 출처 안에서 맨 뒤로 간다."""
+    ranks = _map_unique(
+        documents["출처"], lambda source: _SOURCE_RANKS.get(source, _DYNAMIC_SOURCE_RANK)
+    ).astype(np.int64)
+    dates = documents["날짜"].to_numpy(dtype="datetime64[ns]")
+    date_keys = np.where(np.isnat(dates), np.iinfo(np.int64).max, -dates.view(np.int64))
+    return ranks, date_keys
+
+
+def _document_order(documents: pd.DataFrame) -> np.ndarray:
+    """build_search_index와 append_search_index가 함께 쓰는 문서 행 순서.
+
+    출처 스펙 순서, 같은 출처 안에서는 최신 날짜 순이며 같은 키끼리는 원래 순서를 지킨다.
+    검색 동점 순위와 다음커서가 행 위치를 쓰므로 두 경로의 행 순서가 같아야 한다.
+    """
+    ranks, date_keys = _document_order_keys(documents)
+    return np.lexsort((date_keys, ranks))
+
+
+def _evidence_span(body: str, evidence: str) -> int:
+    """근거문장을 본문 속 구간 최대 두 개로 부호화한다. 나타낼 수 없으면 0을 반환한다."""
+    parts = evidence.split("\n")
+    if len(parts) > 2:
+        return 0
+    code = 0
+    for part in parts:
+        start = body.find(part)
+        end = start + len(part)
+        if not part or start < 0 or end >= 1 << _SPAN_BITS:
+            return 0
+        code = (code << 2 * _SPAN_BITS) | (start << _SPAN_BITS) | end
+    return code
+
+
+def _decode_evidence(body: str, evidence, code: int) -> str:
+    if isinstance(evidence, str):
+        return evidence
+    if not code:
+        return body
+    mask = (1 << _SPAN_BITS) - 1
+    spans = [code >> 2 * _SPAN_BITS, code & ((1 << 2 * _SPAN_BITS) - 1)]
+    return "\n".join(
+        body[span >> _SPAN_BITS: span & mask] for span in spans if span
+    )
+
+
+def compact_search_index(search_index: pd.DataFrame) -> pd.DataFrame:
+    """반복 문자열 열은 범주형으로, 본문에서 잘라 낼 수 있는 근거문장은 구간 코드로 바꾼다.
+
+    근거문장 열에는 구간으로 나타낼 수 없는 문장만 남고, 본문과 같은 근거(대체 근거)는 비워 둔다.
+    이미 압축된 행은 그대로 두므로 append 뒤 다시 호출해도 된다.
+    """
+    index = search_index.copy()
+    if EVIDENCE_SPAN_COLUMN not in index.columns:
+        index[EVIDENCE_SPAN_COLUMN] = np.zeros(len(index), dtype=np.uint64)
+    codes = index[EVIDENCE_SPAN_COLUMN].fillna(0).to_numpy(dtype=np.uint64, copy=True)
+    evidence = index["근거문장"].to_numpy(dtype=object, copy=True)
+    bodies = index["검색본문"].astype(object).to_numpy()
+    pending = np.flatnonzero(pd.notna(evidence))
+    for row in pending:
+        if evidence[row] == bodies[row]:
+            evidence[row] = None
+        else:
+            code = _evidence_span(bodies[row], evidence[row])
+            if code:
+                codes[row] = code
+                evidence[row] = None
+    index["근거문장"] = pd.Series(evidence, index=index.index, dtype="str")
+    index[EVIDENCE_SPAN_COLUMN] = codes
+    for column in CATEGORY_COLUMNS:
+        index[column] = index[column].astype("category")
+    return index
+
+
+def document_evidence(search_index: pd.DataFrame) -> pd.Series:
+    """압축된 인덱스에서 행별 근거문장 원문을 복원한다."""
+    if EVIDENCE_SPAN_COLUMN not in search_index.columns:
+        return search_index["근거문장"]
+    values = [
+        _decode_evidence(body, evidence, int(code))
+        for body, evidence, code in zip(
+            search_index["검색본문"].astype(object),
+            search_index["근거문장"].astype(object),
+            search_index[EVIDENCE_SPAN_COLUMN].to_numpy(dtype=np.uint64),
         )
-    return documents
+    ]
+    return pd.Series(values, index=search_index.index, dtype="str", name="근거문장")
+
+
+def _expand_documents(documents: pd.DataFrame) -> pd.DataFrame:
+    """검색 결과용으로 범주형 열과 근거 구간을 일반 문자열 열로 되돌린다."""
+    expanded = documents.copy()
+    expanded.attrs = {}
+    expanded["근거문장"] = document_evidence(documents)
+    for column in CATEGORY_COLUMNS:
+        if isinstance(expanded[column].dtype, pd.CategoricalDtype):
+            expanded[column] = expanded[column].astype("str")
+    return expanded[DOCUMENT_COLUMNS]
+
+
+# id(인덱스 DataFrame) -> (그 DataFrame의 약한 참조, 버전 토큰). attrs는 필터·복사한 DataFrame에도
+# 그대로 복사되므로 버전은 DataFrame 객체 자체에 묶어 둔다.
+_index_versions: dict[int, tuple[weakref.ref, str]] = {}
+
+
+def _forget_version(key: int, ref: weakref.ref) -> None:
+    if _index_versions.get(key, (None,))[0] is ref:
+        _index_versions.pop(key, None)
+
+
+def _stamp_version(search_index: pd.DataFrame) -> pd.DataFrame:
+    key = id(search_index)
+    ref = weakref.ref(search_index, lambda ref, key=key: _forget_version(key, ref))
+    _index_versions[key] = (ref, uuid.uuid4().hex)
+    return search_index
+
+
+def index_version(search_index: pd.DataFrame) -> str:
+    """인덱스 내용이 바뀔 때마다 새로 발급되는 버전 토큰. 질의 캐시 키에 쓴다.
+
+    토큰은 발급받은 DataFrame 객체에만 붙으므로, 인덱스를 거르거나 복사한 DataFrame은 따로 토큰을 받는다.
+    """
+    entry = _index_versions.get(id(search_index))
+    if entry is None or entry[0]() is not search_index:
+        _stamp_version(search_index)
+        entry = _index_versions[id(search_index)]
+    return entry[1]
 
 
 def build_search_index(
@@ -235,77 +505,623 @@ def build_search_index(
     stock_code_map: Mapping[str, str] | None = None,
 ) -> pd.DataFrame:
     """여러 엑셀 스키마를 표준 검색 문서 구조로 통합한다."""
-    aliases_by_key = build_stock_alias_lookup(name_aliases, stock_code_map)
-    documents: list[dict[str, object]] = []
-
-    documents.extend(
-        _make_documents(
-            df_sangcheon,
-            "상천 이력",
-            ["종목명", "종목코드", "테마", "상승이유"],
-            ["상승이유", "테마"],
-            aliases_by_key,
-        )
+    index = _build_documents(
+        [df_sangcheon, df_signal, df_themes, df_company_overview, df_analysis],
+        name_aliases,
+        stock_code_map,
     )
-    documents.extend(
-        _make_documents(
-            df_signal,
-            "시그널리포트 테마",
-            [
-                "종목명", "종목코드", "대분류", "중분류", "테마", "핵심테마",
-                "주요뉴스", "주요사업", "재무구조", "디지털자산관련구체적사업영역",
-            ],
-            ["주요뉴스", "주요사업", "재무구조", "디지털자산관련구체적사업영역", "테마", "핵심테마"],
-            aliases_by_key,
-            dynamic_source=True,
+    if index.empty:
+        return index
+    index = index.drop_duplicates(subset=DEDUP_COLUMNS, keep="first")
+    index = index.iloc[_document_order(index)].reset_index(drop=True)
+    return _stamp_version(compact_search_index(index))
+
+
+def _touched_sources(frames: Sequence[pd.DataFrame | None]) -> set[str]:
+    sources: set[str] = set()
+    for frame, (source, _, _, dynamic) in zip(frames, _SOURCE_SPECS):
+        if frame is None:
+            continue
+        sources.add(source)
+        if dynamic and "__source" in frame.columns:
+            sources.update(text for text in _clean_text_values(frame, "__source") if text)
+    return sources
+
+
+def append_search_index(
+    search_index: pd.DataFrame,
+    df_sangcheon: pd.DataFrame | None = None,
+    df_signal: pd.DataFrame | None = None,
+    df_themes: pd.DataFrame | None = None,
+    df_company_overview: pd.DataFrame | None = None,
+    df_analysis: pd.DataFrame | None = None,
+    name_aliases: Mapping[str, str] | None = None,
+    stock_code_map: Mapping[str, str] | None = None,
+    replace_stock_keys: Iterable[str] | None = None,
+) -> pd.DataFrame:
+    """새·변경 원본 행의 문서만 만들어 기존 인덱스에 끼워 넣는다.
+
+    새 문서는 전체 재빌드에서 놓일 자리(출처 순서, 같은 출처 안에서는 최신 날짜 순)에 들어가고,
+    같은 출처·날짜의 기존 문서보다는 뒤에 놓인다. 중복 판정은 build_search_index와 같이 먼저 있던 문서를 남긴다.
+    replace_stock_keys의 종목은 이번에 넘긴 출처의 기존 문서를 지운 뒤 새 문서로 대체하므로,
+    해당 종목은 그 출처의 현재 행을 모두 넘겨야 한다.
+    """
+    frames = [df_sangcheon, df_signal, df_themes, df_company_overview, df_analysis]
+    if search_index is None or search_index.empty:
+        return build_search_index(*frames, name_aliases, stock_code_map)
+
+    result = search_index
+    replaced = {str(key) for key in (replace_stock_keys or []) if str(key)}
+    if replaced:
+        stale = result["종목키"].isin(replaced) & result["출처"].isin(_touched_sources(frames))
+        if stale.any():
+            result = result.loc[~stale.to_numpy(dtype=bool)]
+
+    new_documents = _build_documents(frames, name_aliases, stock_code_map)
+    if new_documents.empty:
+        return _stamp_version(result.reset_index(drop=True))
+
+    new_documents = new_documents.drop_duplicates(subset=DEDUP_COLUMNS, keep="first")
+    related = result.loc[result["종목키"].isin(new_documents["종목키"].unique()), DEDUP_COLUMNS]
+    if not related.empty:
+        candidates = pd.concat([related, new_documents[DEDUP_COLUMNS]], ignore_index=True)
+        duplicated = candidates.duplicated(subset=DEDUP_COLUMNS, keep="first").to_numpy()
+        new_documents = new_documents.loc[~duplicated[len(related):]]
+    if new_documents.empty:
+        return _stamp_version(result.reset_index(drop=True))
+    # 구간 코드 열이 없는 채로 이어 붙이면 float64가 되어 2^53을 넘는 기존 코드가 반올림된다.
+    new_documents = new_documents.assign(**{EVIDENCE_SPAN_COLUMN: np.zeros(len(new_documents), dtype=np.uint64)})
+    combined = pd.concat([result, new_documents], ignore_index=True)
+    combined = combined.iloc[_document_order(combined)].reset_index(drop=True)
+    return _stamp_version(compact_search_index(combined))
+
+
+@dataclass(frozen=True)
+class TermIndex:
+    """검색본문 대문자 2글자 n-gram에서 문서 행 위치로 가는 역색인."""
+
+    size: int
+    gram_keys: np.ndarray
+    offsets: np.ndarray
+    postings: np.ndarray
+    always_check: np.ndarray
+
+    def candidates(self, term: str) -> np.ndarray | None:
+        """term을 포함할 수 있는 행 위치를 돌려주고, 좁힐 수 없으면 None을 돌려준다."""
+        folded = str(term).upper()
+        if len(folded) < GRAM_SIZE or not _is_foldable_text(term):
+            return None
+
+        keys = _sorted_unique(_gram_keys(_text_codes(folded)))
+        slots = np.searchsorted(self.gram_keys, keys)
+        found = slots < len(self.gram_keys)
+        if not found.all() or (self.gram_keys[slots] != keys).any():
+            return self.always_check
+
+        postings = sorted(
+            (self.postings[self.offsets[slot]:self.offsets[slot + 1]] for slot in slots),
+            key=len,
         )
+        result = postings[0]
+        for posting in postings[1:]:
+            if not result.size:
+                break
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return np.union1d(result, self.always_check)
+
+
+def _is_foldable_char(char: str) -> bool:
+    return char.isascii() or char.upper() == char == char.lower()
+
+
+def _is_foldable_text(text: str) -> bool:
+    """대소문자 변환이 ASCII 범위에서만 일어나 n-gram 후보가 누락되지 않는 문자열인지 확인한다."""
+    return _GRAM_SEPARATOR not in text and all(_is_foldable_char(char) for char in text)
+
+
+def _text_codes(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+def _gram_keys(codes: np.ndarray) -> np.ndarray:
+    codes = codes.astype(np.uint64)
+    return (codes[:-1] << np.uint64(_GRAM_SHIFT)) | codes[1:]
+
+
+def _sorted_unique(values: np.ndarray) -> np.ndarray:
+    values = np.sort(values)
+    if values.size < 2:
+        return values
+    return values[np.r_[True, values[1:] != values[:-1]]]
+
+
+def build_term_index(search_index: pd.DataFrame) -> TermIndex:
+    """검색본문 n-gram 역색인을 만들어 리터럴 검색의 후보 행을 좁힌다.
+
+    비ASCII 대소문자 문자가 섞인 문서는 대소문자 변환 규칙이 pandas 백엔드마다
+    달라질 수 있어 항상 후보에 넣고, 최종 일치 여부는 기존 str.contains로 확인한다.
+    """
+    texts = (
+        search_index["검색본문"].fillna("").astype(str).tolist()
+        if search_index is not None and "검색본문" in search_index.columns
+        else []
     )
-    documents.extend(
-        _make_documents(
-            df_themes,
-            "종목 테마·기업개요",
-            ["종목명", "종목코드", "테마_전체", "테마", "기업개요", "핵심요약"],
-            ["테마_전체", "테마", "기업개요", "핵심요약"],
-            aliases_by_key,
-        )
+    empty_positions = np.array([], dtype=np.int64)
+    if not texts:
+        return TermIndex(0, np.array([], dtype=np.uint64), np.zeros(1, dtype=np.int64),
+                         empty_positions, empty_positions)
+
+    original_codes = _text_codes(_GRAM_SEPARATOR.join(texts))
+    unique_codes = _sorted_unique(original_codes)
+    unsafe_codes = np.array(
+        [code for code in unique_codes.tolist() if code and not _is_foldable_char(chr(code))],
+        dtype=np.uint32,
     )
-    documents.extend(
-        _make_documents(
-            df_company_overview,
-            "기업 핵심요약",
-            ["종목명", "종목코드", "기업개요", "핵심요약", "핵심요약(3줄정리)"],
-            ["기업개요", "핵심요약", "핵심요약(3줄정리)"],
-            aliases_by_key,
-        )
+    original_lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    original_docs = np.repeat(np.arange(len(texts), dtype=np.int64), original_lengths + 1)
+    unsafe_docs = np.unique(original_docs[: original_codes.size][np.isin(original_codes, unsafe_codes)])
+    separator_docs = [position for position, text in enumerate(texts) if _GRAM_SEPARATOR in text]
+    always_check = np.union1d(unsafe_docs, np.array(separator_docs, dtype=np.int64))
+
+    folded = [text.upper() for text in texts]
+    codes = _text_codes(_GRAM_SEPARATOR.join(folded))
+    lengths = np.fromiter(map(len, folded), dtype=np.int64, count=len(folded))
+    docs = np.repeat(np.arange(len(folded), dtype=np.int64), lengths + 1)[: codes.size]
+    valid = (codes[:-1] != 0) & (codes[1:] != 0)
+    grams = _gram_keys(codes)[valid]
+    gram_docs = docs[:-1][valid]
+
+    if len(folded) < 1 << _DOC_BITS:
+        packed = _sorted_unique((grams << np.uint64(_DOC_BITS)) | gram_docs.astype(np.uint64))
+        grams = packed >> np.uint64(_DOC_BITS)
+        gram_docs = (packed & np.uint64((1 << _DOC_BITS) - 1)).astype(np.int64)
+    else:
+        order = np.lexsort((gram_docs, grams))
+        grams, gram_docs = grams[order], gram_docs[order]
+        distinct = np.ones(grams.size, dtype=bool)
+        distinct[1:] = (grams[1:] != grams[:-1]) | (gram_docs[1:] != gram_docs[:-1])
+        grams, gram_docs = grams[distinct], gram_docs[distinct]
+
+    starts = np.flatnonzero(np.r_[True, grams[1:] != grams[:-1]]) if grams.size else empty_positions
+    offsets = np.append(starts, grams.size).astype(np.int64)
+    return TermIndex(
+        size=len(texts),
+        gram_keys=grams[starts],
+        offsets=offsets,
+        postings=gram_docs.astype(np.int32),
+        always_check=always_check,
     )
-    documents.extend(
-        _make_documents(
-            df_analysis,
-            "테마별 상세분석",
-            ["종목명", "종목코드", "테마명", "분석결과"],
-            ["테마명", "분석결과"],
-            aliases_by_key,
-        )
+
+
+def _added_positions(previous_index: pd.DataFrame, search_index: pd.DataFrame) -> np.ndarray | None:
+    """append_search_index가 previous_index에 끼워 넣은 행의 위치. 기존 행이 빠졌으면 None."""
+    if len(search_index) < len(previous_index):
+        return None
+    if previous_index.empty:
+        return np.arange(len(search_index))
+    previous_ranks, previous_dates = _document_order_keys(previous_index)
+    current_ranks, current_dates = _document_order_keys(search_index)
+    dates, date_codes = np.unique(np.concatenate([previous_dates, current_dates]), return_inverse=True)
+    groups = np.concatenate([previous_ranks, current_ranks]) * dates.size + date_codes
+    previous_groups, current_groups = groups[: len(previous_index)], groups[len(previous_index):]
+    if (np.diff(previous_groups) < 0).any() or (np.diff(current_groups) < 0).any():
+        return None
+
+    # 같은 출처·날짜 묶음 안에서는 기존 행이 앞에 남고 새 행이 뒤에 붙는다.
+    previous_counts = (
+        np.searchsorted(previous_groups, current_groups, side="right")
+        - np.searchsorted(previous_groups, current_groups, side="left")
     )
+    within_group = np.arange(len(search_index)) - np.searchsorted(current_groups, current_groups)
+    added = np.flatnonzero(within_group >= previous_counts)
+    kept = np.delete(np.arange(len(search_index)), added)
+    if kept.size != len(previous_index) or not search_index["검색본문"].iloc[kept].reset_index(drop=True).equals(
+        previous_index["검색본문"].reset_index(drop=True)
+    ):
+        return None
+    return added
 
-    if not documents:
-        return pd.DataFrame(columns=DOCUMENT_COLUMNS)
 
-    index = pd.DataFrame.from_records(documents, columns=DOCUMENT_COLUMNS)
-    index["날짜"] = pd.to_datetime(index["날짜"], errors="coerce")
-    index["상승률"] = pd.to_numeric(index["상승률"], errors="coerce")
-    preferred_names = _preferred_names_by_key(name_aliases, stock_code_map)
-    if preferred_names:
-        index["종목명"] = index.apply(
-            lambda row: preferred_names.get(str(row["종목키"]), row["종목명"]), axis=1
-        )
-    index = index.drop_duplicates(
-        subset=["종목키", "날짜", "출처", "검색본문"], keep="first"
-    ).reset_index(drop=True)
-    return index
+def extend_term_index(
+    term_index: TermIndex | None,
+    search_index: pd.DataFrame,
+    previous_index: pd.DataFrame | None = None,
+) -> TermIndex:
+    """append_search_index로 더해진 행만 색인해 기존 역색인에 합친다.
 
+    previous_index(term_index를 만든 인덱스)를 넘기면 새 행이 끼어든 자리를 찾아 기존 행 위치를
+    옮긴다. 넘기지 않으면 앞쪽 term_index.size개 행이 바뀌지 않았다고 본다. replace_stock_keys로
+    기존 문서를 지운 경우에는 build_term_index로 다시 만든다.
+    """
+    if term_index is None or term_index.size > len(search_index):
+        return build_term_index(search_index)
+    if previous_index is None:
+        added = np.arange(term_index.size, len(search_index))
+    else:
+        added = _added_positions(previous_index, search_index)
+        if added is None or len(previous_index) != term_index.size:
+            return build_term_index(search_index)
+    if not added.size:
+        return term_index
 
-def search_documents(
+    old_positions = np.delete(np.arange(len(search_index)), added)
+    delta = build_term_index(search_index.iloc[added])
+    gram_keys = _sorted_unique(np.concatenate([term_index.gram_keys, delta.gram_keys]))
+
+    # (n-gram 자리, 행 위치)를 한 정수로 묶어 두 정렬 목록을 병합한다.
+    size = np.int64(len(search_index))
+    old_slots = np.repeat(np.searchsorted(gram_keys, term_index.gram_keys), np.diff(term_index.offsets))
+    delta_slots = np.repeat(np.searchsorted(gram_keys, delta.gram_keys), np.diff(delta.offsets))
+    old_entries = old_slots * size + old_positions[term_index.postings]
+    delta_entries = delta_slots * size + added[delta.postings]
+    entries = np.insert(old_entries, np.searchsorted(old_entries, delta_entries), delta_entries)
+    counts = np.bincount(entries // size, minlength=gram_keys.size)
+    return TermIndex(
+        size=len(search_index),
+        gram_keys=gram_keys,
+        offsets=np.append(0, np.cumsum(counts)).astype(np.int64),
+        postings=(entries % size).astype(np.int32),
+        always_check=np.union1d(old_positions[term_index.always_check], added[delta.always_check]),
+    )
+
+
+def _file_digest(path: Path) -> str:
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    if memo_key not in _file_digests:
+        digest = hashlib.sha256()
+        with path.open("rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        _file_digests[memo_key] = digest.hexdigest()
+    return _file_digests[memo_key]
+
+
+def compute_source_fingerprint(sources: Iterable[str | Path | bytes]) -> str:
+    """입력 파일 내용과 스냅샷 버전으로 검색 인덱스 스냅샷 키를 만든다.
+
+    경로는 수정 시각과 크기가 같으면 이전 해시를 재사용하고, 없는 파일도 키에 반영한다.
+    """
+    digest = hashlib.sha256(f"{SNAPSHOT_PREFIX}-v{SNAPSHOT_VERSION}".encode())
+    for source in sources:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            digest.update(b"bytes:" + hashlib.sha256(source).hexdigest().encode())
+            continue
+        path = Path(source)
+        marker = _file_digest(path) if path.is_file() else "missing"
+        digest.update(f"{path.name}:{marker}".encode())
+    return digest.hexdigest()
+
+
+def _snapshot_path(directory: str | Path, fingerprint: str) -> Path:
+    return Path(directory) / f"{SNAPSHOT_PREFIX}_v{SNAPSHOT_VERSION}_{fingerprint[:24]}"
+
+
+def save_index_snapshot(
+    directory: str | Path,
+    fingerprint: str,
+    search_index: pd.DataFrame,
+    term_index: TermIndex,
+    keep: int = 2,
+) -> Path:
+    """완성된 인덱스와 n-gram 배열을 버전이 붙은 스냅샷 폴더에 원자적으로 저장한다."""
+    target = _snapshot_path(directory, fingerprint)
+    staging = target.with_name(f"{target.name}.tmp{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    with (staging / "documents.pkl").open("wb") as file:
+        pickle.dump(search_index, file, protocol=pickle.HIGHEST_PROTOCOL)
+    for name in _TERM_INDEX_ARRAYS:
+        np.save(staging / f"{name}.npy", getattr(term_index, name))
+    (staging / "meta.json").write_text(
+        json.dumps(
+            {
+                "version": SNAPSHOT_VERSION,
+                "fingerprint": fingerprint,
+                "documents": len(search_index),
+                "created": time.time(),
+            }
+        ),
+        encoding="utf-8",
+    )
+    shutil.rmtree(target, ignore_errors=True)
+    staging.rename(target)
+
+    snapshots = sorted(
+        (path for path in Path(directory).glob(f"{SNAPSHOT_PREFIX}_v*") if path.is_dir() and path != target),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    for stale in snapshots[max(0, keep - 1):]:
+        shutil.rmtree(stale, ignore_errors=True)
+    return target
+
+
+def load_index_snapshot(
+    directory: str | Path,
+    fingerprint: str,
+    mmap: bool = True,
+) -> tuple[pd.DataFrame, TermIndex] | None:
+    """같은 입력으로 만든 스냅샷을 읽고, n-gram 배열은 기본적으로 메모리 매핑한다."""
+    target = _snapshot_path(directory, fingerprint)
+    try:
+        meta = json.loads((target / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != SNAPSHOT_VERSION or meta.get("fingerprint") != fingerprint:
+            return None
+        with (target / "documents.pkl").open("rb") as file:
+            search_index = pickle.load(file)
+        arrays = {
+            name: np.load(target / f"{name}.npy", mmap_mode="r" if mmap else None)
+            for name in _TERM_INDEX_ARRAYS
+        }
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+        return None
+    if len(search_index) != meta.get("documents"):
+        return None
+    return search_index, TermIndex(size=len(search_index), **arrays)
+
+
+def save_snapshot_artifact(directory: str | Path, fingerprint: str, name: str, value) -> Path:
+    """같은 입력으로 만든 스냅샷 폴더에 파생 결과를 name.pkl로 원자적으로 덧붙인다.
+
+    스냅샷이 아직 없으면 FileNotFoundError를 낸다. 스냅샷을 다시 저장하면 덧붙인 결과도 함께 지워진다.
+    """
+    target = _snapshot_path(directory, fingerprint)
+    if not (target / "meta.json").is_file():
+        raise FileNotFoundError(target / "meta.json")
+    path = target / f"{name}.pkl"
+    staging = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    with staging.open("wb") as file:
+        pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(staging, path)
+    return path
+
+
+def load_snapshot_artifact(directory: str | Path, fingerprint: str, name: str):
+    """save_snapshot_artifact로 덧붙인 결과를 읽는다. 스냅샷이 다르거나 없으면 None."""
+    target = _snapshot_path(directory, fingerprint)
+    try:
+        meta = json.loads((target / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != SNAPSHOT_VERSION or meta.get("fingerprint") != fingerprint:
+            return None
+        with (target / f"{name}.pkl").open("rb") as file:
+            return pickle.load(file)
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def _literal_contains(body: pd.Series, term: str, term_index: TermIndex | None) -> np.ndarray:
+    """대소문자를 무시한 리터럴 포함 여부를 n-gram 후보 행에서만 확인한다."""
+    candidates = term_index.candidates(term) if term_index is not None else None
+    if candidates is None:
+        return body.str.contains(term, case=False, regex=False, na=False).to_numpy(dtype=bool)
+
+    mask = np.zeros(len(body), dtype=bool)
+    if candidates.size:
+        mask[candidates] = body.iloc[candidates].str.contains(
+            term, case=False, regex=False, na=False
+        ).to_numpy(dtype=bool)
+    return mask
+
+
+def _re2_literal(term: str) -> str:
+    """RE2 정규식 안에서 글자 그대로 일치하도록 영숫자 외 문자를 코드값으로 이스케이프한다."""
+    return "".join(char if char.isalnum() else f"\\x{{{ord(char):x}}}" for char in term)
+
+
+def _term_masks(
+    body: pd.Series,
+    terms: Sequence[str],
+    term_index: TermIndex | None,
+) -> dict[str, np.ndarray]:
+    """질의의 모든 검색어를 한 정규식 오토마톤으로 한 번만 훑고, 걸린 행에서만 검색어별 일치를 나눈다.
+
+    반환값은 casefold한 검색어별 행 마스크이며, 검색어별 str.contains 결과와 같다.
+    """
+    by_folded = {term.casefold(): term for term in reversed(terms)}
+    if pc is None or len(by_folded) == 1:
+        return {
+            folded: _literal_contains(body, term, term_index) for folded, term in by_folded.items()
+        }
+
+    candidates = {
+        folded: term_index.candidates(term) if term_index is not None else None
+        for folded, term in by_folded.items()
+    }
+    values = pa.array(body)
+    if any(rows is None for rows in candidates.values()):
+        scan_rows = None
+    else:
+        scan_rows = _sorted_unique(np.concatenate(list(candidates.values())))
+        values = values.take(pa.array(scan_rows))
+
+    pattern = "|".join(_re2_literal(term) for term in by_folded.values())
+    hits = pc.match_substring_regex(values, pattern, ignore_case=True)
+    hit_rows = np.flatnonzero(hits.fill_null(False).to_numpy(zero_copy_only=False))
+    if scan_rows is not None:
+        hit_rows = scan_rows[hit_rows]
+
+    masks: dict[str, np.ndarray] = {}
+    hit_body = body.iloc[hit_rows]
+    for folded, term in by_folded.items():
+        rows = candidates[folded]
+        check = np.isin(hit_rows, rows) if rows is not None else np.ones(hit_rows.size, dtype=bool)
+        mask = np.zeros(len(body), dtype=bool)
+        if check.any():
+            mask[hit_rows[check]] = hit_body[check].str.contains(
+                term, case=False, regex=False, na=False
+            ).to_numpy(dtype=bool)
+        masks[folded] = mask
+    return masks
+
+
+def _score_matches(
+    groups: Sequence[Mapping[str, object]],
+    term_masks: Mapping[str, np.ndarray],
+    full_query_mask: np.ndarray,
+    sangcheon_mask: np.ndarray,
+) -> tuple[np.ndarray, list[str], np.ndarray]:
+    """그룹×행 일치 행렬로 관련도 점수와 일치 유형을 한 번에 계산한다."""
+    row_count = len(full_query_mask)
+    original_hits = np.zeros((len(groups), row_count), dtype=bool)
+    synonym_counts = np.zeros((len(groups), row_count), dtype=np.int64)
+    for position, group in enumerate(groups):
+        original = str(group["original"])
+        original_hits[position] = term_masks[original.casefold()]
+        for term in group["terms"]:
+            if str(term).casefold() != original.casefold():
+                synonym_counts[position] += term_masks[str(term).casefold()]
+
+    synonym_hits = synonym_counts > 0
+    scores = (
+        np.where(full_query_mask, 25.0, 0.0)
+        + (30.0 * original_hits).sum(axis=0)
+        + (16.0 * (~original_hits & synonym_hits)).sum(axis=0)
+        + np.minimum(12.0, 4.0 * synonym_counts).sum(axis=0)
+        + np.where(sangcheon_mask, 5.0, 0.0)
+    )
+    exact_counts = original_hits.sum(axis=0)
+    exact_all = exact_counts == len(groups)
+    match_types = np.select(
+        [exact_all, exact_counts > 0], ["정확 일치", "정확+동의어 일치"], "동의어 일치"
+    ).tolist()
+    return np.minimum(100.0, scores), match_types, exact_all
+
+
+def _matched_terms(
+    groups: Sequence[Mapping[str, object]],
+    term_masks: Mapping[str, np.ndarray],
+    row_count: int,
+) -> list[list[str]]:
+    """행마다 일치한 원 검색어와 동의어를 그룹 순서대로 모은다."""
+    labels: list[str] = []
+    label_masks: list[np.ndarray] = []
+    for group in groups:
+        original = str(group["original"])
+        labels.append(original)
+        label_masks.append(term_masks[original.casefold()])
+        for term in group["terms"]:
+            if str(term).casefold() != original.casefold():
+                labels.append(str(term))
+                label_masks.append(term_masks[str(term).casefold()])
+
+    rows, columns = np.nonzero(np.column_stack(label_masks))
+    label_values = np.array(labels, dtype=object)[columns].tolist()
+    bounds = np.searchsorted(rows, np.arange(row_count + 1)).tolist()
+    per_row = [label_values[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+    if len(set(labels)) == len(labels):
+        return per_row
+    return [list(dict.fromkeys(items)) for items in per_row]
+
+
+SORT_KEYS = {
+    "관련도순": ["관련도점수", "날짜", "상승률"],
+    "최신순": ["날짜", "관련도점수"],
+    "최고 상승률순": ["상승률", "관련도점수", "날짜"],
+}
+
+
+def _descending_key(values: np.ndarray) -> np.ndarray:
+    """내림차순·결측 마지막 정렬을 오름차순 float 키로 바꾼다."""
+    if np.issubdtype(values.dtype, np.datetime64):
+        missing = np.isnat(values)
+        values = values.view(np.int64).astype(np.float64)
+    else:
+        values = values.astype(np.float64)
+        missing = np.isnan(values)
+    return np.where(missing, np.inf, -values)
+
+
+def _sort_key_matrix(sort_by: str, columns: Mapping[str, np.ndarray]) -> np.ndarray:
+    """정렬 기준별 키를 행 단위로 쌓는다. 마지막 열은 동점 순서를 정하는 원래 행 위치다."""
+    names = SORT_KEYS.get(sort_by, SORT_KEYS["관련도순"])
+    return np.column_stack([*(_descending_key(columns[name]) for name in names), columns["위치"]])
+
+
+def _after_cursor(keys: np.ndarray, cursor: str, sort_by: str) -> np.ndarray:
+    """커서가 가리키는 마지막 행보다 정렬상 뒤에 오는 행을 고른다."""
+    try:
+        cursor_sort, *cursor_keys = json.loads(cursor)
+    except (TypeError, ValueError) as error:
+        raise ValueError("검색 커서를 해석할 수 없습니다.") from error
+    if cursor_sort != sort_by or len(cursor_keys) != keys.shape[1]:
+        raise ValueError("검색 커서의 정렬 기준이 현재 검색과 다릅니다.")
+
+    after = np.zeros(len(keys), dtype=bool)
+    tied = np.ones(len(keys), dtype=bool)
+    for column, value in enumerate(cursor_keys):
+        after |= tied & (keys[:, column] > value)
+        tied &= keys[:, column] == value
+    return after
+
+
+def _top_k_order(keys: np.ndarray, rows: np.ndarray, count: int | None) -> np.ndarray:
+    """rows 중 정렬 상위 count개를 순서대로 반환한다. 첫 키로 후보를 부분 선택한 뒤 후보만 정렬한다."""
+    if count is not None and count < rows.size:
+        primary = keys[rows, 0]
+        threshold = np.partition(primary, count - 1)[count - 1]
+        rows = rows[primary <= threshold]
+    order = rows[np.lexsort(keys[rows].T[::-1])]
+    return order if count is None else order[:count]
+
+
+def _nbytes(value) -> int:
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(item) for item in value) + 8 * len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, (int, np.integer)):
+        return int(nbytes)
+    return 64
+
+
+class QueryCache:
+    """검색 결과를 담는 스레드 안전 LRU 캐시. 결과 표의 메모리 합계로 용량을 제한한다."""
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024) -> None:
+        self.max_bytes = int(max_bytes)
+        self.nbytes = 0
+        self._entries: OrderedDict[tuple, tuple[object, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple):
+        """있으면 최근 사용으로 옮기고 값을 반환한다. 없으면 None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: tuple, value) -> None:
+        """값을 넣고 용량을 넘으면 오래 쓰지 않은 항목부터 지운다. 한도보다 큰 값은 넣지 않는다."""
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[1]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+def query_cache_key(
     search_index: pd.DataFrame,
     query: str,
     aliases: Mapping[str, Sequence[str]] | None = None,
@@ -315,113 +1131,246 @@ def search_documents(
     end_date=None,
     min_rise: float = 0.0,
     sort_by: str = "관련도순",
-) -> tuple[pd.DataFrame, list[str]]:
-    """정규식 해석 없이 검색하고 매칭 근거와 관련도 점수를 붙인다."""
-    groups, applied_terms = expand_query_terms(query, aliases)
-    if search_index is None or search_index.empty or not groups:
-        empty = pd.DataFrame(columns=[*DOCUMENT_COLUMNS, "관련도점수", "매칭키워드", "일치유형", "정확일치여부"])
-        return empty, applied_terms
+    *extra,
+) -> tuple:
+    """동의어 확장을 마친 검색어 그룹, 필터, 인덱스 버전으로 질의 캐시 키를 만든다.
 
-    body = search_index["검색본문"].fillna("").astype(str)
-    term_masks: dict[str, pd.Series] = {}
-    for group in groups:
-        for term in group["terms"]:
-            folded = str(term).casefold()
-            if folded not in term_masks:
-                term_masks[folded] = body.str.contains(str(term), case=False, regex=False, na=False)
-
-    group_masks: list[pd.Series] = []
-    for group in groups:
-        group_mask = pd.Series(False, index=search_index.index)
-        for term in group["terms"]:
-            group_mask |= term_masks[str(term).casefold()]
-        group_masks.append(group_mask)
+    별칭 사전 전체 대신 실제로 확장된 그룹만 키에 들어가므로 사전 크기와 무관하게 가볍다.
+    """
+    groups, applied_terms = expand_query_terms(query, aliases)
+    return (
+        index_version(search_index) if search_index is not None else None,
+        _clean_text(query),
+        tuple((str(group["original"]), tuple(map(str, group["terms"]))) for group in groups),
+        tuple(applied_terms),
+        operator.upper(),
+        tuple(sorted({str(value) for value in (sources or []) if str(value)})),
+        None if start_date is None else pd.Timestamp(start_date),
+        None if end_date is None else pd.Timestamp(end_date),
+        float(min_rise or 0.0),
+        sort_by,
+        *extra,
+    )
 
-    match_mask = group_masks[0].copy()
-    if operator.upper() == "OR":
-        for group_mask in group_masks[1:]:
-            match_mask |= group_mask
-    else:
-        for group_mask in group_masks[1:]:
-            match_mask &= group_mask
 
+def _filter_mask(
+    search_index: pd.DataFrame,
+    sources: Iterable[str] | None,
+    start_date,
+    end_date,
+    min_rise: float,
+) -> tuple[np.ndarray, pd.Series, pd.Series]:
+    """출처·기간·최소 상승률 조건을 행 마스크로 만들고 정렬에 쓸 날짜와 상승률도 함께 반환한다."""
+    mask = np.ones(len(search_index), dtype=bool)
     source_values = [str(value) for value in (sources or []) if str(value)]
     if source_values:
-        match_mask &= search_index["출처"].isin(source_values)
+        mask &= search_index["출처"].isin(source_values).to_numpy(dtype=bool)
 
-    dates = pd.to_datetime(search_index["날짜"], errors="coerce")
+    dates = search_index["날짜"]
+    if not pd.api.types.is_datetime64_dtype(dates):
+        dates = pd.to_datetime(dates, errors="coerce")
     if start_date is not None:
-        match_mask &= dates.ge(pd.Timestamp(start_date))
+        mask &= dates.ge(pd.Timestamp(start_date)).to_numpy(dtype=bool)
     if end_date is not None:
-        match_mask &= dates.le(pd.Timestamp(end_date))
+        mask &= dates.le(pd.Timestamp(end_date)).to_numpy(dtype=bool)
 
     rises = pd.to_numeric(search_index["상승률"], errors="coerce")
     if min_rise and float(min_rise) > 0:
-        match_mask &= rises.ge(float(min_rise))
-
-    matched = search_index.loc[match_mask].copy()
-    if matched.empty:
-        for column in ["관련도점수", "매칭키워드", "일치유형", "정확일치여부"]:
-            matched[column] = pd.Series(dtype="object")
-        return matched, applied_terms
-
-    full_query_mask = body.str.contains(_clean_text(query), case=False, regex=False, na=False)
-    result_scores: list[float] = []
-    result_terms: list[list[str]] = []
-    result_types: list[str] = []
-    exact_flags: list[bool] = []
-
-    for row_index in matched.index:
-        score = 25.0 if bool(full_query_mask.loc[row_index]) else 0.0
-        matched_terms: list[str] = []
-        exact_group_count = 0
-        synonym_group_count = 0
-        for group in groups:
-            original = str(group["original"])
-            original_matched = bool(term_masks[original.casefold()].loc[row_index])
-            synonym_matches = [
-                str(term)
-                for term in group["terms"]
-                if str(term).casefold() != original.casefold()
-                and bool(term_masks[str(term).casefold()].loc[row_index])
-            ]
-            if original_matched:
-                exact_group_count += 1
-                score += 30.0
-                matched_terms.append(original)
-            elif synonym_matches:
-                synonym_group_count += 1
-                score += 16.0
-            if synonym_matches:
-                score += min(12.0, 4.0 * len(synonym_matches))
-                matched_terms.extend(synonym_matches)
-
-        if matched.at[row_index, "출처"] == "상천 이력":
-            score += 5.0
-        exact_all = exact_group_count == len(groups)
-        if exact_all:
-            match_type = "정확 일치"
-        elif exact_group_count:
-            match_type = "정확+동의어 일치"
-        else:
-            match_type = "동의어 일치"
-
-        deduped_terms = list(dict.fromkeys(matched_terms))
-        result_scores.append(min(100.0, score))
-        result_terms.append(deduped_terms)
-        result_types.append(match_type)
-        exact_flags.append(exact_all)
-
-    matched["관련도점수"] = result_scores
-    matched["매칭키워드"] = result_terms
-    matched["일치유형"] = result_types
-    matched["정확일치여부"] = exact_flags
-
-    if sort_by == "최신순":
-        sort_columns, ascending = ["날짜", "관련도점수"], [False, False]
-    elif sort_by == "최고 상승률순":
-        sort_columns, ascending = ["상승률", "관련도점수", "날짜"], [False, False, False]
+        mask &= rises.ge(float(min_rise)).to_numpy(dtype=bool)
+    return mask, dates, rises
+
+
+def _empty_result(frame: pd.DataFrame | None = None) -> pd.DataFrame:
+    if frame is None:
+        frame = pd.DataFrame(columns=DOCUMENT_COLUMNS)
+    for column in ["관련도점수", "매칭키워드", "일치유형", "정확일치여부"]:
+        frame[column] = pd.Series(dtype="object")
+    frame.attrs.update({"전체건수": 0, "다음커서": None})
+    return frame
+
+
+def _rank_matches(
+    search_index: pd.DataFrame,
+    body: pd.Series,
+    query: str,
+    groups: Sequence[Mapping[str, object]],
+    operator: str,
+    term_masks: Mapping[str, np.ndarray],
+    filters: tuple[np.ndarray, pd.Series, pd.Series],
+    sort_by: str,
+    limit: int | None,
+    offset: int,
+    cursor: str | None,
+) -> pd.DataFrame:
+    """미리 계산한 검색어별 마스크와 필터로 한 질의의 결과 표를 만든다."""
+    group_masks = [
+        np.logical_or.reduce([term_masks[str(term).casefold()] for term in group["terms"]])
+        for group in groups
+    ]
+    if operator.upper() == "OR":
+        match_mask = np.logical_or.reduce(group_masks)
     else:
-        sort_columns, ascending = ["관련도점수", "날짜", "상승률"], [False, False, False]
-    matched = matched.sort_values(sort_columns, ascending=ascending, na_position="last")
-    return matched.reset_index(drop=True), applied_terms
+        match_mask = np.logical_and.reduce(group_masks)
+    filter_mask, dates, rises = filters
+
+    positions = np.flatnonzero(match_mask & filter_mask)
+    if positions.size == 0:
+        return _empty_result(_expand_documents(search_index.iloc[positions]))
+
+    full_query_mask = body.iloc[positions].str.contains(
+        _clean_text(query), case=False, regex=False, na=False
+    ).to_numpy(dtype=bool)
+    query_masks = {
+        str(term).casefold(): term_masks[str(term).casefold()]
+        for group in groups
+        for term in group["terms"]
+    }
+    scores, match_types, exact_flags = _score_matches(
+        groups,
+        {folded: mask[positions] for folded, mask in query_masks.items()},
+        full_query_mask,
+        search_index["출처"].iloc[positions].eq("상천 이력").to_numpy(dtype=bool),
+    )
+
+    keys = _sort_key_matrix(
+        sort_by,
+        {
+            "관련도점수": scores,
+            "날짜": dates.to_numpy()[positions],
+            "상승률": rises.to_numpy(dtype=np.float64, na_value=np.nan)[positions],
+            "위치": positions,
+        },
+    )
+    rows = np.arange(positions.size)
+    if cursor is not None:
+        rows = rows[_after_cursor(keys, cursor, sort_by)]
+    offset = max(0, int(offset))
+    page = _top_k_order(keys, rows, None if limit is None else offset + max(0, int(limit)))[offset:]
+
+    matched = _expand_documents(search_index.iloc[positions[page]])
+    matched["관련도점수"] = scores[page]
+    matched["매칭키워드"] = _matched_terms(
+        groups, {folded: mask[positions[page]] for folded, mask in query_masks.items()}, page.size
+    )
+    matched["일치유형"] = [match_types[row] for row in page]
+    matched["정확일치여부"] = exact_flags[page]
+    matched = matched.reset_index(drop=True)
+
+    has_more = limit is not None and page.size > 0 and offset + page.size < rows.size
+    matched.attrs.update(
+        {
+            "전체건수": int(positions.size),
+            "다음커서": json.dumps([sort_by, *keys[page[-1]].tolist()]) if has_more else None,
+        }
+    )
+    return matched
+
+
+def search_documents(
+    search_index: pd.DataFrame,
+    query: str,
+    aliases: Mapping[str, Sequence[str]] | None = None,
+    operator: str = "AND",
+    sources: Iterable[str] | None = None,
+    start_date=None,
+    end_date=None,
+    min_rise: float = 0.0,
+    sort_by: str = "관련도순",
+    term_index: TermIndex | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+    cursor: str | None = None,
+    cache: QueryCache | None = None,
+) -> tuple[pd.DataFrame, list[str]]:
+    """정규식 해석 없이 검색하고 매칭 근거와 관련도 점수를 붙인다.
+
+    term_index가 주어지면 n-gram 후보 행만 확인하며, 결과는 전체 검색과 같다.
+    limit을 주면 정렬 상위 offset~offset+limit 행만 만들고, 결과 attrs의 "다음커서"를
+    cursor로 넘기면 이어지는 페이지를 받는다. limit이 없으면 전체 일치 결과를 반환한다.
+    cache가 주어지면 같은 인덱스 버전·확장 검색어·필터의 결과를 재사용한다.
+    """
+    if cache is not None:
+        key = query_cache_key(
+            search_index, query, aliases, operator, sources, start_date, end_date, min_rise, sort_by,
+            "search_documents", limit, offset, cursor,
+        )
+        cached = cache.get(key)
+        if cached is None:
+            cached = search_documents(
+                search_index, query, aliases, operator, sources, start_date, end_date,
+                min_rise, sort_by, term_index, limit, offset, cursor,
+            )
+            cache.put(key, cached)
+        result, applied_terms = cached
+        return result.copy(deep=False), list(applied_terms)
+
+    groups, applied_terms = expand_query_terms(query, aliases)
+    if search_index is None or search_index.empty or not groups:
+        return _empty_result(), applied_terms
+
+    if term_index is not None and term_index.size != len(search_index):
+        term_index = None
+    body = search_index["검색본문"].fillna("").astype(str)
+    term_masks = _term_masks(
+        body, [str(term) for group in groups for term in group["terms"]], term_index
+    )
+    result = _rank_matches(
+        search_index,
+        body,
+        query,
+        groups,
+        operator,
+        term_masks,
+        _filter_mask(search_index, sources, start_date, end_date, min_rise),
+        sort_by,
+        limit,
+        offset,
+        cursor,
+    )
+    return result, applied_terms
+
+
+def search_documents_many(
+    search_index: pd.DataFrame,
+    queries: Iterable[str],
+    aliases: Mapping[str, Sequence[str]] | None = None,
+    operator: str = "AND",
+    sources: Iterable[str] | None = None,
+    start_date=None,
+    end_date=None,
+    min_rise: float = 0.0,
+    sort_by: str = "관련도순",
+    term_index: TermIndex | None = None,
+    limit: int | None = None,
+) -> dict[str, tuple[pd.DataFrame, list[str]]]:
+    """여러 검색어를 한 번에 검색한다.
+
+    모든 질의의 검색어를 casefold 기준으로 합쳐 본문을 한 번만 훑고, 필터 마스크도 한 번만 만든다.
+    질의별 결과는 같은 조건의 search_documents와 같다.
+    """
+    expanded = {}
+    for query in queries:
+        if _clean_text(query) and query not in expanded:
+            expanded[query] = expand_query_terms(query, aliases)
+    if search_index is None or search_index.empty:
+        return {query: (_empty_result(), applied) for query, (_, applied) in expanded.items()}
+
+    if term_index is not None and term_index.size != len(search_index):
+        term_index = None
+    body = search_index["검색본문"].fillna("").astype(str)
+    term_masks = _term_masks(
+        body,
+        [str(term) for groups, _ in expanded.values() for group in groups for term in group["terms"]],
+        term_index,
+    )
+    filters = _filter_mask(search_index, sources, start_date, end_date, min_rise)
+    return {
+        query: (
+            _rank_matches(
+                search_index, body, query, groups, operator, term_masks, filters,
+                sort_by, limit, 0, None,
+            ),
+            applied,
+        )
+        for query, (groups, applied) in expanded.items()
+    }
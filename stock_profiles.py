@@ -0,0 +1,154 @@
+"""종목 상세 화면에 보이는 종목별 자료 묶음."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from app_utils import LIMIT_UP_THRESHOLD, convert_rise_rate, format_date
+from search_engine import _column_or_none, _map_unique
+
+
+RECENT_EVENT_COUNT = 3
+SUMMARY_COLUMN_KEYWORDS = ("핵심요약", "3줄정리")
+
+
+@dataclass(frozen=True)
+class KeyedRows:
+    """보조 표와 종목키 → 그 표에서의 행 위치(정수 배열) 조회 함수"""
+
+    frame: pd.DataFrame
+    positions: Callable[[str], np.ndarray]
+
+    def column(self, name: str | None) -> np.ndarray | None:
+        if name is None or name not in self.frame.columns:
+            return None
+        return self.frame[name].to_numpy(dtype=object)
+
+
+@dataclass(frozen=True)
+class StockEvent:
+    """상천 이력 한 행. reason이 비어 있으면 "-"이다."""
+
+    date: str
+    rise: float | None
+    rise_display: str
+    reason: str
+
+    @property
+    def limit_up(self) -> bool:
+        return self.rise is not None and self.rise >= LIMIT_UP_THRESHOLD
+
+
+@dataclass(frozen=True)
+class StockProfile:
+    """최신 상천 행, 기업개요 요약, 테마, 테마별 분석, 최근 상승 이슈와 그 밖의 상한가 이력"""
+
+    latest: dict
+    summary: str | None
+    theme_text: object
+    analysis: tuple[tuple[object, object], ...]
+    recent: tuple[StockEvent, ...]
+    limit_ups: tuple[StockEvent, ...]
+
+
+def _first_value(values: np.ndarray | None, positions: np.ndarray):
+    if values is None or not len(positions):
+        return None
+    return values[positions[0]]
+
+
+def _present(value) -> bool:
+    return value is not None and not pd.isna(value)
+
+
+def build_stock_profiles(
+    sangcheon: pd.DataFrame,
+    overview: KeyedRows | None = None,
+    themes: KeyedRows | None = None,
+    analysis: KeyedRows | None = None,
+) -> dict[str, StockProfile]:
+    """상천 이력이 있는 종목마다 상세 화면 자료를 한 번에 만든다.
+
+    상승률 변환과 날짜 표시는 고유값마다 한 번만 하고, 보조 표는 필요한 열을 배열로 한 번 꺼낸 뒤
+    종목마다 행 위치로 읽는다. 보조 표가 None이면 해당 자료가 없는 것으로 본다.
+    """
+    if sangcheon is None or sangcheon.empty or "__stock_key" not in sangcheon.columns:
+        return {}
+    keys = sangcheon["__stock_key"].fillna("").astype(str).str.strip()
+    frame = sangcheon[keys.ne("").to_numpy()]
+    if "날짜" in frame.columns:
+        frame = frame.sort_values("날짜", ascending=False, kind="stable")
+
+    rise_pairs = _map_unique(_column_or_none(frame, "상승률"), convert_rise_rate)
+    dates = _map_unique(_column_or_none(frame, "날짜"), format_date)
+    reasons = _column_or_none(frame, "상승이유").to_numpy(dtype=object)
+    events = [
+        StockEvent(date, rise, display, reason if _present(reason) else "-")
+        for date, (rise, display), reason in zip(dates.tolist(), rise_pairs.tolist(), reasons.tolist())
+    ]
+    groups = frame.groupby("__stock_key", sort=False).indices
+    latest_rows = frame.iloc[[positions[0] for positions in groups.values()]].to_dict("records")
+
+    no_rows = np.array([], dtype=np.int64)
+    summary_values = None
+    if overview is not None:
+        summary_values = overview.column(
+            next(
+                (
+                    column
+                    for column in overview.frame.columns
+                    if any(keyword in column for keyword in SUMMARY_COLUMN_KEYWORDS)
+                ),
+                None,
+            )
+        )
+    theme_summaries = themes.column("핵심요약") if themes is not None else None
+    theme_texts = themes.column("테마_전체") if themes is not None else None
+    analysis_names = analysis.column("테마명") if analysis is not None else None
+    analysis_texts = analysis.column("분석결과") if analysis is not None else None
+
+    profiles = {}
+    for (stock_key, positions), latest in zip(groups.items(), latest_rows):
+        stock_events = [events[position] for position in positions.tolist()]
+        recent = tuple(stock_events[:RECENT_EVENT_COUNT])
+        recent_dates = {event.date for event in recent}
+        overview_positions = overview.positions(stock_key) if overview is not None else no_rows
+        theme_positions = themes.positions(stock_key) if themes is not None else no_rows
+        analysis_positions = analysis.positions(stock_key) if analysis is not None else no_rows
+
+        summary = next(
+            (
+                str(value)
+                for value in (
+                    _first_value(summary_values, overview_positions),
+                    _first_value(theme_summaries, theme_positions),
+                )
+                if _present(value)
+            ),
+            None,
+        )
+        theme_text = latest.get("테마", "-")
+        if len(theme_positions):
+            theme_text = _first_value(theme_texts, theme_positions)
+        profiles[stock_key] = StockProfile(
+            latest=latest,
+            summary=summary,
+            theme_text=theme_text,
+            analysis=tuple(
+                (
+                    analysis_names[position] if analysis_names is not None else "-",
+                    analysis_texts[position] if analysis_texts is not None else "-",
+                )
+                for position in analysis_positions.tolist()
+            ),
+            recent=recent,
+            # 최근 상승 이슈와 같은 날짜는 상한가 이력에서 뺀다.
+            limit_ups=tuple(
+                event for event in stock_events if event.limit_up and event.date not in recent_dates
+            ),
+        )
+    return profiles
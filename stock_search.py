@@ -0,0 +1,214 @@
+"""종목 검색창의 종목명·구 사명·종목코드 자동완성 색인."""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+
+TYPEAHEAD_GRAM_SIZE = 2
+# 접두 구간의 끝을 찾을 때 붙이는 가장 큰 문자
+_PREFIX_END = "\U0010ffff"
+
+# 글자 그대로 일치한 종목이 먼저이고, 초성·자모 분해로만 일치한 종목이 그 뒤에 온다.
+EXACT, PREFIX, INFIX, JAMO_PREFIX, JAMO_INFIX = range(5)
+
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSEONG = ("", *"ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ")
+# 입력기가 한 글자로 합쳐 보여 주는 겹자음·겹모음은 키를 누른 순서대로 나눈다.
+_COMPOUND_JAMO = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+_CONSONANT_JAMO = frozenset(chr(code) for code in range(0x3131, 0x314F))
+_VOWEL_JAMO = frozenset(chr(code) for code in range(0x314F, 0x3164))
+
+
+def _split_compound(jamo: str) -> str:
+    return _COMPOUND_JAMO.get(jamo, jamo)
+
+
+def _build_translate_tables() -> tuple[dict[int, str], dict[int, str]]:
+    """str.translate용 (음절·겹자모 → 자모 분해, 음절 → 초성) 표"""
+    jamo_table = {ord(jamo): parts for jamo, parts in _COMPOUND_JAMO.items()}
+    choseong_table = {}
+    for code in range(_HANGUL_FIRST, _HANGUL_LAST + 1):
+        initial, rest = divmod(code - _HANGUL_FIRST, len(_JUNGSEONG) * len(_JONGSEONG))
+        medial, final = divmod(rest, len(_JONGSEONG))
+        jamo_table[code] = _CHOSEONG[initial] + _split_compound(_JUNGSEONG[medial]) + _split_compound(_JONGSEONG[final])
+        choseong_table[code] = _CHOSEONG[initial]
+    return jamo_table, choseong_table
+
+
+_JAMO_TABLE, _CHOSEONG_TABLE = _build_translate_tables()
+
+
+def normalize_search_text(text) -> str:
+    return str(text or "").strip().lower()
+
+
+def decompose_jamo(text: str) -> str:
+    """한글 음절을 초성·중성·종성 호환 자모로 풀고 겹자음·겹모음도 나눈다. 그 밖의 글자는 그대로 둔다."""
+    return text.translate(_JAMO_TABLE)
+
+
+def choseong(text: str) -> str:
+    """한글 음절을 초성 호환 자모로 바꾼다. 그 밖의 글자는 그대로 둔다."""
+    return text.translate(_CHOSEONG_TABLE)
+
+
+def _is_choseong_query(text: str) -> bool:
+    """자음만 쳤고 완성된 음절·모음은 없는 검색어 (예: "ㅅㅅㅈㅈ", "skㅎ")"""
+    return any(char in _CONSONANT_JAMO for char in text) and not any(
+        char in _VOWEL_JAMO or _HANGUL_FIRST <= ord(char) <= _HANGUL_LAST for char in text
+    )
+
+
+def _has_hangul(text: str) -> bool:
+    return any(
+        char in _CONSONANT_JAMO or char in _VOWEL_JAMO or _HANGUL_FIRST <= ord(char) <= _HANGUL_LAST
+        for char in text
+    )
+
+
+def _text_grams(text: str) -> set[str]:
+    grams = set(text)
+    grams.update(text[start:start + TYPEAHEAD_GRAM_SIZE] for start in range(len(text) - TYPEAHEAD_GRAM_SIZE + 1))
+    return grams
+
+
+@dataclass(frozen=True)
+class TypeaheadResult:
+    """순위순 종목키(최대 limit개), 검색어와 정확히 같은 이름·코드가 있는 종목, 잘렸는지 여부"""
+
+    keys: list[str]
+    exact: list[str]
+    truncated: bool
+
+
+@dataclass(frozen=True)
+class TermPostings:
+    """정렬된 검색어, 검색어별 종목 번호, 글자·2글자 n-gram → 검색어 번호 포스팅"""
+
+    terms: tuple[str, ...]
+    term_stocks: tuple[tuple[int, ...], ...]
+    grams: dict[str, np.ndarray]
+
+    def prefix(self, text: str) -> range:
+        return range(
+            bisect.bisect_left(self.terms, text),
+            bisect.bisect_left(self.terms, text + _PREFIX_END),
+        )
+
+    def infix(self, text: str) -> np.ndarray:
+        grams = [text] if len(text) < TYPEAHEAD_GRAM_SIZE else [
+            text[start:start + TYPEAHEAD_GRAM_SIZE] for start in range(len(text) - TYPEAHEAD_GRAM_SIZE + 1)
+        ]
+        postings = sorted((self.grams.get(gram) for gram in set(grams)), key=lambda ids: -1 if ids is None else len(ids))
+        if postings[0] is None:
+            return np.array([], dtype=np.int32)
+        candidates = postings[0]
+        for ids in postings[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+        if len(text) <= TYPEAHEAD_GRAM_SIZE:
+            return candidates
+        return np.array([term for term in candidates.tolist() if text in self.terms[term]], dtype=np.int32)
+
+
+def _build_term_postings(stocks_by_term: dict[str, list[int]]) -> TermPostings:
+    terms = tuple(sorted(stocks_by_term))
+    term_ids_by_gram: dict[str, list[int]] = {}
+    for term_id, term in enumerate(terms):
+        for gram in _text_grams(term):
+            term_ids_by_gram.setdefault(gram, []).append(term_id)
+    return TermPostings(
+        terms=terms,
+        term_stocks=tuple(tuple(sorted(set(stocks_by_term[term]))) for term in terms),
+        grams={gram: np.asarray(ids, dtype=np.int32) for gram, ids in term_ids_by_gram.items()},
+    )
+
+
+@dataclass(frozen=True)
+class StockTypeahead:
+    """종목명·구 사명·종목코드 자동완성 색인.
+
+    검색어(소문자)를 정렬해 두고 접두 일치는 이분 탐색으로 구간을 잘라 찾고(배열로 편 트라이),
+    중간 일치는 글자·2글자 n-gram 포스팅을 교집합한 뒤 확인한다. 한글이 든 검색어는 같은 방식으로
+    만든 초성 색인("ㅅㅅㅈㅈ")과 자모 분해 색인("삼성저", "삼성ㅈ"처럼 치는 중인 글자)에서도 찾는다.
+    결과는 정확 일치, 접두 일치, 중간 일치, 초성·자모 접두 일치, 초성·자모 중간 일치 순이고
+    같은 단계에서는 종목 순서(keys 순서)를 따른다.
+    """
+
+    keys: tuple[str, ...]
+    literal: TermPostings
+    jamo: TermPostings
+    choseong: TermPostings
+
+    def search(self, text, limit: int | None = None) -> TypeaheadResult:
+        query = normalize_search_text(text)
+        if not query:
+            keys = list(self.keys if limit is None else self.keys[:limit])
+            return TypeaheadResult(keys, [], limit is not None and len(self.keys) > limit)
+
+        prefix_terms = self.literal.prefix(query)
+        tiered_terms = [
+            (self.literal, EXACT, [term for term in prefix_terms[:1] if self.literal.terms[term] == query]),
+            (self.literal, PREFIX, prefix_terms),
+            (self.literal, INFIX, self.literal.infix(query).tolist()),
+        ]
+        if _is_choseong_query(query):
+            sound_index, sound_query = self.choseong, decompose_jamo(query)
+        elif _has_hangul(query):
+            sound_index, sound_query = self.jamo, decompose_jamo(query)
+        else:
+            sound_index = None
+        if sound_index is not None:
+            tiered_terms += [
+                (sound_index, JAMO_PREFIX, sound_index.prefix(sound_query)),
+                (sound_index, JAMO_INFIX, sound_index.infix(sound_query).tolist()),
+            ]
+
+        tiers: dict[int, int] = {}
+        for postings, tier, terms in tiered_terms:
+            for term in terms:
+                for stock in postings.term_stocks[term]:
+                    tiers.setdefault(stock, tier)
+
+        ranked = sorted(tiers, key=lambda stock: (tiers[stock], stock))
+        exact = [self.keys[stock] for stock in ranked if tiers[stock] == EXACT]
+        if limit is not None and len(ranked) > limit:
+            return TypeaheadResult([self.keys[stock] for stock in ranked[:limit]], exact, True)
+        return TypeaheadResult([self.keys[stock] for stock in ranked], exact, False)
+
+
+def build_stock_typeahead(entries: Iterable[tuple[str, Iterable[str]]]) -> StockTypeahead:
+    """(종목키, 이름들) 목록으로 색인을 만든다. 목록 순서가 같은 단계 안의 결과 순서가 되고, 종목키도 검색어가 된다.
+
+    초성·자모 분해 색인에는 한글이 든 검색어만 넣는다.
+    """
+    keys = []
+    stocks_by_term: dict[str, list[int]] = {}
+    for stock, (stock_key, names) in enumerate(entries):
+        keys.append(stock_key)
+        for term in {normalize_search_text(name) for name in (stock_key, *names)}:
+            if term:
+                stocks_by_term.setdefault(term, []).append(stock)
+
+    stocks_by_jamo: dict[str, list[int]] = {}
+    stocks_by_choseong: dict[str, list[int]] = {}
+    for term, stocks in stocks_by_term.items():
+        if _has_hangul(term):
+            stocks_by_jamo.setdefault(decompose_jamo(term), []).extend(stocks)
+            stocks_by_choseong.setdefault(choseong(term), []).extend(stocks)
+    return StockTypeahead(
+        keys=tuple(keys),
+        literal=_build_term_postings(stocks_by_term),
+        jamo=_build_term_postings(stocks_by_jamo),
+        choseong=_build_term_postings(stocks_by_choseong),
+    )
@@ -0,0 +1,353 @@
+"""종목 상세의 유사 종목 추천에 쓰는 해시태그 역색인."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from app_utils import convert_rise_rate
+from search_engine import _column_or_none, _map_unique
+
+
+SIMILAR_STOCK_LIMIT = 5
+SIMILAR_STOCK_COLUMNS = ["종목코드", "종목명", "공통개수", "최고상승률", "테마상승률", "테마상승횟수", "혼합점수"]
+
+
+def split_hashtags(text) -> frozenset[str]:
+    """'#양자암호 #보안' 형식의 테마 문자열을 소문자 해시태그 집합으로 나눈다."""
+    if text is None or pd.isna(text):
+        return frozenset()
+    return frozenset(tag.strip().lower() for tag in str(text).split("#") if tag.strip())
+
+
+def _tag_keywords(tag: str) -> tuple[str, ...]:
+    # 복합어 해시태그는 앞 2글자로도 상승이유를 찾는다 (예: "양자암호" -> "양자").
+    return (tag, tag[:2]) if len(tag) > 2 else (tag,)
+
+
+@dataclass(frozen=True)
+class StockRiseStats:
+    """한 종목의 상천 이력 요약. tag_rises는 해시태그별 (상승이유 일치 횟수, 일치 최고 상승률)"""
+
+    max_rise: float
+    tag_rises: dict[str, tuple[int, float]]
+
+
+_NO_RISES = StockRiseStats(0.0, {})
+
+
+@dataclass(frozen=True)
+class HashtagIndex:
+    """테마 표 행마다의 종목키·표시명·해시태그와 해시태그 → 행 위치 역색인.
+
+    종목별 상승률 통계는 만들 때 한 번 계산해 두므로, 유사 종목은 현재 종목 해시태그의
+    포스팅만 모아 점수를 매긴다. 같은 종목이 테마 표에 여러 번 있으면 행마다 후보가 된다.
+    entry_stats는 종목키로 상천 이력을 못 찾아 종목코드·종목명으로 찾은 테마 행 위치의 통계다.
+    """
+
+    keys: tuple[str | None, ...]
+    names: tuple[str, ...]
+    tags: tuple[frozenset[str], ...]
+    postings: dict[str, np.ndarray]
+    stats: dict[str, StockRiseStats]
+    entry_stats: dict[int, StockRiseStats] = field(default_factory=dict)
+
+    def stock_stats(self, stock_key: str | None) -> StockRiseStats:
+        return self.stats.get(stock_key, _NO_RISES) if stock_key else _NO_RISES
+
+    def position_stats(self, position: int) -> StockRiseStats:
+        """테마 행 위치의 상승 통계. 종목키 통계가 없으면 종목코드·종목명으로 찾은 통계를 쓴다."""
+        return self.entry_stats.get(position) or self.stock_stats(self.keys[position])
+
+    def similar(self, theme_text, exclude_key: str | None = None, limit: int = SIMILAR_STOCK_LIMIT) -> list[dict]:
+        """공통 해시태그와 테마 이슈 상승 이력을 섞은 점수로 상위 유사 종목을 고른다.
+
+        혼합점수 = 공통 해시태그 수×10 + 테마 매칭 최고 상승률×2 + 테마 매칭 횟수×5 + 최고 상승률×0.5
+        """
+        current = split_hashtags(theme_text)
+        lists = [self.postings[tag] for tag in current if tag in self.postings]
+        if not lists:
+            return []
+        common_counts = np.bincount(np.concatenate(lists), minlength=len(self.keys))
+        candidates = []
+        for position in np.flatnonzero(common_counts):
+            other_key = self.keys[position]
+            if other_key == exclude_key:
+                continue
+            stats = self.position_stats(position)
+            theme_rise = 0.0
+            theme_count = 0
+            for tag in current & self.tags[position]:
+                count, rise = stats.tag_rises.get(tag, (0, 0.0))
+                theme_count += count
+                theme_rise = max(theme_rise, rise)
+            common_count = int(common_counts[position])
+            score = common_count * 10 + theme_rise * 2 + theme_count * 5 + stats.max_rise * 0.5
+            candidates.append((-score, position, common_count, theme_rise, theme_count, stats.max_rise, score))
+
+        # 점수가 같으면 테마 표 순서를 따른다.
+        candidates.sort(key=lambda item: item[:2])
+        return [
+            dict(
+                zip(
+                    SIMILAR_STOCK_COLUMNS,
+                    (self.keys[position], self.names[position], common, max_rise, theme_rise, theme_count, score),
+                )
+            )
+            for _, position, common, theme_rise, theme_count, max_rise, score in candidates[:limit]
+        ]
+
+
+def _stock_rise_stats(tags: frozenset[str], rises: np.ndarray, reasons: np.ndarray) -> StockRiseStats:
+    valid = ~pd.isna(rises)
+    max_rise = max(0.0, float(rises[valid].max())) if valid.any() else 0.0
+    matchable = valid & ~pd.isna(reasons)
+    lowered = [str(reason).lower() for reason in reasons[matchable]]
+    matched_rises = rises[matchable]
+    tag_rises = {}
+    for tag in tags:
+        keywords = _tag_keywords(tag)
+        hits = [rise for rise, reason in zip(matched_rises, lowered) if any(kw in reason for kw in keywords)]
+        if hits:
+            tag_rises[tag] = (len(hits), max(0.0, float(max(hits))))
+    return StockRiseStats(max_rise, tag_rises)
+
+
+def _present_text(value) -> bool:
+    return value is not None and not pd.isna(value) and bool(str(value).strip())
+
+
+def _fallback_rows(
+    key: str | None,
+    candidates: frozenset[str],
+    positions_by_code: dict[str, np.ndarray],
+    positions_by_name: dict[str, np.ndarray],
+) -> np.ndarray:
+    """종목키 그룹이 없는 테마 행의 상천 행 위치. 종목코드가 종목키와 같은 행, 없으면 종목명이 후보 이름인 행"""
+    if key and key in positions_by_code:
+        return positions_by_code[key]
+    matched = [positions_by_name[name] for name in candidates if name in positions_by_name]
+    return np.concatenate(matched) if matched else np.array([], dtype=np.int64)
+
+
+def build_hashtag_index(
+    entries: pd.DataFrame,
+    sangcheon: pd.DataFrame,
+    names_by_key: Mapping[str, Iterable[str]] | None = None,
+) -> HashtagIndex:
+    """테마 표 행(종목키·종목명·테마_전체)과 상천 이력(__stock_key·상승률·상승이유)으로 역색인을 만든다.
+
+    상승률 통계는 상천 이력의 모든 종목에 대해 만든다. 종목키로 상천 이력을 못 찾은 테마 행은 상세 화면의
+    행 찾기와 같이 상천 종목코드가 종목키와 같은 행, 없으면 종목명이 테마 행 종목명이나 names_by_key의
+    이름(구 사명 등)과 같은 행으로 통계를 만든다. 그래도 없으면 상승 이력은 없는 것으로 본다.
+    """
+    keys = tuple(None if pd.isna(key) or not key else key for key in _column_or_none(entries, "종목키").tolist())
+    names = tuple(_column_or_none(entries, "종목명").tolist())
+    tags = tuple(split_hashtags(text) for text in _column_or_none(entries, "테마_전체").tolist())
+
+    positions_by_tag: dict[str, list[int]] = {}
+    for position, entry_tags in enumerate(tags):
+        for tag in entry_tags:
+            positions_by_tag.setdefault(tag, []).append(position)
+    postings = {tag: np.asarray(positions, dtype=np.int32) for tag, positions in positions_by_tag.items()}
+
+    tags_by_key: dict[str, frozenset[str]] = {}
+    for key, entry_tags in zip(keys, tags):
+        if key and entry_tags:
+            tags_by_key[key] = tags_by_key.get(key, frozenset()) | entry_tags
+
+    stats = {}
+    entry_stats = {}
+    if sangcheon is not None and not sangcheon.empty and "상승률" in sangcheon.columns:
+        rises = pd.to_numeric(
+            pd.Series(_map_unique(sangcheon["상승률"], lambda value: convert_rise_rate(value)[0]), dtype=object),
+            errors="coerce",
+        ).to_numpy(dtype=float)
+        reasons = _column_or_none(sangcheon, "상승이유").to_numpy(dtype=object)
+        row_keys = _column_or_none(sangcheon, "__stock_key")
+        keyed = np.flatnonzero(row_keys.fillna("").astype(str).str.strip().ne("").to_numpy())
+        for key, positions in pd.Series(keyed).groupby(row_keys.to_numpy(dtype=object)[keyed], sort=False):
+            positions = positions.to_numpy()
+            stats[key] = _stock_rise_stats(tags_by_key.get(key, frozenset()), rises[positions], reasons[positions])
+
+        codes = _column_or_none(sangcheon, "종목코드").fillna("").astype(str).str.strip()
+        row_names = _column_or_none(sangcheon, "종목명").astype(str).str.strip()
+        positions_by_code = codes[codes.ne("")].groupby(codes[codes.ne("")].to_numpy(), sort=False).indices
+        positions_by_name = row_names.groupby(row_names.to_numpy(dtype=object), sort=False).indices
+        fallback_stats: dict[tuple, StockRiseStats] = {}
+        for position, (key, name, entry_tags) in enumerate(zip(keys, names, tags)):
+            if key in stats:
+                continue
+            candidates = frozenset(
+                str(text).strip() for text in (name, *(names_by_key or {}).get(key, ())) if _present_text(text)
+            )
+            lookup = (key, candidates, tags_by_key.get(key, entry_tags) if key else entry_tags)
+            if lookup not in fallback_stats:
+                matched = _fallback_rows(key, candidates, positions_by_code, positions_by_name)
+                fallback_stats[lookup] = (
+                    _stock_rise_stats(lookup[2], rises[matched], reasons[matched]) if len(matched) else _NO_RISES
+                )
+            if fallback_stats[lookup] is not _NO_RISES:
+                entry_stats[position] = fallback_stats[lookup]
+    return HashtagIndex(keys=keys, names=names, tags=tags, postings=postings, stats=stats, entry_stats=entry_stats)
+
+
+# 점수 공식이나 표 구조가 바뀌면 올려서 이전 스냅샷의 표를 버린다.
+SIMILAR_STOCK_TABLE_VERSION = 2
+SIMILAR_STOCK_TABLE_ARTIFACT = f"similar_stocks_v{SIMILAR_STOCK_TABLE_VERSION}"
+
+
+@dataclass(frozen=True)
+class SimilarStockTable:
+    """종목키 → (추천 방식, 상위 유사 종목) 표.
+
+    추천 방식은 관련테마 해시태그로 찾았으면 "hashtag", 상천 이력의 같은 테마로 대신 찾았으면 "theme"이다.
+    """
+
+    entries: dict[str, tuple[str, tuple[dict, ...]]]
+
+    def lookup(self, stock_key: str | None) -> tuple[list[dict], str | None]:
+        method, stocks = self.entries.get(stock_key, (None, ()))
+        return [dict(stock) for stock in stocks], method
+
+
+def _expand_pairs(
+    left_offsets: np.ndarray, left_items: np.ndarray, right_offsets: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """해시태그마다 왼쪽 항목 × 오른쪽 포스팅의 곱집합을 펼쳐 (왼쪽 항목, 오른쪽 포스팅 위치)를 돌려준다."""
+    right_counts = np.diff(right_offsets)
+    sizes = np.diff(left_offsets) * right_counts
+    tags = np.repeat(np.arange(len(sizes)), sizes)
+    within = np.arange(int(sizes.sum())) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    width = right_counts[tags]
+    return left_items[left_offsets[tags] + within // width], right_offsets[tags] + within % width
+
+
+def _hashtag_neighbours(index: HashtagIndex, query_keys: list[str], query_tags: list[frozenset[str]], limit: int):
+    """모든 질의 종목의 해시태그 혼합점수 상위 후보를 한 번에 계산한다.
+
+    질의×해시태그, 해시태그×테마 행 희소 행렬의 곱을 좌표 목록으로 펼친 뒤 (질의, 후보)별로 공통 개수와
+    테마 매칭 횟수는 더하고 테마 매칭 상승률은 최댓값을 취한다.
+    """
+    tag_names = list(index.postings)
+    vocabulary = {tag: number for number, tag in enumerate(tag_names)}
+    pairs = [(vocabulary[tag], query) for query, tags in enumerate(query_tags) for tag in tags if tag in vocabulary]
+    if not pairs:
+        return {}
+    lengths = [len(index.postings[tag]) for tag in tag_names]
+    entry_offsets = np.r_[0, np.cumsum(lengths)]
+    entry_items = np.concatenate([index.postings[tag] for tag in tag_names]).astype(np.int64)
+    posting_stats = [
+        index.position_stats(entry).tag_rises.get(tag_names[tag], (0, 0.0))
+        for tag, entry in zip(np.repeat(np.arange(len(tag_names)), lengths).tolist(), entry_items.tolist())
+    ]
+    posting_counts = np.array([count for count, _ in posting_stats], dtype=np.int64)
+    posting_rises = np.array([rise for _, rise in posting_stats], dtype=float)
+
+    pair_tags, pair_queries = (np.array(column, dtype=np.int64) for column in zip(*pairs))
+    order = np.argsort(pair_tags, kind="stable")
+    query_offsets = np.r_[0, np.cumsum(np.bincount(pair_tags, minlength=len(tag_names)))]
+    queries, postings = _expand_pairs(query_offsets, pair_queries[order], entry_offsets)
+    entries = entry_items[postings]
+
+    key_codes, _ = pd.factorize(pd.Series([*index.keys, *query_keys], dtype=object), use_na_sentinel=True)
+    entry_codes, query_codes = key_codes[: len(index.keys)], key_codes[len(index.keys):]
+    keep = entry_codes[entries] != query_codes[queries]
+    if not keep.any():
+        return {}
+    queries, postings, entries = queries[keep], postings[keep], entries[keep]
+
+    size = len(index.keys)
+    combined = queries * size + entries
+    order = np.argsort(combined, kind="stable")
+    combined, postings = combined[order], postings[order]
+    starts = np.flatnonzero(np.r_[True, combined[1:] != combined[:-1]])
+    common = np.diff(np.r_[starts, len(combined)])
+    theme_counts = np.add.reduceat(posting_counts[postings], starts)
+    theme_rises = np.maximum.reduceat(posting_rises[postings], starts)
+    pair_queries, pair_entries = combined[starts] // size, combined[starts] % size
+    max_rises = np.array([index.position_stats(entry).max_rise for entry in range(len(index.keys))], dtype=float)[
+        pair_entries
+    ]
+    scores = common * 10 + theme_rises * 2 + theme_counts * 5 + max_rises * 0.5
+
+    # 질의마다 점수 내림차순, 같으면 테마 표 순서로 상위 limit개만 남긴다.
+    ranked = np.lexsort((pair_entries, -scores, pair_queries))
+    ranked_queries = pair_queries[ranked]
+    group_starts = np.flatnonzero(np.r_[True, ranked_queries[1:] != ranked_queries[:-1]])
+    ranks = np.arange(len(ranked)) - np.repeat(group_starts, np.diff(np.r_[group_starts, len(ranked)]))
+    neighbours: dict[int, list[dict]] = {}
+    for position in ranked[ranks < limit].tolist():
+        entry = int(pair_entries[position])
+        neighbours.setdefault(int(pair_queries[position]), []).append(
+            dict(
+                zip(
+                    SIMILAR_STOCK_COLUMNS,
+                    (
+                        index.keys[entry],
+                        index.names[entry],
+                        int(common[position]),
+                        float(max_rises[position]),
+                        float(theme_rises[position]),
+                        int(theme_counts[position]),
+                        float(scores[position]),
+                    ),
+                )
+            )
+        )
+    return neighbours
+
+
+def _theme_neighbours(index: HashtagIndex, sangcheon: pd.DataFrame, names: dict[str, str], limit: int):
+    """상천 테마 값마다 최고 상승률 상위 종목 limit+1개 (질의 종목 자신을 빼고도 limit개가 남도록)"""
+    if sangcheon is None or sangcheon.empty or "테마" not in sangcheon.columns:
+        return {}
+    keys = _column_or_none(sangcheon, "__stock_key")
+    members = pd.DataFrame({"테마": sangcheon["테마"].to_numpy(dtype=object), "종목키": keys.to_numpy(dtype=object)})
+    members = members[members["테마"].notna() & members["테마"].astype(bool) & members["종목키"].notna()]
+    members = members.drop_duplicates(["테마", "종목키"])
+    members["최고상승률"] = [index.stock_stats(key).max_rise for key in members["종목키"]]
+    members = members.sort_values("최고상승률", ascending=False, kind="stable")
+    top = members.groupby("테마", sort=False).head(limit + 1)
+    neighbours: dict[object, list[dict]] = {}
+    for theme, key, rise in zip(top["테마"], top["종목키"], top["최고상승률"]):
+        neighbours.setdefault(theme, []).append(
+            {"종목코드": key, "종목명": names.get(key, key), "최고상승률": rise, "혼합점수": rise}
+        )
+    return neighbours
+
+
+def build_similar_stock_table(
+    index: HashtagIndex,
+    queries: pd.DataFrame,
+    sangcheon: pd.DataFrame,
+    limit: int = SIMILAR_STOCK_LIMIT,
+) -> SimilarStockTable:
+    """종목 상세에 보일 유사 종목을 모든 종목에 대해 미리 계산한다.
+
+    queries는 상세 화면에 나오는 종목마다 종목키·종목명, 테마 표의 테마_전체, 최신 상천 행의 테마를 담는다.
+    관련테마 해시태그로 찾은 종목이 없으면 같은 상천 테마 종목을 최고 상승률 순으로 대신 쓴다.
+    """
+    query_keys = _column_or_none(queries, "종목키").tolist()
+    names = dict(zip(query_keys, _column_or_none(queries, "종목명").tolist()))
+    query_tags = [
+        frozenset() if text == "-" else split_hashtags(text)
+        for text in _column_or_none(queries, "테마_전체").tolist()
+    ]
+    by_hashtag = _hashtag_neighbours(index, query_keys, query_tags, limit)
+    by_theme = _theme_neighbours(index, sangcheon, names, limit)
+
+    entries = {}
+    for position, (stock_key, row_theme) in enumerate(zip(query_keys, _column_or_none(queries, "테마").tolist())):
+        if position in by_hashtag:
+            entries[stock_key] = ("hashtag", tuple(by_hashtag[position]))
+            continue
+        if row_theme is None or pd.isna(row_theme) or not row_theme:
+            continue
+        stocks = [stock for stock in by_theme.get(row_theme, []) if stock["종목코드"] != stock_key][:limit]
+        if stocks:
+            entries[stock_key] = ("theme", tuple(stocks))
+    return SimilarStockTable(entries)
@@ -1,13 +1,29 @@
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
 from issue_analysis import (
+    HotIssueIndex,
+    TradingCalendar,
+    _assign_theme_cycles,
     analyze_hot_issues,
+    append_theme_events,
+    build_issue_graph,
+    build_reaction_matrix,
+    build_sparse_reaction_matrix,
     build_theme_event_index,
     calculate_leadership_score,
+    calculate_recency_score,
     extract_theme_terms,
     group_issue_cycles,
+    hot_issue_preset_period,
     prepare_issue_events,
     score_stocks,
+    stock_labels,
 )
 
 
@@ -108,6 +124,36 @@ def test_unmatched_static_high_rise_does_not_change_matched_highest_rise():
     assert ranking.iloc[0]["최고상승률"] == 10
 
 
+def test_grouped_scores_match_per_stock_formulas():
+    trading_days = pd.bdate_range("2026-01-02", periods=10)
+    results = pd.DataFrame(
+        [
+            result_row("000001", "A", trading_days[0], 20, relevance=90),
+            result_row("000002", "B", trading_days[0], 10),
+            result_row("000003", "C", trading_days[1], 12, relevance=60),
+            result_row("000001", "A", trading_days[6], 15, relevance=70),
+            result_row("000002", "B", trading_days[7], 18),
+            result_row("000004", "D", trading_days[2], None),
+        ]
+    )
+    summaries, members, _ = group_issue_cycles(results, trading_days)
+    ranking = score_stocks(results, summaries, members, reference_date=trading_days[-1])
+    scores = ranking.set_index("종목키")
+    concurrent = summaries.set_index("회차")["동시상승종목수"]
+
+    for stock_key, rows in members.groupby("종목키"):
+        diffusion = sum(min(10.0, max(0, concurrent[cycle] - 1) / 4 * 10.0) for cycle in rows["회차"])
+        assert scores.loc[stock_key, "부각회차수"] == rows["회차"].nunique()
+        assert scores.loc[stock_key, "주도성점수"] == round(calculate_leadership_score(rows["회차내순위"]), 2)
+        assert scores.loc[stock_key, "확산점수"] == round(diffusion / len(rows), 2)
+        assert scores.loc[stock_key, "최근성점수"] == round(
+            calculate_recency_score(rows["날짜"].max(), trading_days[-1]), 2
+        )
+    assert scores.loc["000004", ["부각회차수", "대장횟수", "확산점수"]].tolist() == [0, 0, 0.0]
+    assert pd.isna(scores.loc["000004", "최근부각일"])
+    assert ranking["순위"].tolist() == list(range(1, 5))
+
+
 def test_theme_terms_are_canonicalized_and_generic_individual_tags_removed():
     aliases = {"원전": ["원전", "원자력"]}
     terms = extract_theme_terms(
@@ -149,3 +195,328 @@ def test_hot_issue_previous_period_marks_new_issue():
     assert ranking.iloc[0]["이슈"] == "원전"
     assert ranking.iloc[0]["상태"] == "신규 부각"
     assert metadata["비교여부"] is True
+
+
+def test_trading_calendar_counts_off_calendar_dates_as_extra_days():
+    trading_days = pd.bdate_range("2026-01-05", periods=10)
+    calendar = TradingCalendar(list(trading_days[::-1]) + [None, trading_days[0]])
+
+    assert len(calendar) == 10
+    assert calendar[0] == trading_days[0] and calendar[-1] == trading_days[-1]
+    saturday = pd.Timestamp("2026-01-10")
+    dates = [trading_days[0], trading_days[3], saturday, trading_days[5], trading_days[9]]
+    # 토요일은 달력에 없지만 합집합 위치 기준처럼 거래일 하나로 센다.
+    assert calendar.gaps(dates).tolist() == [3, 2, 1, 4]
+    assert calendar.cycle_numbers(dates, 3).tolist() == [1, 1, 1, 1, 2]
+    assert calendar.positions([pd.Timestamp("2026-01-01"), saturday]).tolist() == [-1, 4]
+
+    window = calendar.between("2026-01-07", saturday)
+    assert list(window) == list(trading_days[2:5])
+    assert list(calendar.window(-2, 2)) == list(trading_days[:2])
+
+
+def test_group_issue_cycles_accepts_calendar_or_day_list():
+    trading_days = pd.bdate_range("2026-01-02", periods=12)
+    results = pd.DataFrame(
+        [
+            result_row("000001", "A", trading_days[0], 10),
+            result_row("000002", "B", trading_days[2], 12),
+            result_row("000001", "A", trading_days[7], 15),
+            result_row("000003", "C", trading_days[11], 11),
+        ]
+    )
+
+    from_list = group_issue_cycles(results, trading_days)
+    from_calendar = group_issue_cycles(results, TradingCalendar(trading_days))
+
+    for expected, actual in zip(from_list, from_calendar):
+        pd.testing.assert_frame_equal(actual, expected)
+    assert from_calendar[1]["회차"].tolist() == ["1회차", "1회차", "2회차", "3회차"]
+
+
+def test_theme_cycles_restart_per_issue_and_count_off_calendar_event_days():
+    trading_days = pd.bdate_range("2026-01-05", periods=10)
+    saturday = pd.Timestamp("2026-01-10")
+    events = pd.DataFrame(
+        {
+            "이슈": ["원전", "HBM", "원전", "HBM", "원전", "HBM"],
+            "날짜": [trading_days[0], trading_days[4], trading_days[3], saturday, trading_days[6], trading_days[9]],
+            "종목키": ["000001"] * 6,
+        }
+    )
+
+    cycles = _assign_theme_cycles(events, trading_days)
+
+    # HBM의 토요일도 거래일 하나로 세므로 원전의 목요일→다음 화요일은 4거래일 간격이 된다.
+    assert cycles["회차번호"].tolist() == [1, 1, 1, 1, 2, 2]
+    calendar = TradingCalendar(trading_days)
+    assert calendar.cycle_numbers(
+        [trading_days[0], trading_days[5], trading_days[1], trading_days[2]], 3, groups=[0, 0, 1, 1]
+    ).tolist() == [1, 2, 1, 1]
+
+
+def test_hot_issue_index_windows_match_direct_aggregation():
+    trading_days = pd.bdate_range("2026-01-05", periods=30)
+    calendar = TradingCalendar(trading_days)
+    rng = np.random.default_rng(7)
+    events = pd.DataFrame(
+        {
+            "이슈": rng.choice(["원전", "HBM", "로봇", "헬륨"], size=120),
+            "날짜": trading_days[rng.integers(0, 30, size=120)],
+            "종목키": rng.choice([f"00000{number}" for number in range(8)], size=120),
+            "상승률": rng.integers(50, 3000, size=120) / 100,
+        }
+    ).drop_duplicates(["이슈", "날짜", "종목키"], ignore_index=True)
+    events["종목명"] = "종목" + events["종목키"].str[-1]
+    hot_index = HotIssueIndex(events, calendar)
+
+    for start, end in [(0, 29), (5, 9), (12, 27), (29, 29)]:
+        days = calendar.window(start, end + 1)
+        summary = hot_index.summarize(days).set_index("이슈")
+        period = hot_index.period_events(days)
+        expected_rows = events[events["날짜"].between(days[0], days[-1])]
+        pd.testing.assert_frame_equal(period.drop(columns="회차번호"), expected_rows)
+        assert period["회차번호"].tolist() == _assign_theme_cycles(expected_rows, days)["회차번호"].tolist()
+        for issue, rows in period.groupby("이슈"):
+            stock_cycles = rows.groupby("종목키")["회차번호"].nunique()
+            assert summary.loc[issue, "상승종목수"] == rows["종목키"].nunique()
+            assert summary.loc[issue, "부각거래일수"] == rows["날짜"].nunique()
+            assert summary.loc[issue, "부각회차수"] == rows["회차번호"].nunique()
+            assert summary.loc[issue, "반복종목수"] == (stock_cycles >= 2).sum()
+            assert summary.loc[issue, "평균상승률"] == rows["상승률"].mean()
+            assert summary.loc[issue, "중앙상승률"] == rows["상승률"].median()
+            assert summary.loc[issue, "15%이상종목수"] == (rows["상승률"] >= 15).sum()
+            assert summary.loc[issue, "최근부각일"] == rows["날짜"].max()
+
+    from_frame = analyze_hot_issues(events, trading_days, trading_days[10], trading_days[19])
+    from_index = analyze_hot_issues(hot_index, calendar, trading_days[10], trading_days[19])
+    pd.testing.assert_frame_equal(from_index[0], from_frame[0])
+    pd.testing.assert_frame_equal(from_index[1], from_frame[1])
+
+
+def test_daily_hot_scores_match_period_summaries():
+    trading_days = pd.bdate_range("2026-01-05", periods=25)
+    calendar = TradingCalendar(trading_days)
+    rng = np.random.default_rng(11)
+    events = pd.DataFrame(
+        {
+            "이슈": rng.choice(["원전", "HBM", "로봇"], size=90),
+            "날짜": trading_days[rng.integers(0, 25, size=90)],
+            "종목키": rng.choice([f"00000{number}" for number in range(6)], size=90),
+            "상승률": rng.integers(100, 3000, size=90) / 100,
+        }
+    ).drop_duplicates(["이슈", "날짜", "종목키"], ignore_index=True)
+    events["종목명"] = events["종목키"]
+    hot_index = HotIssueIndex(events, calendar)
+
+    daily = hot_index.daily_scores(window=5)
+
+    assert daily.shape == (3, 25) and daily.dtypes.eq("float32").all()
+    assert hot_index.daily_scores(window=5) is daily
+    for column in [0, 3, 12, 24]:
+        summary = hot_index.summarize(calendar.window(column - 4, column + 1)).set_index("이슈")
+        scores = daily.iloc[:, column]
+        for issue in daily.index:
+            if issue in summary.index:
+                assert abs(scores[issue] - summary.loc[issue, "핫점수"]) <= 0.0051
+            else:
+                assert scores[issue] == 0
+
+
+def test_daily_hot_scores_do_not_depend_on_column_block_size(monkeypatch):
+    import issue_analysis
+
+    trading_days = pd.bdate_range("2026-01-05", periods=40)
+    rng = np.random.default_rng(3)
+    events = pd.DataFrame(
+        {
+            "이슈": rng.choice(["원전", "HBM", "로봇", "헬륨"], size=150),
+            "날짜": trading_days[rng.integers(0, 40, size=150)],
+            "종목키": rng.choice([f"00000{number}" for number in range(8)], size=150),
+            "상승률": rng.integers(100, 3000, size=150) / 100,
+        }
+    ).drop_duplicates(["이슈", "날짜", "종목키"], ignore_index=True)
+    events["종목명"] = events["종목키"]
+    expected = HotIssueIndex(events, TradingCalendar(trading_days)).daily_scores(window=7)
+
+    monkeypatch.setattr(issue_analysis, "DAILY_SCORE_BLOCK_COLUMNS", 3)
+    blocked = HotIssueIndex(events, TradingCalendar(trading_days))
+
+    pd.testing.assert_frame_equal(blocked.daily_scores(window=7), expected)
+    np.testing.assert_array_equal(blocked._sweep_daily_scores(7, start_column=25), expected.to_numpy()[:, 25:])
+
+
+def test_theme_event_index_parses_each_distinct_theme_once(monkeypatch):
+    import issue_analysis
+
+    parsed = []
+    original_parser = issue_analysis._extract_theme_terms_with_map
+    monkeypatch.setattr(
+        issue_analysis,
+        "_extract_theme_terms_with_map",
+        lambda value, alias_map: parsed.append(value) or original_parser(value, alias_map),
+    )
+    trading_days = pd.bdate_range("2026-01-05", periods=6)
+    rows = pd.DataFrame(
+        {
+            "날짜": trading_days,
+            "종목명": ["A", "B", "C", "A", "B", "C"],
+            "종목코드": ["1", "2", "3", "1", "2", "3"],
+            "상승률": ["12%", "15%", "0.2", "11%", "-", "13%"],
+            "테마": ["원자력/로봇", "원자력/로봇", "로봇", "로봇", "원자력/로봇", None],
+        }
+    )
+
+    events = build_theme_event_index(rows, {"원전": ["원자력"]})
+
+    assert sorted(value for value in parsed if value is not None) == ["로봇", "원자력/로봇"]
+    assert events[["이슈", "종목키", "상승률"]].values.tolist() == [
+        ["로봇", "000001", 11.0],
+        ["로봇", "000003", 20.0],
+        ["로봇", "000002", 15.0],
+        ["원전", "000002", 15.0],
+        ["로봇", "000001", 12.0],
+        ["원전", "000001", 12.0],
+    ]
+
+
+def test_appended_theme_events_and_hot_index_match_full_rebuild():
+    trading_days = pd.bdate_range("2026-01-05", periods=30)
+    rng = np.random.default_rng(5)
+    sangcheon = pd.DataFrame(
+        {
+            "날짜": trading_days[np.sort(rng.integers(0, 30, size=160))],
+            "종목코드": rng.choice([str(number) for number in range(1, 10)], size=160),
+            "상승률": rng.choice([8.0, 12.5, 15.0, 22.0, 29.9], size=160),
+            "테마": rng.choice(["원전/로봇", "HBM", "로봇", "헬륨/원자력", "유리기판/HBM"], size=160),
+        }
+    )
+    sangcheon["종목명"] = "종목" + sangcheon["종목코드"]
+    aliases = {"원전": ["원자력"]}
+    old_rows = sangcheon[sangcheon["날짜"] < trading_days[24]]
+    new_rows = sangcheon[sangcheon["날짜"] >= trading_days[24]]
+
+    hot_index = HotIssueIndex(build_theme_event_index(old_rows, aliases), TradingCalendar(trading_days[:24]))
+    hot_index.daily_scores(5)
+    hot_index.append(build_theme_event_index(new_rows, aliases), trading_days)
+    rebuilt = HotIssueIndex(build_theme_event_index(sangcheon, aliases), trading_days)
+
+    merged = append_theme_events(build_theme_event_index(old_rows, aliases), new_rows, aliases)
+    pd.testing.assert_frame_equal(merged, rebuilt.events)
+    pd.testing.assert_frame_equal(hot_index.events, rebuilt.events)
+    for start, end in [(0, 29), (20, 29), (24, 27), (3, 12)]:
+        days = TradingCalendar(trading_days).window(start, end + 1)
+        pd.testing.assert_frame_equal(hot_index.summarize(days), rebuilt.summarize(days))
+        pd.testing.assert_frame_equal(hot_index.period_events(days), rebuilt.period_events(days))
+    expected = rebuilt.daily_scores(5)
+    np.testing.assert_allclose(hot_index.daily_scores(5).reindex(expected.index), expected, atol=1e-5)
+
+    # 과거 날짜 행이 다시 들어오면 높은 상승률만 남기고 인덱스를 다시 만든다.
+    correction = sangcheon.iloc[[0]].assign(상승률=35.0)
+    hot_index.append(build_theme_event_index(correction, aliases))
+    corrected = HotIssueIndex(build_theme_event_index(pd.concat([sangcheon, correction]), aliases), trading_days)
+    pd.testing.assert_frame_equal(hot_index.events, corrected.events)
+    pd.testing.assert_frame_equal(
+        hot_index.summarize(TradingCalendar(trading_days)), corrected.summarize(TradingCalendar(trading_days))
+    )
+
+
+def test_daily_scores_are_computed_once_across_threads_and_copies_keep_their_own_memo(monkeypatch):
+    trading_days = pd.bdate_range("2026-01-05", periods=12)
+    events = pd.DataFrame(
+        {
+            "이슈": ["원전", "원전", "HBM", "HBM"],
+            "날짜": trading_days[[0, 2, 3, 8]],
+            "종목키": ["000001", "000002", "000001", "000003"],
+            "종목명": ["A", "B", "A", "C"],
+            "상승률": [12.0, 15.0, 29.9, 11.0],
+        }
+    )
+    hot_index = HotIssueIndex(events, TradingCalendar(trading_days[:10]))
+    sweeps = []
+    original_sweep = HotIssueIndex._sweep_daily_scores
+
+    def slow_sweep(self, *args, **kwargs):
+        sweeps.append(threading.current_thread().name)
+        time.sleep(0.05)
+        return original_sweep(self, *args, **kwargs)
+
+    monkeypatch.setattr(HotIssueIndex, "_sweep_daily_scores", slow_sweep)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: hot_index.daily_scores(5), range(4)))
+
+    assert len(sweeps) == 1
+    assert all(result is results[0] for result in results)
+
+    extended = copy.copy(hot_index).append(None, trading_days)
+    assert extended._daily_scores is not hot_index._daily_scores
+    assert hot_index.daily_scores(5) is results[0] and hot_index.daily_scores(5).shape == (2, 10)
+    assert extended.daily_scores(5).shape == (2, 12)
+
+
+def test_sparse_reaction_matrix_keeps_cell_maximums_and_selects_top_rows_and_cycles():
+    members = pd.DataFrame(
+        {
+            "종목키": ["000001", "000001", "000002", "000002", "000003", "000003"],
+            "종목명": ["가", "가", "나", "나", "다", "다"],
+            "회차": ["2회차", "10회차", "2회차", "2회차", "1회차", "10회차"],
+            "상승률": [12.0, 29.9, 8.0, 15.0, None, 4.0],
+        }
+    )
+
+    matrix = build_sparse_reaction_matrix(members)
+    frame = matrix.to_frame()
+
+    assert frame.index.tolist() == ["가 (000001)", "나 (000002)", "다 (000003)"]
+    assert frame.columns.tolist() == ["2회차", "10회차"]
+    assert frame.loc["나 (000002)", "2회차"] == 15.0
+    pd.testing.assert_frame_equal(build_reaction_matrix(members), frame)
+    assert matrix.color_bins().tolist() == [[4, 9], [5, -1], [-1, 1]]
+
+    labels = stock_labels(members.iloc[[4, 0]])
+    assert matrix.strongest_cycles(1, labels) == ["10회차"]
+    subset = matrix.to_frame(labels, ["10회차", "1회차"])
+    assert subset.index.tolist() == ["다 (000003)", "가 (000001)"]
+    assert subset.columns.tolist() == ["10회차"]
+    assert build_sparse_reaction_matrix(members.iloc[:0]).empty
+
+
+def test_hot_issue_presets_count_back_trading_days_and_start_the_year_on_its_first_trading_day():
+    calendar = TradingCalendar(pd.bdate_range("2025-12-01", "2026-01-09"))
+
+    assert hot_issue_preset_period(calendar, "최근 5거래일") == (pd.Timestamp("2026-01-05"), pd.Timestamp("2026-01-09"))
+    assert hot_issue_preset_period(calendar, "최근 120거래일")[0] == pd.Timestamp("2025-12-01")
+    assert hot_issue_preset_period(calendar, "올해")[0] == pd.Timestamp("2026-01-01")
+    assert hot_issue_preset_period(TradingCalendar(), "올해") is None
+
+
+def test_issue_graph_links_issues_that_rose_on_the_same_stock_and_day():
+    first, second = pd.Timestamp("2026-01-05"), pd.Timestamp("2026-01-06")
+    sangcheon = pd.DataFrame(
+        {
+            "날짜": [first, first, second, second],
+            "종목코드": ["1", "2", "1", "3"],
+            "종목명": ["가", "나", "가", "다"],
+            "상승률": [20.0, 10.0, 15.0, 5.0],
+            "테마": ["HBM/유리기판", "HBM/유리기판", "HBM/로봇", "로봇"],
+        }
+    )
+    hot_index = HotIssueIndex(build_theme_event_index(sangcheon, {}), pd.bdate_range(first, periods=2))
+
+    graph = hot_index.issue_graph()
+    related = graph.related("HBM")
+
+    assert graph is hot_index.issue_graph()
+    assert related["이슈"].tolist() == ["유리기판", "로봇"]
+    assert related["공동종목일수"].tolist() == [2, 1]
+    assert related["공동종목수"].tolist() == [2, 1]
+    assert related["공동상승률합"].tolist() == [30.0, 15.0]
+    # 공동 상승률 합 / sqrt(이슈별 상승률 합의 곱) × 100
+    assert related["연관점수"].tolist() == [81.65, 50.0]
+    assert graph.related("유리기판")["이슈"].tolist() == ["HBM"]
+    assert graph.related("HBM", limit=1)["이슈"].tolist() == ["유리기판"]
+    assert graph.related("없는 이슈").empty
+    assert build_issue_graph(hot_index.events.iloc[:0]).related("HBM").empty
+
+    hot_index.append(build_theme_event_index(sangcheon.iloc[[3]].assign(날짜=pd.Timestamp("2026-01-07"))))
+    assert hot_index.issue_graph() is not graph
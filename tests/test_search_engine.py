@@ -1,6 +1,26 @@
+import numpy as np
 import pandas as pd
+import pytest
 
-from search_engine import build_search_index, search_documents
+from search_engine import (
+    CATEGORY_COLUMNS,
+    DOCUMENT_COLUMNS,
+    EVIDENCE_SPAN_COLUMN,
+    QueryCache,
+    append_search_index,
+    build_search_index,
+    build_term_index,
+    compute_source_fingerprint,
+    document_evidence,
+    extend_term_index,
+    load_index_snapshot,
+    load_snapshot_artifact,
+    query_cache_key,
+    save_index_snapshot,
+    save_snapshot_artifact,
+    search_documents,
+    search_documents_many,
+)
 
 
 def make_index(rows):
@@ -98,3 +118,376 @@ def test_source_date_and_minimum_rise_filters():
         min_rise=15,
     )
     assert result["종목명"].tolist() == ["B"]
+
+
+def test_term_index_returns_same_rows_and_scores_as_full_scan():
+    index = make_index(
+        [
+            {"날짜": "2026-01-02", "종목명": "A", "종목코드": "1", "상승률": 0.1, "상승이유": "hbm4 투자와 원전"},
+            {"날짜": "2026-01-03", "종목명": "B", "종목코드": "2", "상승률": 0.2, "상승이유": "고대역폭메모리 C++"},
+            {"날짜": "2026-01-04", "종목명": "C", "종목코드": "3", "상승률": 0.3, "상승이유": "Ⅱ상 임상 ΑΒΓ"},
+            {"날짜": "2026-01-05", "종목명": "D", "종목코드": "4", "상승률": 0.4, "상승이유": "원자력 SMR"},
+        ]
+    )
+    term_index = build_term_index(index)
+    aliases = {"HBM": ["HBM", "고대역폭메모리"], "원전": ["원전", "원자력", "SMR"]}
+
+    for query in ["HBM", "원전", "c++", "ⅱ", "αβγ", "A", "없는검색어", "HBM 원전"]:
+        for operator in ["AND", "OR"]:
+            expected, expected_applied = search_documents(index, query, aliases=aliases, operator=operator)
+            actual, actual_applied = search_documents(
+                index, query, aliases=aliases, operator=operator, term_index=term_index
+            )
+            pd.testing.assert_frame_equal(actual, expected)
+            assert actual_applied == expected_applied
+
+
+def test_term_index_for_another_index_is_ignored():
+    index = make_index(
+        [{"날짜": "2026-01-02", "종목명": "A", "종목코드": "1", "상승률": 0.1, "상승이유": "원전"}]
+    )
+    stale_index = build_term_index(index.iloc[0:0])
+
+    result, _ = search_documents(index, "원전", term_index=stale_index)
+    assert result["종목명"].tolist() == ["A"]
+
+
+def test_relevance_score_components_per_group():
+    index = make_index(
+        [
+            {"날짜": "2026-01-02", "종목명": "A", "종목코드": "1", "상승률": 0.1, "상승이유": "HBM 원자력 SMR"},
+            {"날짜": "2026-01-03", "종목명": "B", "종목코드": "2", "상승률": 0.1, "상승이유": "HBM 원전"},
+        ]
+    )
+    aliases = {"원전": ["원전", "원자력", "SMR"]}
+    result, _ = search_documents(index, "HBM 원전", aliases=aliases)
+    by_name = result.set_index("종목명")
+
+    assert by_name.loc["B", "관련도점수"] == 90.0
+    assert by_name.loc["B", "매칭키워드"] == ["HBM", "원전"]
+    assert by_name.loc["A", "관련도점수"] == 30.0 + 16.0 + 8.0 + 5.0
+    assert by_name.loc["A", "매칭키워드"] == ["HBM", "원자력", "SMR"]
+    assert by_name.loc["A", "일치유형"] == "정확+동의어 일치"
+    assert not by_name.loc["A", "정확일치여부"]
+
+
+def test_documents_keep_row_fields_evidence_fallback_and_dynamic_source():
+    sangcheon = pd.DataFrame(
+        [
+            {"날짜": "2026-01-02", "종목명": " A ", "종목코드": "1", "상승률": "$+7.5\\%$", "상승이유": "nan", "테마": None},
+            {"날짜": "bad", "종목명": "B", "종목코드": None, "상승률": 0.1, "상승이유": "원전", "테마": "에너지"},
+            {"날짜": "2026-01-03", "종목명": None, "종목코드": "3", "상승률": 0.2, "상승이유": "무시"},
+        ]
+    )
+    signal = pd.DataFrame(
+        [{"종목명": "A", "종목코드": "000001", "주요뉴스": "수주", "__source": "시그널 뉴스"}]
+    )
+    index = build_search_index(sangcheon, signal, name_aliases={"옛A": "A"}, stock_code_map={"A": "000001"})
+
+    evidence = document_evidence(index)
+    first = index.iloc[0]
+    assert first["종목키"] == "000001"
+    assert first["검색본문"] == "종목키: 000001\n종목명: A\n종목코드: 1\n구 사명·별칭: A 옛A"
+    assert evidence.iloc[0] == first["검색본문"]
+    assert first["검색필드"] == "종목키, 종목명, 종목코드"
+    assert first["상승률"] == 7.5
+
+    second = index.iloc[1]
+    assert second["종목키"] == "B"
+    assert pd.isna(second["날짜"])
+    assert evidence.iloc[1] == "원전\n에너지"
+    assert round(second["상승률"], 6) == 10.0
+
+    assert index["출처"].tolist() == ["상천 이력", "상천 이력", "시그널 뉴스"]
+
+
+def test_append_matches_full_rebuild_and_keeps_first_duplicate():
+    history = pd.DataFrame(
+        [
+            {"날짜": "2026-01-02", "종목명": "A", "종목코드": "1", "상승률": 0.1, "상승이유": "원전"},
+            {"날짜": "2026-01-03", "종목명": "B", "종목코드": "2", "상승률": 0.2, "상승이유": "HBM"},
+        ]
+    )
+    today = pd.DataFrame(
+        [
+            {"날짜": "2026-01-03", "종목명": "B", "종목코드": "2", "상승률": 0.25, "상승이유": "HBM"},
+            {"날짜": "2026-01-04", "종목명": "C", "종목코드": "3", "상승률": 0.3, "상승이유": "원전"},
+            {"날짜": "2026-01-02", "종목명": "D", "종목코드": "4", "상승률": 0.4, "상승이유": "원전"},
+        ]
+    )
+    signal = pd.DataFrame([{"종목명": "E", "종목코드": "5", "테마": "원전", "__source": "시그널 뉴스"}])
+    themes = pd.DataFrame([{"종목명": "A", "종목코드": "1", "테마_전체": "#원전"}])
+
+    base = build_search_index(history, signal, themes)
+    appended = append_search_index(base, today)
+    rebuilt = build_search_index(pd.concat([history, today], ignore_index=True), signal, themes)
+
+    pd.testing.assert_frame_equal(appended, rebuilt, check_categorical=False)
+    assert appended["종목키"].tolist() == ["000003", "000002", "000001", "000004", "000005", "000001"]
+    assert appended.loc[appended["종목키"] == "000002", "상승률"].tolist() == [20.0]
+
+    term_index = extend_term_index(build_term_index(base), appended, base)
+    full_term_index = build_term_index(appended)
+    for field in ["gram_keys", "offsets", "postings", "always_check"]:
+        assert (getattr(term_index, field) == getattr(full_term_index, field)).all()
+
+    for index, terms in [(appended, term_index), (rebuilt, full_term_index)]:
+        pages, cursor = [], None
+        while True:
+            page, _ = search_documents(index, "원전", term_index=terms, limit=2, cursor=cursor)
+            pages.append((page["종목키"].tolist(), page["출처"].tolist(), cursor))
+            cursor = page.attrs["다음커서"]
+            if cursor is None:
+                break
+        if index is appended:
+            appended_pages = pages
+    assert appended_pages == pages
+
+
+def test_append_keeps_large_evidence_span_codes_exact():
+    # 첫 구간이 본문 32글자 뒤에서 시작하면 구간 코드가 2^53을 넘고, 홀수 코드는 float64로 정확히 담기지 않는다.
+    history = pd.DataFrame(
+        [
+            {
+                "날짜": "2026-01-02", "종목명": "에이", "종목코드": "1", "상승률": 0.1,
+                "테마": "원전/SMR2", "상승이유": "체코 원전 수주 기대",
+            }
+        ]
+    )
+    today = pd.DataFrame(
+        [{"날짜": "2026-01-05", "종목명": "B", "종목코드": "2", "상승률": 0.2, "테마": "HBM", "상승이유": "HBM 공급"}]
+    )
+    base = build_search_index(history)
+    code = int(base[EVIDENCE_SPAN_COLUMN].iloc[0])
+    assert code > 2**53 and code % 2 == 1
+
+    appended = append_search_index(base, today)
+
+    assert appended[EVIDENCE_SPAN_COLUMN].dtype == np.uint64
+    kept = (appended["종목키"] == "000001").to_numpy()
+    assert appended.loc[kept, EVIDENCE_SPAN_COLUMN].item() == base[EVIDENCE_SPAN_COLUMN].iloc[0]
+    assert document_evidence(appended)[kept].item() == "체코 원전 수주 기대\n원전/SMR2"
+
+
+def test_append_replaces_changed_stock_documents_for_given_source():
+    history = pd.DataFrame(
+        [{"날짜": "2026-01-02", "종목명": "A", "종목코드": "1", "상승률": 0.1, "상승이유": "원전"}]
+    )
+    themes = pd.DataFrame([{"종목명": "A", "종목코드": "1", "테마_전체": "#원전"}])
+    corrected = history.assign(상승이유="원자력")
+
+    base = build_search_index(history, df_themes=themes)
+    index = append_search_index(base, corrected, replace_stock_keys=["000001"])
+
+    result, _ = search_documents(index, "원전", sources=["상천 이력"])
+    assert result.empty
+    assert index["출처"].tolist() == ["상천 이력", "종목 테마·기업개요"]
+    term_index = extend_term_index(build_term_index(base), index, base)
+    assert (term_index.postings == build_term_index(index).postings).all()
+
+
+def test_index_snapshot_round_trip_and_fingerprint_mismatch(tmp_path):
+    workbook = tmp_path / "main.xlsx"
+    workbook.write_bytes(b"v1")
+    index = make_index(
+        [
+            {"날짜": "2026-01-02", "종목명": "A", "종목코드": "1", "상승률": 0.1, "상승이유": "원전 수주"},
+            {"날짜": "2026-01-03", "종목명": "B", "종목코드": "2", "상승률": 0.2, "상승이유": "HBM 투자"},
+        ]
+    )
+    term_index = build_term_index(index)
+    fingerprint = compute_source_fingerprint([workbook, tmp_path / "없는파일.json"])
+
+    save_index_snapshot(tmp_path / "cache", fingerprint, index, term_index)
+    loaded_index, loaded_terms = load_index_snapshot(tmp_path / "cache", fingerprint)
+
+    pd.testing.assert_frame_equal(loaded_index, index)
+    expected, _ = search_documents(index, "원전", term_index=term_index)
+    actual, _ = search_documents(loaded_index, "원전", term_index=loaded_terms)
+    pd.testing.assert_frame_equal(actual, expected)
+
+    workbook.write_bytes(b"v2-changed")
+    changed = compute_source_fingerprint([workbook, tmp_path / "없는파일.json"])
+    assert changed != fingerprint
+    assert load_index_snapshot(tmp_path / "cache", changed) is None
+
+
+def test_snapshot_artifacts_live_and_die_with_their_snapshot(tmp_path):
+    index = make_index([{"날짜": "2026-01-02", "종목명": "A", "종목코드": "1", "상승률": 0.1, "상승이유": "원전"}])
+    cache = tmp_path / "cache"
+
+    with pytest.raises(FileNotFoundError):
+        save_snapshot_artifact(cache, "a" * 64, "similar", {"000001": []})
+    save_index_snapshot(cache, "a" * 64, index, build_term_index(index))
+    save_snapshot_artifact(cache, "a" * 64, "similar", {"000001": ["000002"]})
+
+    assert load_snapshot_artifact(cache, "a" * 64, "similar") == {"000001": ["000002"]}
+    assert load_snapshot_artifact(cache, "a" * 64, "missing") is None
+    assert load_snapshot_artifact(cache, "b" * 64, "similar") is None
+    save_index_snapshot(cache, "a" * 64, index, build_term_index(index))
+    assert load_snapshot_artifact(cache, "a" * 64, "similar") is None
+
+
+def test_multi_term_scan_matches_single_term_scans():
+    index = make_index(
+        [
+            {"날짜": "2026-01-02", "종목명": "A", "종목코드": "1", "상승률": 0.1, "상승이유": "hbm4 양산과 MR-MUF"},
+            {"날짜": "2026-01-03", "종목명": "B", "종목코드": "2", "상승률": 0.2, "상승이유": "고대역폭메모리 (TC본더) 수주"},
+            {"날짜": "2026-01-04", "종목명": "C", "종목코드": "3", "상승률": 0.3, "상승이유": "원자력 a.b*c"},
+            {"날짜": "2026-01-05", "종목명": "D", "종목코드": "4", "상승률": 0.4, "상승이유": "무관한 내용"},
+        ]
+    )
+    aliases = {
+        "HBM": ["HBM", "고대역폭메모리", "HBM4", "TC본더", "MR-MUF", "(TC", "a.b*c", "원"],
+    }
+    body = index["검색본문"]
+    for term_index in [None, build_term_index(index)]:
+        result, _ = search_documents(index, "HBM", aliases=aliases, operator="OR", term_index=term_index)
+        matched = result.set_index("종목명")["매칭키워드"].to_dict()
+        for name, terms in matched.items():
+            text = body[index["종목명"] == name].iloc[0].casefold()
+            expected = [term for term in aliases["HBM"] if term.casefold() in text]
+            assert terms == expected
+        assert set(matched) == {"A", "B", "C"}
+
+
+def test_limit_offset_and_cursor_pages_match_full_sort():
+    rows = [
+        {
+            "날짜": f"2026-01-{day % 5 + 1:02d}",
+            "종목명": f"S{day}",
+            "종목코드": str(day),
+            "상승률": None if day % 7 == 0 else float(day % 4),
+            "상승이유": "원전 수주" if day % 3 else "원자력 원전",
+        }
+        for day in range(1, 30)
+    ]
+    index = make_index(rows)
+    aliases = {"원전": ["원전", "원자력"]}
+
+    for sort_by in ["관련도순", "최신순", "최고 상승률순"]:
+        full, _ = search_documents(index, "원전", aliases=aliases, sort_by=sort_by)
+        assert full.attrs["다음커서"] is None
+
+        window, _ = search_documents(index, "원전", aliases=aliases, sort_by=sort_by, limit=5, offset=3)
+        pd.testing.assert_frame_equal(window, full.iloc[3:8].reset_index(drop=True))
+        assert window.attrs["전체건수"] == len(full)
+
+        pages, cursor = [], None
+        while True:
+            page, _ = search_documents(
+                index, "원전", aliases=aliases, sort_by=sort_by, limit=4, cursor=cursor
+            )
+            pages.append(page)
+            cursor = page.attrs["다음커서"]
+            if cursor is None:
+                break
+        pd.testing.assert_frame_equal(pd.concat(pages, ignore_index=True), full)
+
+    with pytest.raises(ValueError):
+        search_documents(index, "원전", sort_by="최신순", limit=4, cursor=pages[0].attrs["다음커서"])
+
+
+def test_search_documents_many_matches_individual_searches():
+    index = make_index(
+        [
+            {"날짜": "2026-01-02", "종목명": "A", "종목코드": "1", "상승률": 0.1, "상승이유": "HBM 원자력"},
+            {"날짜": "2026-01-03", "종목명": "B", "종목코드": "2", "상승률": 0.2, "상승이유": "고대역폭메모리"},
+            {"날짜": "2026-01-04", "종목명": "C", "종목코드": "3", "상승률": 0.3, "상승이유": "원전 HBM"},
+        ]
+    )
+    term_index = build_term_index(index)
+    aliases = {"HBM": ["HBM", "고대역폭메모리"], "원전": ["원전", "원자력"]}
+    queries = ["HBM", "원전", "hbm 원전", "없는검색어", "HBM"]
+
+    results = search_documents_many(index, queries, aliases=aliases, min_rise=15, term_index=term_index)
+
+    assert list(results) == ["HBM", "원전", "hbm 원전", "없는검색어"]
+    for query, (result, applied) in results.items():
+        expected, expected_applied = search_documents(index, query, aliases=aliases, min_rise=15)
+        pd.testing.assert_frame_equal(result, expected)
+        assert applied == expected_applied
+
+
+def test_compact_index_restores_evidence_and_keeps_results_plain():
+    sangcheon = pd.DataFrame(
+        [
+            {"날짜": "2026-01-05", "종목명": "A", "종목코드": "1", "상승률": 0.1, "상승이유": "원전 수주", "테마": "에너지"},
+            {"날짜": "2026-01-04", "종목명": "B", "종목코드": "2", "상승률": 0.2, "상승이유": "원전\n줄바꿈\n사유"},
+            {"날짜": "2026-01-03", "종목명": "C", "종목코드": "3", "상승률": 0.3, "테마": "원전"},
+            {"날짜": "2026-01-02", "종목명": "D", "종목코드": "4", "상승률": 0.4},
+        ]
+    )
+    index = build_search_index(sangcheon)
+
+    assert all(isinstance(index[column].dtype, pd.CategoricalDtype) for column in CATEGORY_COLUMNS)
+    assert document_evidence(index).tolist() == [
+        "원전 수주\n에너지",
+        "원전\n줄바꿈\n사유",
+        "원전",
+        index["검색본문"].iloc[3],
+    ]
+    assert index["근거문장"].notna().tolist() == [False, True, False, False]
+
+    result, _ = search_documents(index, "원전", sort_by="최신순")
+    assert list(result.columns[: len(DOCUMENT_COLUMNS)]) == DOCUMENT_COLUMNS
+    assert result["근거문장"].tolist() == ["원전 수주\n에너지", "원전\n줄바꿈\n사유", "원전"]
+    assert result["종목키"].dtype == index["검색본문"].dtype
+
+
+def test_query_cache_reuses_results_until_index_version_changes():
+    history = pd.DataFrame(
+        [{"날짜": "2026-01-02", "종목명": "A", "종목코드": "1", "상승률": 0.1, "상승이유": "원전"}]
+    )
+    index = build_search_index(history)
+    cache = QueryCache()
+    aliases = {"원전": ["원전", "원자력"]}
+
+    first, applied = search_documents(index, "원전", aliases=aliases, cache=cache)
+    again, _ = search_documents(index, " 원전 ", aliases={**aliases, "HBM": ["HBM"]}, cache=cache)
+    assert len(cache) == 1
+    pd.testing.assert_frame_equal(again, first)
+    assert applied == ["원전", "원자력"]
+
+    appended = append_search_index(
+        index, history.assign(날짜="2026-01-05", 상승이유="원자력")
+    )
+    assert query_cache_key(appended, "원전", aliases) != query_cache_key(index, "원전", aliases)
+    updated, _ = search_documents(appended, "원전", aliases=aliases, cache=cache)
+    assert len(updated) == 2 and len(cache) == 2
+
+
+def test_query_cache_does_not_serve_a_filtered_index_from_its_parent_entry():
+    index = make_index(
+        [
+            {"날짜": "2026-01-02", "종목명": "A", "종목코드": "1", "상승률": 0.1, "상승이유": "원전"},
+            {"날짜": "2026-01-03", "종목명": "B", "종목코드": "2", "상승률": 0.2, "상승이유": "원전 수주"},
+            {"날짜": "2026-01-04", "종목명": "C", "종목코드": "3", "상승률": 0.3, "상승이유": "원전 정비"},
+        ]
+    )
+    cache = QueryCache()
+    full, _ = search_documents(index, "원전", cache=cache)
+    filtered_index = index[index["종목명"] == "A"]
+
+    filtered, _ = search_documents(filtered_index, "원전", cache=cache)
+
+    assert len(full) == 3 and filtered["종목명"].tolist() == ["A"]
+    assert query_cache_key(filtered_index, "원전") != query_cache_key(index, "원전")
+    assert query_cache_key(filtered_index, "원전") == query_cache_key(filtered_index, "원전")
+
+
+def test_query_cache_evicts_least_recently_used_by_bytes():
+    frame = pd.DataFrame({"값": range(100)})
+    size = int(frame.memory_usage(deep=True).sum())
+    cache = QueryCache(max_bytes=size * 2)
+
+    cache.put(("a",), frame)
+    cache.put(("b",), frame)
+    assert cache.get(("a",)) is frame
+    cache.put(("c",), frame)
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) is frame and cache.get(("c",)) is frame
+    assert cache.nbytes == size * 2
+    cache.put(("big",), pd.concat([frame] * 3))
+    assert len(cache) == 2
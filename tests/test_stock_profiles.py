@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from stock_profiles import KeyedRows, build_stock_profiles
+
+
+def keyed(frame):
+    groups = frame.groupby("__stock_key", sort=False).indices
+    return KeyedRows(frame, lambda stock_key: groups.get(stock_key, np.array([], dtype=np.int64)))
+
+
+def test_stock_profiles_hold_latest_row_summary_themes_and_limit_up_history():
+    sangcheon = pd.DataFrame(
+        {
+            "__stock_key": ["000001", "000001", "000001", "000001", "000001", "000002", ""],
+            "날짜": pd.to_datetime(
+                ["2026-01-02", "2026-01-09", "2026-01-05", "2026-01-07", "2026-01-08", "2026-01-06", "2026-01-09"]
+            ),
+            "상승률": ["29.9%", "0.05", "30%", "15%", "0.3", None, "10%"],
+            "상승이유": ["수주", None, "HBM 공급", "실적", "증설", "원전", "무관"],
+            "테마": ["반도체", "HBM", "반도체", "반도체", "반도체", "원전", "기타"],
+        }
+    )
+    overview = pd.DataFrame({"__stock_key": ["000001"], "종목명": ["가"], "핵심요약(3줄)": [None]})
+    themes = pd.DataFrame(
+        {"__stock_key": ["000001"], "종목명": ["가"], "테마_전체": ["#HBM #반도체"], "핵심요약": ["HBM 소재"]}
+    )
+    analysis = pd.DataFrame(
+        {"__stock_key": ["000001", "000001"], "테마명": ["HBM", "유리기판"], "분석결과": ["공급 확대", "투자"]}
+    )
+
+    profiles = build_stock_profiles(sangcheon, keyed(overview), keyed(themes), keyed(analysis))
+    profile = profiles["000001"]
+
+    assert set(profiles) == {"000001", "000002"}
+    assert profile.latest["테마"] == "HBM"
+    # 기업개요 요약이 비어 있으면 테마 표 핵심요약, 테마는 테마 표의 테마_전체를 쓴다.
+    assert profile.summary == "HBM 소재"
+    assert profile.theme_text == "#HBM #반도체"
+    assert profile.analysis == (("HBM", "공급 확대"), ("유리기판", "투자"))
+    assert [(event.date, event.rise_display, event.reason) for event in profile.recent] == [
+        ("2026-01-09", "5.00%", "-"),
+        ("2026-01-08", "30.00%", "증설"),
+        ("2026-01-07", "15.00%", "실적"),
+    ]
+    assert [event.limit_up for event in profile.recent] == [False, True, False]
+    # 최근 3회에 나온 날짜는 빼고 최신순
+    assert [event.date for event in profile.limit_ups] == ["2026-01-05", "2026-01-02"]
+
+    other = profiles["000002"]
+    assert (other.summary, other.theme_text, other.analysis) == (None, "원전", ())
+    assert other.recent[0].rise is None and other.limit_ups == ()
+    assert build_stock_profiles(sangcheon.iloc[:0]) == {}
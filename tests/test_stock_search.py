@@ -0,0 +1,78 @@
+from stock_search import build_stock_typeahead, choseong, decompose_jamo
+
+
+def make_typeahead():
+    return build_stock_typeahead(
+        [
+            ("000660", ["SK하이닉스", "하이닉스"]),
+            ("005930", ["삼성전자"]),
+            ("009150", ["삼성전기"]),
+            ("066570", ["LG전자", "엘지전자"]),
+            ("034730", ["SK"]),
+        ]
+    )
+
+
+def test_typeahead_ranks_exact_then_prefix_then_infix_in_stock_order():
+    typeahead = make_typeahead()
+
+    assert typeahead.search("sk").keys == ["034730", "000660"]
+    assert typeahead.search("sk").exact == ["034730"]
+    assert typeahead.search("전자").keys == ["005930", "066570"]
+    assert typeahead.search("  삼성 ").keys == ["005930", "009150"]
+    assert typeahead.search("하이닉스").keys == ["000660"]
+    assert typeahead.search("0059").keys == ["005930"]
+    assert typeahead.search("6").keys == ["000660", "066570"]
+    assert typeahead.search("삼성전자우").keys == []
+    assert typeahead.search("없는종목").keys == []
+
+
+def test_typeahead_matches_substring_scan_and_caps_results():
+    typeahead = make_typeahead()
+    entries = {
+        "000660": ["SK하이닉스", "하이닉스"],
+        "005930": ["삼성전자"],
+        "009150": ["삼성전기"],
+        "066570": ["LG전자", "엘지전자"],
+        "034730": ["SK"],
+    }
+    for query in ["s", "K하", "성전", "전", "닉스", "00", "엘지", "lg전"]:
+        expected = {
+            key for key, names in entries.items() if any(query.lower() in name.lower() for name in [key, *names])
+        }
+        assert set(typeahead.search(query).keys) == expected, query
+
+    capped = typeahead.search("0", limit=2)
+    assert len(capped.keys) == 2 and capped.truncated
+    assert typeahead.search("", limit=3).keys == ["000660", "005930", "009150"]
+    assert typeahead.search("", limit=3).truncated
+    assert not typeahead.search("", limit=10).truncated
+
+
+def test_choseong_and_partial_jamo_queries_rank_after_literal_matches():
+    typeahead = build_stock_typeahead(
+        [
+            ("005930", ["삼성전자"]),
+            ("028260", ["삼성물산"]),
+            ("000660", ["SK하이닉스"]),
+            ("030000", ["제일기획"]),
+            ("900000", ["ㅅㅅ"]),
+        ]
+    )
+
+    assert decompose_jamo("삼성전자 닭과") == "ㅅㅏㅁㅅㅓㅇㅈㅓㄴㅈㅏ ㄷㅏㄹㄱㄱㅗㅏ"
+    assert choseong("SK하이닉스") == "SKㅎㅇㄴㅅ"
+    assert typeahead.search("ㅅㅅㅈㅈ").keys == ["005930"]
+    # 글자 그대로 "ㅅㅅ"인 종목이 정확 일치로 먼저, 초성 접두 일치가 그 뒤에 온다.
+    assert typeahead.search("ㅅㅅ").keys == ["900000", "005930", "028260"]
+    assert typeahead.search("ㅅㅅ").exact == ["900000"]
+    assert typeahead.search("ㅈㅈ").keys == ["005930"]
+    assert typeahead.search("skㅎ").keys == ["000660"]
+    assert typeahead.search("삼성ㅈ").keys == ["005930"]
+    assert typeahead.search("삼성저").keys == ["005930"]
+    # "제일기"를 치는 중의 "젱"(ㅈㅔㅇ)은 "제일"(ㅈㅔㅇㅣㄹ)의 자모 접두다.
+    assert typeahead.search("젱").keys == ["030000"]
+    assert typeahead.search("성무").keys == ["028260"]
+    assert typeahead.search("ㄳ").keys == []
+    assert typeahead.search("삼성전자").exact == ["005930"]
+    assert typeahead.search("삼").keys == ["005930", "028260"]
@@ -0,0 +1,119 @@
+import pandas as pd
+
+from stock_similarity import build_hashtag_index, build_similar_stock_table, split_hashtags
+
+
+def test_split_hashtags_lowercases_and_drops_blank_tags():
+    assert split_hashtags("#HBM #유리기판 # #CXL ") == {"hbm", "유리기판", "cxl"}
+    assert split_hashtags(None) == frozenset()
+    assert split_hashtags(float("nan")) == frozenset()
+
+
+def test_similar_stocks_combine_common_tags_and_theme_matched_rises():
+    entries = pd.DataFrame(
+        {
+            "종목키": ["000001", "000002", "000003", "000004", None],
+            "종목명": ["가", "나", "다", "라", "마"],
+            "테마_전체": ["#HBM #유리기판", "#HBM #로봇", "#유리기판", "#원전", "#HBM"],
+        }
+    )
+    sangcheon = pd.DataFrame(
+        {
+            "__stock_key": ["000002", "000002", "000003", "000003", "000004"],
+            "상승률": ["0.2", "29.9%", "15%", None, "30%"],
+            "상승이유": ["HBM 공급 기대", "로봇 수주", "유리 기판 양산", "유리기판", "원전"],
+        }
+    )
+    index = build_hashtag_index(entries, sangcheon)
+
+    similar = index.similar("#HBM #유리기판", exclude_key="000001")
+
+    # 나: 공통 1개, HBM 매칭 20% 1회, 최고 29.9% -> 10 + 40 + 5 + 14.95
+    # 다: 공통 1개, "유리기판"의 앞 2글자 "유리"로 15% 1회 매칭 -> 10 + 30 + 5 + 7.5
+    assert [row["종목코드"] for row in similar] == ["000002", "000003", None]
+    assert similar[0]["혼합점수"] == 69.95
+    assert (similar[1]["테마상승률"], similar[1]["테마상승횟수"]) == (15.0, 1)
+    assert similar[2] == {
+        "종목코드": None,
+        "종목명": "마",
+        "공통개수": 1,
+        "최고상승률": 0.0,
+        "테마상승률": 0.0,
+        "테마상승횟수": 0,
+        "혼합점수": 10,
+    }
+    assert index.similar("#HBM", limit=1)[0]["종목코드"] == "000002"
+    assert index.similar("#없는테마") == []
+    assert index.stock_stats("000004").max_rise == 30.0
+    assert index.stock_stats("999999").max_rise == 0.0
+
+
+def test_similar_stock_table_matches_interactive_scores_and_falls_back_to_same_theme():
+    entries = pd.DataFrame(
+        {
+            "종목키": ["000001", "000002", "000003", "000004", "000001"],
+            "종목명": ["가", "나", "다", "라", "가"],
+            "테마_전체": ["#HBM #유리기판", "#HBM #로봇", "#유리기판 #로봇", "#원전", "#로봇"],
+        }
+    )
+    sangcheon = pd.DataFrame(
+        {
+            "__stock_key": ["000001", "000002", "000003", "000004", "000005", "000005"],
+            "상승률": ["10%", "29.9%", "15%", "30%", "12%", "0.25"],
+            "상승이유": ["로봇", "HBM 공급", "유리기판", "원전", "원전 정비", "원전"],
+            "테마": ["반도체", "반도체", "반도체", "원전", "원전", "원전"],
+        }
+    )
+    queries = pd.DataFrame(
+        {
+            "종목키": ["000001", "000002", "000003", "000004", "000005"],
+            "종목명": ["가", "나", "다", "라", "마"],
+            "테마_전체": ["#HBM #유리기판", "#HBM #로봇", "#유리기판 #로봇", "#원전", "-"],
+            "테마": ["반도체", "반도체", "반도체", "원전", "원전"],
+        }
+    )
+    index = build_hashtag_index(entries, sangcheon)
+
+    table = build_similar_stock_table(index, queries, sangcheon, limit=2)
+
+    for stock_key, theme_text in zip(queries["종목키"][:3], queries["테마_전체"][:3]):
+        assert table.lookup(stock_key) == (index.similar(theme_text, exclude_key=stock_key, limit=2), "hashtag")
+    # 라는 #원전을 가진 다른 종목이 없어 같은 상천 테마의 마로, 마는 해시태그가 없어 라로 대신한다.
+    assert table.lookup("000004") == (
+        [{"종목코드": "000005", "종목명": "마", "최고상승률": 25.0, "혼합점수": 25.0}],
+        "theme",
+    )
+    assert table.lookup("000005")[0][0]["종목코드"] == "000004"
+    assert table.lookup("999999") == ([], None)
+
+
+def test_theme_rows_without_a_stock_key_group_fall_back_to_code_and_names():
+    entries = pd.DataFrame(
+        {
+            "종목키": ["000001", "000002", "000003", None],
+            "종목명": ["가", "나", "다", "라"],
+            "테마_전체": ["#HBM", "#HBM", "#HBM", "#HBM"],
+        }
+    )
+    sangcheon = pd.DataFrame(
+        {
+            "__stock_key": ["000001", None, None, None],
+            "종목코드": ["000001", "000002", "", ""],
+            "종목명": ["가", "나", "옛다", "라"],
+            "상승률": ["10%", "20%", "15%", "12%"],
+            "상승이유": ["HBM", "HBM 공급", "로봇", "HBM"],
+        }
+    )
+
+    index = build_hashtag_index(entries, sangcheon, names_by_key={"000003": ["옛다"]})
+    rows = {row["종목명"]: row for row in index.similar("#HBM", exclude_key="000001")}
+
+    # 나는 종목코드로, 다는 구 사명으로, 종목키가 없는 라는 종목명으로 상천 행을 찾는다.
+    assert (rows["나"]["최고상승률"], rows["나"]["테마상승횟수"]) == (20.0, 1)
+    assert (rows["다"]["최고상승률"], rows["다"]["테마상승횟수"]) == (15.0, 0)
+    assert (rows["라"]["최고상승률"], rows["라"]["테마상승률"]) == (12.0, 12.0)
+    assert build_hashtag_index(entries, sangcheon).position_stats(2).max_rise == 0.0
+
+    queries = pd.DataFrame({"종목키": ["000001"], "종목명": ["가"], "테마_전체": ["#HBM"], "테마": [None]})
+    table = build_similar_stock_table(index, queries, sangcheon)
+    assert table.lookup("000001")[0] == index.similar("#HBM", exclude_key="000001")
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from issue_analysis import group_issue_cycles, score_stocks
+from search_engine import build_search_index, search_documents
+from watchlist import analyze_watchlist, trading_days_from
+
+
+def test_analyze_watchlist_matches_single_keyword_pipeline():
+    sangcheon = pd.DataFrame(
+        [
+            {"날짜": "2026-01-02", "종목명": "A", "종목코드": "1", "상승률": 0.12, "상승이유": "원전 수주"},
+            {"날짜": "2026-01-05", "종목명": "B", "종목코드": "2", "상승률": 0.2, "상승이유": "원자력 HBM"},
+            {"날짜": "2026-01-20", "종목명": "C", "종목코드": "3", "상승률": 0.3, "상승이유": "HBM 장비"},
+        ]
+    )
+    index = build_search_index(sangcheon)
+    trading_days = trading_days_from(sangcheon)
+    aliases = {"원전": ["원전", "원자력"]}
+
+    analyses = analyze_watchlist(index, ["원전", "HBM"], trading_days, aliases=aliases)
+
+    assert list(analyses) == ["원전", "HBM"]
+    for query, analysis in analyses.items():
+        matches, applied = search_documents(index, query, aliases=aliases)
+        summaries, members, _ = group_issue_cycles(matches, trading_days)
+        ranking = score_stocks(matches, summaries, members, reference_date=max(trading_days))
+        pd.testing.assert_frame_equal(analysis.matches, matches)
+        pd.testing.assert_frame_equal(analysis.cycle_summaries, summaries)
+        pd.testing.assert_frame_equal(analysis.ranking, ranking)
+        assert analysis.applied_terms == applied
@@ -6,9 +6,26 @@ import html
 from typing import Iterable
 
 import altair as alt
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from issue_analysis import REACTION_COLOR_BINS, IssueGraph, ReactionMatrix, stock_labels
+
+
+def _bin_style(bin_number: int) -> str:
+    intensity = min(0.88, 0.12 + (bin_number + 1) / REACTION_COLOR_BINS * 0.76)
+    text_color = "white" if intensity >= 0.55 else "#7f1d1d"
+    return f"background-color: rgba(220, 38, 38, {intensity:.2f}); color: {text_color}"
+
+
+# 반응 매트릭스 칸 스타일. 0번은 빈칸이고 n+1번이 색 구간 n이다.
+MATRIX_CELL_STYLES = np.array(
+    ["background-color: transparent; color: transparent"]
+    + [_bin_style(bin_number) for bin_number in range(REACTION_COLOR_BINS)],
+    dtype=object,
+)
+
 
 def apply_page_style() -> None:
     st.markdown(
@@ -71,19 +88,12 @@ def _preview(value: object, limit: int = 150) -> str:
     return text if len(text) <= limit else f"{text[:limit].rstrip()}…"
 
 
-def _matrix_style(matrix: pd.DataFrame):
-    numeric = matrix.apply(pd.to_numeric, errors="coerce")
-    maximum = numeric.max().max()
-    maximum = float(maximum) if pd.notna(maximum) and maximum > 0 else 1.0
-
-    def cell_style(value):
-        if pd.isna(value):
-            return "background-color: transparent; color: transparent"
-        intensity = min(0.88, 0.12 + float(value) / maximum * 0.76)
-        text_color = "white" if intensity >= 0.55 else "#7f1d1d"
-        return f"background-color: rgba(220, 38, 38, {intensity:.2f}); color: {text_color}"
-
-    return numeric.style.map(cell_style).format("{:.2f}%", na_rep="")
+def _matrix_style(matrix: pd.DataFrame, color_bins: np.ndarray):
+    """미리 나눈 색 구간 번호로 모든 칸의 스타일을 한 번에 붙인다."""
+    cell_styles = pd.DataFrame(
+        MATRIX_CELL_STYLES[color_bins + 1], index=matrix.index, columns=matrix.columns
+    )
+    return matrix.style.apply(lambda _: cell_styles, axis=None).format("{:.2f}%", na_rep="")
 
 
 def render_keyword_dashboard(
@@ -93,7 +103,7 @@ def render_keyword_dashboard(
     cycle_summaries: pd.DataFrame,
     cycle_members: pd.DataFrame,
     ranking: pd.DataFrame,
-    reaction_matrix: pd.DataFrame,
+    reaction_matrix: ReactionMatrix,
 ) -> str | None:
     """키워드 결과를 렌더링하고 상세화면으로 이동할 종목키를 반환한다."""
     if search_results is None or search_results.empty:
@@ -208,21 +218,28 @@ def render_keyword_dashboard(
                 "전체 종목·회차 보기",
                 value=False,
                 key=f"keyword_matrix_all_{query}",
-                help="기본 화면은 종합점수 상위 20종목과 최근 12회차만 표시합니다.",
+                help="기본 화면은 종합점수 상위 20종목과 최근 또는 반응이 강한 12회차만 표시합니다.",
             )
-            matrix = reaction_matrix.copy()
+            matrix_labels = matrix_cycles = None
             if not show_all:
-                top_labels = [
-                    f"{row['종목명']} ({row['종목키']})"
-                    for _, row in ranking.head(20).iterrows()
-                ]
-                latest_cycles = cycle_summaries.head(12)["회차"].tolist()
-                matrix = matrix.reindex(
-                    index=[label for label in top_labels if label in matrix.index],
-                    columns=[cycle for cycle in latest_cycles if cycle in matrix.columns],
+                cycle_choice = st.radio(
+                    "표시할 회차",
+                    ["최근 12회차", "반응이 강한 12회차"],
+                    horizontal=True,
+                    key=f"keyword_matrix_cycles_{query}",
+                )
+                matrix_labels = stock_labels(ranking.head(20))
+                matrix_cycles = (
+                    cycle_summaries.head(12)["회차"].tolist()
+                    if cycle_choice == "최근 12회차"
+                    else reaction_matrix.strongest_cycles(12, matrix_labels)
                 )
-            st.caption("셀은 해당 종목의 회차 내 최고 상승률이며, 빈칸은 매칭 이력이 없음을 뜻합니다.")
-            st.dataframe(_matrix_style(matrix), width="stretch")
+            matrix = reaction_matrix.to_frame(matrix_labels, matrix_cycles)
+            st.caption(
+                "셀은 해당 종목의 회차 내 최고 상승률이며, 빈칸은 매칭 이력이 없음을 뜻합니다. "
+                f"색은 전체 매트릭스 최고 상승률 대비 {REACTION_COLOR_BINS}단계입니다."
+            )
+            st.dataframe(_matrix_style(matrix, reaction_matrix.color_bins(matrix_labels, matrix_cycles)), width="stretch")
 
     with evidence_tab:
         show_all_evidence = len(search_results) <= 100 or st.checkbox(
@@ -256,12 +273,58 @@ def render_keyword_dashboard(
     return selected_key
 
 
+def render_hot_issue_trend(
+    daily_scores: pd.DataFrame,
+    issues: Iterable[str],
+    end_date,
+    trading_day_count: int = 60,
+    window: int = 20,
+) -> None:
+    """이슈×거래일 핫점수 행렬에서 고른 이슈들의 일별 추이를 선 그래프로 그린다."""
+    if daily_scores is None or daily_scores.empty:
+        return
+    issues = [issue for issue in dict.fromkeys(issues) if issue in daily_scores.index]
+    if not issues:
+        return
+    visible = daily_scores.columns[daily_scores.columns <= pd.Timestamp(end_date)][-trading_day_count:]
+    if visible.empty:
+        return
+    trend = (
+        daily_scores.loc[issues, visible]
+        .rename_axis(index="이슈", columns="날짜")
+        .stack()
+        .rename("핫점수")
+        .reset_index()
+    )
+    trend["핫점수"] = trend["핫점수"].astype(float).round(1)
+    st.caption(f"거래일마다 직전 {window}거래일을 기준으로 다시 계산한 핫점수 추이입니다.")
+    chart = (
+        alt.Chart(trend)
+        .mark_line(point=alt.OverlayMarkDef(size=18), interpolate="monotone")
+        .encode(
+            x=alt.X("날짜:T", title="날짜"),
+            y=alt.Y("핫점수:Q", title="핫점수", scale=alt.Scale(domain=[0, 100])),
+            color=alt.Color("이슈:N", sort=issues, title="이슈"),
+            tooltip=["날짜:T", "이슈", "핫점수"],
+        )
+        .properties(height=300)
+    )
+    st.altair_chart(chart, width="stretch")
+
+
 def render_hot_issue_dashboard(
     ranking: pd.DataFrame,
     issue_events: pd.DataFrame,
     metadata: dict[str, object],
+    daily_scores: pd.DataFrame | None = None,
+    trend_window: int = 20,
+    issue_graph: IssueGraph | None = None,
 ) -> str | None:
-    """기간별 핫이슈 순위와 근거 이력을 표시하고 선택 이슈를 반환한다."""
+    """기간별 핫이슈 순위와 근거 이력을 표시하고 선택 이슈를 반환한다.
+
+    daily_scores(이슈×거래일 핫점수)를 주면 상위 이슈와 선택 이슈의 일별 추이도 그린다.
+    issue_graph를 주면 선택 이슈와 함께 부각되어 온 연관 이슈를 보여 준다.
+    """
     if ranking is None or ranking.empty:
         st.warning("선택한 기간과 최소 종목 수 조건에 맞는 핫이슈가 없습니다.")
         return None
@@ -326,6 +389,15 @@ def render_hot_issue_dashboard(
         key=f"hot_issue_choice_{start_text}_{end_text}",
     )
 
+    if daily_scores is not None:
+        render_hot_issue_trend(
+            daily_scores,
+            [*ranking["이슈"].head(5), selected_issue],
+            metadata.get("종료일"),
+            trading_day_count=max(60, int(metadata.get("거래일수", 0))),
+            window=trend_window,
+        )
+
     selected_summary = ranking[ranking["이슈"] == selected_issue].iloc[0]
     metrics = st.columns(5)
     metrics[0].metric("상승 종목", f"{int(selected_summary['상승종목수'])}개")
@@ -334,6 +406,17 @@ def render_hot_issue_dashboard(
     metrics[3].metric("평균 상승률", f"{selected_summary['평균상승률']:.2f}%")
     metrics[4].metric("대장주", selected_summary["대장주"])
 
+    if issue_graph is not None:
+        related = issue_graph.related(selected_issue, limit=10)
+        if not related.empty:
+            st.markdown("**연관 이슈**")
+            st.caption(
+                "같은 종목이 같은 날 함께 부각된 이력으로 잇습니다. 연관점수는 공동 상승률 합을 "
+                "두 이슈 각각의 상승률 합의 기하평균으로 나눈 값(0~100)입니다."
+            )
+            related["현재순위"] = related["이슈"].map(ranking.set_index("이슈")["순위"])
+            st.dataframe(related, hide_index=True, width="stretch")
+
     selected_events = issue_events[issue_events["이슈"] == selected_issue].copy()
     selected_events = selected_events.sort_values(["날짜", "상승률"], ascending=[False, False])
     if not selected_events.empty:
@@ -0,0 +1,170 @@
+"""관심 키워드 목록을 한 번에 검색하고 이슈 회차와 종목 순위까지 계산한다.
+
+저장소 루트에서 실행한다.
+
+    python watchlist.py HBM 유리기판 CXL 원전 헬륨
+    python watchlist.py --file watchlist.txt --output reports
+
+검색어를 주지 않으면 keyword_aliases.json의 대표 키워드 전체를 분석한다.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+import time
+from typing import Iterable, Mapping, Sequence
+
+import pandas as pd
+
+from app_utils import (
+    find_repo_file,
+    load_analysis_data,
+    load_company_overview,
+    load_data,
+    load_name_aliases,
+    load_stock_code_map,
+    load_theme_data,
+)
+from issue_analysis import TradingCalendar, group_issue_cycles, score_stocks
+from search_engine import (
+    TermIndex,
+    build_search_index,
+    build_term_index,
+    load_keyword_aliases,
+    search_documents_many,
+)
+
+
+@dataclass(frozen=True)
+class KeywordAnalysis:
+    """검색어 하나의 매칭 결과와 이슈 회차, 종목 순위."""
+
+    matches: pd.DataFrame
+    applied_terms: list[str]
+    cycle_summaries: pd.DataFrame
+    cycle_members: pd.DataFrame
+    ranking: pd.DataFrame
+
+
+def trading_days_from(sangcheon: pd.DataFrame) -> tuple[pd.Timestamp, ...]:
+    """상천 이력의 날짜를 정렬된 거래일 목록으로 만든다."""
+    if sangcheon is None or "날짜" not in sangcheon.columns:
+        return ()
+    return tuple(
+        pd.to_datetime(sangcheon["날짜"], errors="coerce")
+        .dropna()
+        .dt.normalize()
+        .drop_duplicates()
+        .sort_values()
+        .tolist()
+    )
+
+
+def analyze_watchlist(
+    search_index: pd.DataFrame,
+    queries: Iterable[str],
+    trading_days: TradingCalendar | Iterable,
+    aliases: Mapping[str, Sequence[str]] | None = None,
+    term_index: TermIndex | None = None,
+    **search_options,
+) -> dict[str, KeywordAnalysis]:
+    """여러 검색어를 본문 한 번 스캔으로 검색한 뒤 검색어별 회차와 종목 순위를 계산한다.
+
+    search_options는 operator, sources, start_date, end_date, min_rise, sort_by를 받는다.
+    """
+    results = search_documents_many(
+        search_index, queries, aliases=aliases, term_index=term_index, **search_options
+    )
+    calendar = TradingCalendar.ensure(trading_days)
+    reference_date = calendar[-1] if len(calendar) else None
+    analyses: dict[str, KeywordAnalysis] = {}
+    for query, (matches, applied) in results.items():
+        summaries, members, _ = group_issue_cycles(matches, calendar)
+        ranking = score_stocks(matches, summaries, members, reference_date=reference_date)
+        analyses[query] = KeywordAnalysis(matches, applied, summaries, members, ranking)
+    return analyses
+
+
+def _read_queries(args: argparse.Namespace, aliases: Mapping[str, Sequence[str]]) -> list[str]:
+    queries = list(args.queries)
+    if args.file:
+        lines = Path(args.file).read_text(encoding="utf-8").splitlines()
+        queries.extend(line.strip() for line in lines if line.strip() and not line.startswith("#"))
+    return queries or list(aliases)
+
+
+def _safe_filename(text: str) -> str:
+    return "".join(char if char.isalnum() or char in "-_" else "_" for char in text)
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="관심 키워드 일괄 검색 및 이슈 회차·종목 순위 계산")
+    parser.add_argument("queries", nargs="*", help="검색어 (생략하면 keyword_aliases.json 대표 키워드)")
+    parser.add_argument("--file", help="한 줄에 검색어 하나씩 적은 파일 (#으로 시작하면 주석)")
+    parser.add_argument("--workbook", help="상천 이력 엑셀 (기본: 저장소에서 자동 탐색)")
+    parser.add_argument("--operator", choices=["AND", "OR"], default="AND")
+    parser.add_argument("--min-rise", type=float, default=0.0, help="최소 상승률(%%)")
+    parser.add_argument("--top", type=int, default=5, help="검색어별로 출력할 상위 종목 수")
+    parser.add_argument("--output", help="검색어별 종목 순위·회차 CSV를 저장할 폴더")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_args(argv)
+    started = time.perf_counter()
+    workbook = args.workbook or find_repo_file()
+    if not workbook:
+        raise SystemExit("상천 이력 엑셀 파일을 찾을 수 없습니다.")
+    sangcheon, signal, error = load_data(workbook)
+    if error:
+        raise SystemExit(error)
+
+    keyword_aliases = load_keyword_aliases()
+    queries = _read_queries(args, keyword_aliases)
+    search_index = build_search_index(
+        sangcheon,
+        signal,
+        load_theme_data(),
+        load_company_overview(),
+        load_analysis_data(),
+        load_name_aliases(),
+        load_stock_code_map(),
+    )
+    term_index = build_term_index(search_index)
+    loaded = time.perf_counter()
+
+    analyses = analyze_watchlist(
+        search_index,
+        queries,
+        trading_days_from(sangcheon),
+        aliases=keyword_aliases,
+        term_index=term_index,
+        operator=args.operator,
+        min_rise=args.min_rise,
+    )
+    finished = time.perf_counter()
+
+    output = Path(args.output) if args.output else None
+    if output:
+        output.mkdir(parents=True, exist_ok=True)
+    for query, analysis in analyses.items():
+        leaders = ", ".join(analysis.ranking["종목명"].head(args.top).astype(str))
+        print(
+            f"[{query}] 근거 {len(analysis.matches):,}건 · "
+            f"회차 {len(analysis.cycle_summaries):,}개 · 상위 종목: {leaders or '-'}"
+        )
+        if output:
+            name = _safe_filename(query)
+            analysis.ranking.to_csv(output / f"{name}_종목순위.csv", index=False, encoding="utf-8-sig")
+            analysis.cycle_summaries.to_csv(output / f"{name}_회차.csv", index=False, encoding="utf-8-sig")
+
+    print(
+        f"\n검색어 {len(analyses)}개 · 데이터 준비 {loaded - started:.2f}s · "
+        f"일괄 분석 {finished - loaded:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()